@@ -1,101 +1,115 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from app.core.database import get_db
-from app.schemas.ai_memo import AIMemo, AIMemoCreate, AIMemoUpdate, AIRequest, AIResponse
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Dict, Any, Optional
+from app.core.database import get_async_db, AsyncSessionLocal
+from app.core.metrics import TimedRoute
+from app.api.caching import cache_headers, make_etag, not_modified
+from app.api.documents import require_document, check_bulk_size
+from app.api.tenancy import get_user_id
+from app.schemas.ai_memo import (
+    AIMemo, AIMemoCreate, AIMemoUpdate, AIRequest, AIResponse, AIJob, AIJobCreate, AIMemoBulkCreate, AIMemoBulkUpdate,
+)
+from app.schemas.document import BulkDelete, BulkResult
+from app.models.ai_job import AIJob as AIJobModel
 from app.models.ai_memo import AIMemo as AIMemoModel
-from app.models.document import Document as DocumentModel
-from app.services.ai_service import AIService
+from app.models.document import Document as DocumentModel, owned_by
+from app.services import bulk
+from app.services.ai_service import AIService, get_ai_service
+from app.services.bulk import MissingRowsError
+from app.services.job_queue import ai_job_queue
+from app.services.llm_cache import llm_cache
+from app.services.page_cache import page_cache
+from app.services.prompts import memo_types
+from app.services.rate_limiter import rate_limiter
+from app.services.single_flight import single_flight
 
-router = APIRouter(prefix="/ai-memos", tags=["ai-memos"])
+router = APIRouter(prefix="/ai-memos", tags=["ai-memos"], route_class=TimedRoute)
+
+async def _owned_memo(db: AsyncSession, memo_id: int, user_id: Optional[int]) -> Optional[AIMemoModel]:
+    """요청한 사용자의 문서에 붙은 메모 (없거나 다른 사용자의 메모면 None)"""
+    return await db.scalar(
+        select(AIMemoModel).where(AIMemoModel.id == memo_id, AIMemoModel.document.has(owned_by(user_id)))
+    )
 
 @router.get("/document/{document_id}", response_model=List[AIMemo])
-async def get_ai_memos(document_id: int, db: Session = Depends(get_db)):
-    """문서의 AI 메모 목록 조회"""
-    ai_memos = db.query(AIMemoModel).filter(AIMemoModel.document_id == document_id).all()
-    return ai_memos
+async def get_ai_memos(
+    document_id: int,
+    request: Request,
+    response: Response,
+    start: Optional[int] = Query(None, ge=0, description="이 위치부터의 본문 구간에 앵커가 걸친 메모만"),
+    end: Optional[int] = Query(None, ge=0, description="이 위치 전까지의 본문 구간에 앵커가 걸친 메모만"),
+    user_id: Optional[int] = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """문서의 AI 메모 목록 조회 (ETag는 문서의 메모 버전, If-None-Match가 맞으면 메모를 읽지 않고 304)
+
+    start/end를 주면 앵커가 본문 [start, end) 구간(화면에 보이는 부분)에 걸친 메모만 앵커 위치 순으로 반환한다.
+    앵커 색인만 읽어서 고르므로 메모가 많은 긴 문서에서도 구간 밖 메모의 본문은 읽지 않는다.
+    """
+    ranged = start is not None or end is not None
+    memo_version = await db.scalar(
+        select(DocumentModel.memo_version).where(DocumentModel.id == document_id, owned_by(user_id))
+    )
+    if memo_version is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+    etag = make_etag(f"a{document_id}", f"m{memo_version}", f"r{start}:{end}" if ranged else None)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    response.headers.update(cache_headers(etag))
+    
+    query = select(AIMemoModel).where(AIMemoModel.document_id == document_id)
+    if not ranged:
+        return (await db.scalars(query.order_by(AIMemoModel.id))).all()
+    
+    # 한 점 앵커는 위치가 구간 안에 있을 때, 구간 앵커는 겹칠 때
+    query = query.where(AIMemoModel.anchor_position.isnot(None))
+    if start is not None:
+        query = query.where(or_(
+            AIMemoModel.anchor_position >= start,
+            func.coalesce(AIMemoModel.anchor_end, AIMemoModel.anchor_position) > start,
+        ))
+    if end is not None:
+        query = query.where(AIMemoModel.anchor_position < end)
+    return (await db.scalars(query.order_by(AIMemoModel.anchor_position, AIMemoModel.id))).all()
 
 @router.post("/generate", response_model=AIResponse)
-async def generate_ai_memo(request: AIRequest, db: Session = Depends(get_db)):
-    """AI 메모 생성"""
-    # API 키는 프론트엔드에서 직접 OpenAI API를 호출하도록 변경
-    # 백엔드는 데이터베이스 저장만 담당
+async def generate_ai_memo(
+    request: AIRequest,
+    user_id: Optional[int] = Depends(get_user_id),
+    ai_service: AIService = Depends(get_ai_service)
+):
+    """AI 메모 생성 (요청한 문서에 저장)
+
+    LLM 백엔드가 설정되지 않았으면 목업 응답(metadata.mock)을 저장한다.
+    """
+    if request.type not in memo_types:
+        raise HTTPException(status_code=400, detail="Invalid AI memo type")
+    async with AsyncSessionLocal() as db:
+        await require_document(db, request.document_id, user_id)
     try:
-        # 목업 응답 생성 (실제 AI 호출은 프론트엔드에서)
-        if request.type == "qa":
-            result = {
-                "content": f"""
-                <p><strong>질문:</strong> {request.content}</p>
-                <p>이 질문에 대한 답변을 제공하기 위해 정확한 정보를 검토하고 있습니다. 실제 AI 서비스에서는 더 정확하고 상세한 답변을 제공할 수 있습니다.</p>
-                <p><em>※ 이는 목업 응답입니다. 실제 API 키를 설정하면 더 정확한 답변을 받을 수 있습니다.</em></p>
-                """,
-                "metadata": {
-                    "confidence": 0.9,
-                    "prompt": request.prompt,
-                }
-            }
-        elif request.type == "critical-thinking":
-            result = {
-                "content": f"""
-                <h4>비판적 분석</h4>
-                <p><strong>주제:</strong> {request.content}</p>
-                <div class="bg-blue-50 p-3 rounded mb-2">
-                    <strong>• 객관적 평가:</strong> 주제에 대한 균형잡힌 관점
-                </div>
-                <div class="bg-green-50 p-3 rounded mb-2">
-                    <strong>• 장점:</strong> 긍정적인 측면들
-                </div>
-                <div class="bg-red-50 p-3 rounded mb-2">
-                    <strong>• 단점:</strong> 개선이 필요한 부분들
-                </div>
-                <div class="bg-yellow-50 p-3 rounded mb-2">
-                    <strong>• 개선방안:</strong> 구체적인 제안사항
-                </div>
-                """,
-                "metadata": {
-                    "confidence": 0.85,
-                    "prompt": request.prompt,
-                }
-            }
-        elif request.type == "summary":
-            result = {
-                "content": f"""
-                <h2>정리된 문서</h2>
-                <h3>개요</h3>
-                <p>입력하신 내용을 HTML 표준에 맞춰 정리했습니다.</p>
-                <h3>주요 내용</h3>
-                <ul>
-                    <li>핵심 포인트 1</li>
-                    <li>핵심 포인트 2</li>
-                    <li>핵심 포인트 3</li>
-                </ul>
-                <p><em>※ 실제 AI 서비스에서는 더 체계적이고 구조화된 정리를 제공합니다.</em></p>
-                """,
-                "metadata": {
-                    "confidence": 0.9,
-                    "prompt": request.prompt,
-                }
-            }
-        else:
-            raise HTTPException(status_code=400, detail="Invalid AI memo type")
-        
-        # 임시로 document_id = 1 사용 (실제로는 인증된 사용자의 문서)
-        ai_memo_data = AIMemoCreate(
-            document_id=1,
-            type=request.type,
-            content=result["content"],
-            memo_metadata=result["metadata"]
+        result = await ai_service.generate(
+            request.type, request.content, request.prompt or "", request.use_cache, user_id
         )
         
-        db_ai_memo = AIMemoModel(**ai_memo_data.dict())
-        db.add(db_ai_memo)
-        db.commit()
-        db.refresh(db_ai_memo)
+        # 생성 도중에는 DB 세션을 잡지 않고, 완료 시점에만 열어서 저장
+        async with AsyncSessionLocal() as db:
+            ai_memo_data = AIMemoCreate(
+                document_id=request.document_id,
+                type=request.type,
+                content=result["content"],
+                memo_metadata=result["metadata"]
+            )
+            db_ai_memo = AIMemoModel(**ai_memo_data.dict())
+            db.add(db_ai_memo)
+            await db.commit()
+            await db.refresh(db_ai_memo)
+            memo = AIMemo.model_validate(db_ai_memo).model_dump(mode="json")
         
-        return AIResponse(
-            success=True,
-            data={"memo": db_ai_memo}
-        )
+        return AIResponse(success=True, data={"memo": memo})
         
     except Exception as e:
         return AIResponse(
@@ -103,14 +117,166 @@ async def generate_ai_memo(request: AIRequest, db: Session = Depends(get_db)):
             error=str(e)
         )
 
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Server-Sent Events 메시지 직렬화"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@router.post("/generate/stream")
+async def stream_ai_memo(
+    request: AIRequest,
+    user_id: Optional[int] = Depends(get_user_id),
+    ai_service: AIService = Depends(get_ai_service)
+):
+    """AI 메모 생성 (SSE 스트리밍)
+
+    토큰이 도착하는 대로 `token` 이벤트로 보내고, 생성이 끝나면 요청한 문서에 메모를 한 번만 저장한 뒤
+    `done` 이벤트로 저장된 메모를 보낸다. 실패하면 `error` 이벤트를 보낸다.
+    """
+    if request.type not in memo_types:
+        raise HTTPException(status_code=400, detail="Invalid AI memo type")
+    async with AsyncSessionLocal() as db:
+        await require_document(db, request.document_id, user_id)
+    
+    async def event_stream():
+        try:
+            result = None
+            async for event in ai_service.stream(
+                request.type, request.content, request.prompt or "", request.use_cache, user_id
+            ):
+                if "delta" in event:
+                    yield _sse("token", {"delta": event["delta"]})
+                else:
+                    result = event["result"]
+            
+            # 생성 도중에는 DB 세션을 잡지 않고, 완료 시점에만 열어서 저장
+            async with AsyncSessionLocal() as db:
+                ai_memo_data = AIMemoCreate(
+                    document_id=request.document_id,
+                    type=request.type,
+                    content=result["content"],
+                    memo_metadata=result["metadata"]
+                )
+                db_ai_memo = AIMemoModel(**ai_memo_data.dict())
+                db.add(db_ai_memo)
+                await db.commit()
+                await db.refresh(db_ai_memo)
+                memo = AIMemo.model_validate(db_ai_memo).model_dump(mode="json")
+            
+            yield _sse("done", {"memo": memo})
+            
+        except Exception as e:
+            yield _sse("error", {"error": str(e)})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/jobs", response_model=AIJob, status_code=202)
+async def create_ai_job(
+    request: AIJobCreate,
+    user_id: Optional[int] = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """AI 메모 생성 작업 등록 (바로 작업 id를 반환, 결과는 GET /jobs/{job_id}로 확인)"""
+    if request.type not in memo_types:
+        raise HTTPException(status_code=400, detail="Invalid AI memo type")
+    await require_document(db, request.document_id, user_id)
+    
+    return await ai_job_queue.enqueue(
+        db,
+        memo_type=request.type,
+        content=request.content,
+        document_id=request.document_id,
+        prompt=request.prompt,
+        use_cache=request.use_cache,
+        user_id=user_id,
+    )
+
+@router.get("/jobs/{job_id}", response_model=AIJob)
+async def get_ai_job(
+    job_id: int,
+    user_id: Optional[int] = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """AI 메모 생성 작업 상태 조회 (성공하면 저장된 메모 포함)"""
+    job = await db.get(AIJobModel, job_id)
+    if not job or job.user_id != user_id:
+        raise HTTPException(status_code=404, detail="AI job not found")
+    
+    result = AIJob.model_validate(job)
+    if job.memo_id is not None:
+        memo = await db.get(AIMemoModel, job.memo_id)
+        result.memo = AIMemo.model_validate(memo) if memo else None
+    return result
+
+@router.get("/stats")
+async def get_ai_stats():
+    """AI 생성 호출 통계 (동시 요청 합치기, 응답 캐시, 속도 제한, 웹 페이지 캐시)"""
+    return {
+        "single_flight": single_flight.stats(),
+        "llm_cache": llm_cache.stats(),
+        "rate_limiter": rate_limiter.stats(),
+        "web_page_cache": page_cache.stats(),
+    }
+
+@router.post("/bulk", response_model=BulkResult)
+async def bulk_create_ai_memos(
+    request: AIMemoBulkCreate,
+    user_id: Optional[int] = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """AI 메모 일괄 생성 (트랜잭션 하나로 저장, 입력 순서대로 id 반환)"""
+    check_bulk_size(len(request.memos))
+    try:
+        ids = await db.run_sync(bulk.create_memos, [memo.dict() for memo in request.memos], user_id)
+    except MissingRowsError as e:
+        raise HTTPException(status_code=404, detail={"message": "Document not found", "ids": e.ids})
+    await db.commit()
+    return BulkResult(ids=ids)
+
+@router.patch("/bulk", response_model=List[AIMemo])
+async def bulk_update_ai_memos(
+    request: AIMemoBulkUpdate,
+    user_id: Optional[int] = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """AI 메모 일괄 수정 (하나라도 없으면 아무것도 바꾸지 않고 404)"""
+    check_bulk_size(len(request.memos))
+    try:
+        memos = await db.run_sync(
+            bulk.update_memos, [memo.dict(exclude_unset=True) for memo in request.memos], user_id
+        )
+    except MissingRowsError as e:
+        raise HTTPException(status_code=404, detail={"message": "AI memo not found", "ids": e.ids})
+    await db.commit()
+    return memos
+
+@router.post("/bulk/delete", response_model=BulkResult)
+async def bulk_delete_ai_memos(
+    request: BulkDelete,
+    user_id: Optional[int] = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """AI 메모 일괄 삭제 (하나라도 없으면 아무것도 지우지 않고 404)"""
+    check_bulk_size(len(request.ids))
+    try:
+        ids = await db.run_sync(bulk.delete_memos, request.ids, user_id)
+    except MissingRowsError as e:
+        raise HTTPException(status_code=404, detail={"message": "AI memo not found", "ids": e.ids})
+    await db.commit()
+    return BulkResult(ids=ids)
+
 @router.put("/{memo_id}", response_model=AIMemo)
 async def update_ai_memo(
     memo_id: int,
     memo_update: AIMemoUpdate,
-    db: Session = Depends(get_db)
+    user_id: Optional[int] = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """AI 메모 업데이트"""
-    db_memo = db.query(AIMemoModel).filter(AIMemoModel.id == memo_id).first()
+    db_memo = await _owned_memo(db, memo_id, user_id)
     if not db_memo:
         raise HTTPException(status_code=404, detail="AI memo not found")
     
@@ -118,17 +284,21 @@ async def update_ai_memo(
     for field, value in update_data.items():
         setattr(db_memo, field, value)
     
-    db.commit()
-    db.refresh(db_memo)
+    await db.commit()
+    await db.refresh(db_memo)
     return db_memo
 
 @router.delete("/{memo_id}")
-async def delete_ai_memo(memo_id: int, db: Session = Depends(get_db)):
+async def delete_ai_memo(
+    memo_id: int,
+    user_id: Optional[int] = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
     """AI 메모 삭제"""
-    db_memo = db.query(AIMemoModel).filter(AIMemoModel.id == memo_id).first()
+    db_memo = await _owned_memo(db, memo_id, user_id)
     if not db_memo:
         raise HTTPException(status_code=404, detail="AI memo not found")
     
-    db.delete(db_memo)
-    db.commit()
+    await db.delete(db_memo)
+    await db.commit()
     return {"message": "AI memo deleted successfully"}
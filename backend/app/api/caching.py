@@ -0,0 +1,27 @@
+from typing import Dict, Optional
+from fastapi import Request, Response
+from app.core.compression import strip_encoding
+from app.core.config import settings
+
+def make_etag(*parts) -> str:
+    """버전 값들로 만든 강한 ETag (None인 값은 건너뜀)"""
+    return '"' + ".".join(str(part) for part in parts if part is not None) + '"'
+
+def cache_headers(etag: str) -> Dict[str, str]:
+    return {"ETag": etag, "Cache-Control": settings.http_cache_control}
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """If-None-Match가 etag와 맞으면 304 응답, 아니면 None"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return None
+    if if_none_match.strip() == "*":
+        return Response(status_code=304, headers=cache_headers(etag))
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        # GET 조건부 요청은 약한 비교 (W/ 접두사 무시, 압축 표시 제거 후 비교)
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if strip_encoding(candidate) == etag:
+            return Response(status_code=304, headers=cache_headers(etag))
+    return None
@@ -1,62 +1,452 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from app.core.database import get_db
-from app.schemas.document import Document, DocumentCreate, DocumentUpdate, DocumentWithMemos
-from app.models.document import Document as DocumentModel
+import asyncio
+import json
+from collections import defaultdict
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import LargeBinary, delete, select, tuple_, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer, load_only, noload, selectinload
+from sqlalchemy.orm.exc import StaleDataError
+from typing import List, Optional
+from app.core.config import settings
+from app.core.database import get_async_db, AsyncSessionLocal
+from app.core.metrics import TimedRoute
+from app.api.caching import cache_headers, make_etag, not_modified
+from app.api.pagination import encode_cursor, decode_cursor
+from app.api.tenancy import get_user_id
+from app.schemas.document import (
+    Document, DocumentCreate, DocumentUpdate, DocumentWithMemos, DocumentPage, RelatedDocument,
+    DocumentPatch, DocumentPatchResult, DocumentRevisionItem, DocumentRevisionContent,
+    DocumentBulkCreate, DocumentBulkUpdate, BulkDelete, BulkResult,
+)
+from app.models.document import Document as DocumentModel, DocumentRevision, owned_by
+from app.schemas.ai_memo import AIMemo as AIMemoSchema
+from app.models.ai_job import cancel_document_jobs
 from app.models.ai_memo import AIMemo
+from app.models.types import decompress_text
+from app.services import bulk
+from app.services.anchors import diff_ops, remap_anchors
+from app.services.bulk import MissingRowsError
+from app.services.related import related_notes, upsert_documents
+from app.services.revisions import PatchError, apply_ops, content_at, record_revision
 
-router = APIRouter(prefix="/documents", tags=["documents"])
+router = APIRouter(prefix="/documents", tags=["documents"], route_class=TimedRoute)
 
-@router.get("/", response_model=List[Document])
-async def get_documents(db: Session = Depends(get_db)):
-    """문서 목록 조회"""
-    documents = db.query(DocumentModel).all()
-    return documents
+# PUT이 동시 저장과 버전 충돌했을 때 다시 시도할 횟수
+_UPDATE_RETRIES = 3
+# 내보내기에서 한 번에 읽는 문서 수
+_EXPORT_BATCH = 200
+
+async def require_document(db: AsyncSession, document_id: int, user_id: Optional[int]):
+    """요청한 사용자의 문서인지 확인 (없거나 다른 사용자의 문서면 똑같이 404)"""
+    if not await db.scalar(select(DocumentModel.id).where(DocumentModel.id == document_id, owned_by(user_id))):
+        raise HTTPException(status_code=404, detail="Document not found")
+
+@router.get("/", response_model=DocumentPage)
+async def get_documents(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor"),
+    q: Optional[str] = Query(None, description="제목 검색어"),
+    user_id: Optional[int] = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """요청한 사용자의 문서 목록 조회 (최근 수정순, keyset 페이지네이션, content 제외)"""
+    query = select(DocumentModel).options(
+        load_only(
+            DocumentModel.id,
+            DocumentModel.title,
+            DocumentModel.created_at,
+            DocumentModel.updated_at,
+            DocumentModel.user_id,
+        )
+    ).where(owned_by(user_id))
+    if q:
+        # 검색어의 %, _는 와일드카드가 아닌 글자 그대로 찾음
+        pattern = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        query = query.where(DocumentModel.title.ilike(f"%{pattern}%", escape="\\"))
+    if cursor:
+        cursor_updated_at, cursor_id = decode_cursor(cursor)
+        query = query.where(
+            tuple_(DocumentModel.updated_at, DocumentModel.id) < tuple_(cursor_updated_at, cursor_id)
+        )
+    
+    documents = (await db.scalars(
+        query.order_by(DocumentModel.updated_at.desc(), DocumentModel.id.desc()).limit(limit + 1)
+    )).all()
+    
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        last = documents[-1]
+        next_cursor = encode_cursor(last.updated_at, last.id)
+    
+    return DocumentPage(items=documents, next_cursor=next_cursor)
+
+def check_bulk_size(count: int):
+    if count > settings.bulk_max_items:
+        raise HTTPException(status_code=413, detail=f"Too many items (max {settings.bulk_max_items})")
+
+@router.post("/bulk", response_model=BulkResult)
+async def bulk_create_documents(
+    request: DocumentBulkCreate,
+    background_tasks: BackgroundTasks,
+    user_id: Optional[int] = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """문서 일괄 생성 (문서마다 ai_memos 포함 가능, 트랜잭션 하나로 저장, 입력 순서대로 id 반환)
+
+    연관 노트 색인은 응답 뒤 스레드에서 반영하므로 /related 결과에는 잠시 늦게 나타난다.
+    """
+    check_bulk_size(len(request.documents))
+    ids = await db.run_sync(bulk.create_documents, [document.dict() for document in request.documents], user_id)
+    await db.commit()
+    background_tasks.add_task(
+        upsert_documents,
+        [(id, document.title, document.content) for id, document in zip(ids, request.documents)],
+        user_id,
+    )
+    return BulkResult(ids=ids)
+
+@router.patch("/bulk", response_model=List[DocumentPatchResult])
+async def bulk_update_documents(
+    request: DocumentBulkUpdate,
+    user_id: Optional[int] = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """문서 일괄 수정 (기준 버전 없이 덮어씀, 하나라도 없으면 아무것도 바꾸지 않고 404)"""
+    check_bulk_size(len(request.documents))
+    try:
+        documents = await db.run_sync(
+            bulk.update_documents, [document.dict(exclude_unset=True) for document in request.documents], user_id
+        )
+    except MissingRowsError as e:
+        raise HTTPException(status_code=404, detail={"message": "Document not found", "ids": e.ids})
+    except StaleDataError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Document is being updated concurrently")
+    await db.commit()
+    return [DocumentPatchResult(id=d.id, version=d.version, updated_at=d.updated_at) for d in documents]
+
+@router.post("/bulk/delete", response_model=BulkResult)
+async def bulk_delete_documents(
+    request: BulkDelete,
+    user_id: Optional[int] = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """문서 일괄 삭제 (AI 메모와 변경 기록 포함, 하나라도 없으면 아무것도 지우지 않고 404)"""
+    check_bulk_size(len(request.ids))
+    try:
+        ids = await db.run_sync(bulk.delete_documents, request.ids, user_id)
+    except MissingRowsError as e:
+        raise HTTPException(status_code=404, detail={"message": "Document not found", "ids": e.ids})
+    await db.commit()
+    return BulkResult(ids=ids)
+
+@router.get("/export")
+async def export_documents(user_id: Optional[int] = Depends(get_user_id)):
+    """요청한 사용자의 문서 전체를 NDJSON으로 내보내기 (한 줄에 문서 하나와 그 AI 메모, id 순)
+
+    배치 단위로 읽어서 바로 보내므로 문서 수와 관계없이 메모리 사용량이 일정하다.
+    각 줄은 그대로 POST /documents/bulk의 documents 항목으로 다시 가져올 수 있다.
+    """
+    async def lines():
+        last_id = 0
+        while True:
+            # 느린 클라이언트가 받는 동안 연결을 잡고 있지 않도록 배치마다 세션을 새로 엶
+            async with AsyncSessionLocal() as db:
+                query = (
+                    select(DocumentModel)
+                    .options(noload(DocumentModel.ai_memos))
+                    .where(owned_by(user_id), DocumentModel.id > last_id)
+                )
+                documents = (await db.scalars(query.order_by(DocumentModel.id).limit(_EXPORT_BATCH))).all()
+                if not documents:
+                    return
+                memos = (await db.scalars(
+                    select(AIMemo)
+                    .where(AIMemo.document_id.in_([document.id for document in documents]))
+                    .order_by(AIMemo.document_id, AIMemo.id)
+                )).all()
+            
+            by_document = defaultdict(list)
+            for memo in memos:
+                by_document[memo.document_id].append(AIMemoSchema.model_validate(memo).model_dump(mode="json"))
+            yield "".join(
+                json.dumps(
+                    {**Document.model_validate(document).model_dump(mode="json"), "ai_memos": by_document[document.id]},
+                    ensure_ascii=False,
+                ) + "\n"
+                for document in documents
+            )
+            last_id = documents[-1].id
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+def _document_etag(
+    document_id: int, version: int, memo_version: int,
+    memo_limit: Optional[int] = None, memo_content_length: Optional[int] = None,
+) -> str:
+    # 메모 개수/길이 제한이 다르면 응답 본문도 다르므로 ETag에 포함
+    return make_etag(
+        f"d{document_id}", f"v{version}", f"m{memo_version}",
+        memo_limit and f"l{memo_limit}", memo_content_length and f"c{memo_content_length}",
+    )
 
 @router.get("/{document_id}", response_model=DocumentWithMemos)
-async def get_document(document_id: int, db: Session = Depends(get_db)):
-    """특정 문서 조회 (AI 메모 포함)"""
-    document = db.query(DocumentModel).filter(DocumentModel.id == document_id).first()
+async def get_document(
+    document_id: int,
+    request: Request,
+    response: Response,
+    memo_limit: Optional[int] = Query(None, ge=1, le=200, description="최근 AI 메모만 포함"),
+    memo_content_length: Optional[int] = Query(None, ge=1, description="AI 메모 본문을 앞에서부터 잘라서 반환"),
+    user_id: Optional[int] = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """특정 문서 조회 (AI 메모 포함, 메모 수와 관계없이 쿼리 2회)
+
+    ETag는 문서 버전과 메모 버전으로 만든다. If-None-Match가 맞으면 버전만 읽고 본문은 읽지 않은 채 304.
+    """
+    if request.headers.get("if-none-match"):
+        versions = (await db.execute(
+            select(DocumentModel.version, DocumentModel.memo_version)
+            .where(DocumentModel.id == document_id, owned_by(user_id))
+        )).first()
+        if versions is None:
+            raise HTTPException(status_code=404, detail="Document not found")
+        cached = not_modified(request, _document_etag(document_id, *versions, memo_limit, memo_content_length))
+        if cached:
+            return cached
+    
+    if memo_limit is None and memo_content_length is None:
+        document = await db.scalar(
+            select(DocumentModel)
+            .options(selectinload(DocumentModel.ai_memos))
+            .where(DocumentModel.id == document_id, owned_by(user_id))
+        )
+        if not document:
+            raise HTTPException(status_code=404, detail="Document not found")
+        response.headers.update(cache_headers(_document_etag(document.id, document.version, document.memo_version)))
+        return document
+    
+    document = await db.scalar(
+        select(DocumentModel)
+        .options(noload(DocumentModel.ai_memos))
+        .where(DocumentModel.id == document_id, owned_by(user_id))
+    )
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
-    return document
+    response.headers.update(cache_headers(
+        _document_etag(document.id, document.version, document.memo_version, memo_limit, memo_content_length)
+    ))
+    
+    # 본문을 자를 때는 저장된 값을 그대로 받아서 필요한 앞부분만 압축을 풂
+    if memo_content_length:
+        query = select(AIMemo, type_coerce(AIMemo.content, LargeBinary)).options(defer(AIMemo.content))
+    else:
+        query = select(AIMemo, AIMemo.content)
+    query = query.where(AIMemo.document_id == document_id).order_by(AIMemo.id.desc())
+    if memo_limit:
+        query = query.limit(memo_limit + 1)
+    rows = (await db.execute(query)).all()
+    
+    has_more_memos = memo_limit is not None and len(rows) > memo_limit
+    rows = rows[:memo_limit] if memo_limit else rows
+    memos = [
+        AIMemoSchema(
+            id=memo.id,
+            document_id=memo.document_id,
+            type=memo.type,
+            content=decompress_text(content, memo_content_length) if memo_content_length else content,
+            anchor_position=memo.anchor_position,
+            anchor_end=memo.anchor_end,
+            created_at=memo.created_at,
+            memo_metadata=memo.memo_metadata,
+        )
+        for memo, content in reversed(rows)
+    ]
+    return DocumentWithMemos(
+        **Document.model_validate(document).model_dump(),
+        ai_memos=memos,
+        has_more_memos=has_more_memos,
+    )
+
+@router.get("/{document_id}/related", response_model=List[RelatedDocument])
+async def get_related_documents(
+    document_id: int,
+    limit: int = Query(5, ge=1, le=50),
+    user_id: Optional[int] = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """같은 사용자의 문서 중 본문이 비슷한 문서 조회 (유사도 순)"""
+    await require_document(db, document_id, user_id)
+    
+    # 행렬-벡터 곱은 문서 수에 비례하는 CPU 작업이므로 스레드에서 실행 (numpy가 GIL을 놓음)
+    hits = await asyncio.to_thread(related_notes.related, document_id, limit)
+    if not hits:
+        return []
+    documents = (await db.scalars(
+        select(DocumentModel)
+        .options(load_only(DocumentModel.id, DocumentModel.title, DocumentModel.updated_at))
+        .where(DocumentModel.id.in_([id for id, _ in hits]), owned_by(user_id))
+    )).all()
+    by_id = {document.id: document for document in documents}
+    return [
+        RelatedDocument(id=id, title=by_id[id].title, updated_at=by_id[id].updated_at, score=score)
+        for id, score in hits
+        if id in by_id
+    ]
 
 @router.post("/", response_model=Document)
-async def create_document(document: DocumentCreate, db: Session = Depends(get_db)):
-    """새 문서 생성"""
-    db_document = DocumentModel(**document.dict())
+async def create_document(
+    document: DocumentCreate,
+    user_id: Optional[int] = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """요청한 사용자의 새 문서 생성"""
+    db_document = DocumentModel(**document.dict(), user_id=user_id)
     db.add(db_document)
-    db.commit()
-    db.refresh(db_document)
+    await db.commit()
+    await db.refresh(db_document)
     return db_document
 
 @router.put("/{document_id}", response_model=Document)
 async def update_document(
     document_id: int, 
     document_update: DocumentUpdate, 
-    db: Session = Depends(get_db)
+    user_id: Optional[int] = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """문서 업데이트"""
-    db_document = db.query(DocumentModel).filter(DocumentModel.id == document_id).first()
-    if not db_document:
+    """문서 업데이트 (기준 버전 없이 덮어쓰므로 동시 저장과 겹치면 최신 버전으로 다시 시도)
+
+    본문 전체를 받으므로 이전 본문과 비교한 변경 구간으로 메모 앵커를 옮긴다.
+    """
+    update_data = document_update.dict(exclude_unset=True)
+    for _ in range(_UPDATE_RETRIES):
+        db_document = await db.get(DocumentModel, document_id, populate_existing=True)
+        if not db_document or db_document.user_id != user_id:
+            raise HTTPException(status_code=404, detail="Document not found")
+        
+        base_version, base_content = db_document.version, db_document.content
+        for field, value in update_data.items():
+            setattr(db_document, field, value)
+        
+        try:
+            await db.flush()
+        except StaleDataError:
+            await db.rollback()
+            continue
+        if db_document.version != base_version:
+            # 본문이 바뀌었으면 전체 snapshot, 제목만 바뀌었으면 빈 연산으로 기록
+            await db.run_sync(
+                record_revision, db_document, base_content,
+                ops=None if "content" in update_data else [],
+                title=update_data.get("title"),
+            )
+            if "content" in update_data:
+                await db.run_sync(remap_anchors, document_id, diff_ops(base_content, db_document.content))
+        await db.commit()
+        await db.refresh(db_document)
+        return db_document
+    
+    raise HTTPException(status_code=409, detail="Document is being updated concurrently")
+
+@router.patch("/{document_id}", response_model=DocumentPatchResult)
+async def patch_document(
+    document_id: int,
+    patch: DocumentPatch,
+    user_id: Optional[int] = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """문서 부분 수정 (자동 저장용)
+
+    base_version 기준의 편집 연산만 받아 서버에서 적용한다. 그 사이 다른 저장이 있었으면
+    409와 함께 현재 버전을 돌려주므로, 클라이언트는 최신 본문을 받아 다시 계산해야 한다.
+    메모 앵커도 같은 연산으로 함께 옮긴다.
+    """
+    db_document = await db.get(DocumentModel, document_id)
+    if not db_document or db_document.user_id != user_id:
         raise HTTPException(status_code=404, detail="Document not found")
+    if db_document.version != patch.base_version:
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "Document version conflict", "version": db_document.version},
+        )
     
-    update_data = document_update.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_document, field, value)
+    ops = [op.dict() for op in patch.ops]
+    base_content = db_document.content or ""
+    try:
+        content = apply_ops(base_content, ops)
+    except PatchError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     
-    db.commit()
-    db.refresh(db_document)
-    return db_document
+    if content != base_content:
+        db_document.content = content
+    if patch.title is not None and patch.title != db_document.title:
+        db_document.title = patch.title
+    
+    try:
+        await db.flush()
+    except StaleDataError:
+        # 읽은 뒤 커밋 전에 다른 요청이 먼저 저장함
+        await db.rollback()
+        current = await db.scalar(select(DocumentModel.version).where(DocumentModel.id == document_id))
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "Document version conflict", "version": current},
+        )
+    if db_document.version != patch.base_version:
+        await db.run_sync(record_revision, db_document, base_content, ops=ops, title=patch.title)
+        await db.run_sync(remap_anchors, document_id, ops)
+    await db.commit()
+    return DocumentPatchResult(id=db_document.id, version=db_document.version, updated_at=db_document.updated_at)
+
+@router.get("/{document_id}/revisions", response_model=List[DocumentRevisionItem])
+async def get_document_revisions(
+    document_id: int,
+    limit: int = Query(50, ge=1, le=200),
+    before: Optional[int] = Query(None, description="이 버전보다 이전 기록만 조회"),
+    user_id: Optional[int] = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """문서 변경 기록 목록 (최신 버전부터, 본문 제외)"""
+    await require_document(db, document_id, user_id)
+    query = select(
+        DocumentRevision.version,
+        DocumentRevision.title,
+        DocumentRevision.created_at,
+        DocumentRevision.snapshot.isnot(None).label("is_snapshot"),
+    ).where(DocumentRevision.document_id == document_id)
+    if before is not None:
+        query = query.where(DocumentRevision.version < before)
+    return (await db.execute(query.order_by(DocumentRevision.version.desc()).limit(limit))).all()
+
+@router.get("/{document_id}/revisions/{version}", response_model=DocumentRevisionContent)
+async def get_document_revision(
+    document_id: int,
+    version: int,
+    user_id: Optional[int] = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """특정 버전의 본문 복원"""
+    await require_document(db, document_id, user_id)
+    content = await db.run_sync(content_at, document_id, version)
+    if content is None:
+        raise HTTPException(status_code=404, detail="Revision not found")
+    return DocumentRevisionContent(document_id=document_id, version=version, content=content)
 
 @router.delete("/{document_id}")
-async def delete_document(document_id: int, db: Session = Depends(get_db)):
+async def delete_document(
+    document_id: int,
+    user_id: Optional[int] = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
     """문서 삭제"""
-    db_document = db.query(DocumentModel).filter(DocumentModel.id == document_id).first()
-    if not db_document:
+    db_document = await db.get(DocumentModel, document_id)
+    if not db_document or db_document.user_id != user_id:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    db.delete(db_document)
-    db.commit()
+    await db.execute(delete(DocumentRevision).where(DocumentRevision.document_id == document_id))
+    await db.delete(db_document)
+    await db.run_sync(lambda session: cancel_document_jobs(session.connection(), [document_id]))
+    await db.commit()
     return {"message": "Document deleted successfully"}
@@ -0,0 +1,19 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+from fastapi import HTTPException
+
+def encode_cursor(updated_at: Optional[datetime], id: int) -> str:
+    """(updated_at, id) keyset 커서 인코딩"""
+    payload = json.dumps([updated_at.isoformat() if updated_at else None, id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """keyset 커서 디코딩 (잘못된 커서는 400)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        updated_at, id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return (datetime.fromisoformat(updated_at) if updated_at else None), int(id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.core.database import get_async_db
+from app.core.metrics import TimedRoute
+from app.api.tenancy import get_user_id
+from app.schemas.search import SearchResponse
+from app.services import search as search_service
+
+router = APIRouter(prefix="/search", tags=["search"], route_class=TimedRoute)
+
+@router.get("", response_model=SearchResponse)
+async def search(
+    q: str = Query(..., min_length=1, description="검색어"),
+    kind: str = Query("all", pattern="^(all|document|memo)$"),
+    limit: int = Query(20, ge=1, le=100),
+    user_id: Optional[int] = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """요청한 사용자의 문서 제목/본문과 AI 메모 전문 검색"""
+    conn = await db.connection()
+    results = await conn.run_sync(search_service.search, q, kind=kind, limit=limit, user_id=user_id)
+    return SearchResponse(query=q, results=results)
@@ -0,0 +1,16 @@
+from typing import Optional
+from fastapi import HTTPException, Request
+
+from app.core.config import settings
+
+def get_user_id(request: Request) -> Optional[int]:
+    """요청한 사용자 id (인증 프록시가 넣은 헤더, 없으면 익명 사용자 None)"""
+    value = request.headers.get(settings.user_id_header)
+    if value is None:
+        if settings.require_user_id:
+            raise HTTPException(status_code=401, detail="User id required")
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid user id")
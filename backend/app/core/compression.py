@@ -0,0 +1,102 @@
+"""응답 압축 (brotli 우선, 없으면 gzip)
+
+Starlette GZipMiddleware의 응답 처리(작은 응답/이미 인코딩된 응답/SSE 제외, 스트리밍 지원)를 그대로 쓰고,
+brotli 패키지가 설치되어 있으면 `Accept-Encoding: br` 요청에 brotli로 압축한다.
+압축한 응답의 강한 ETag는 인코딩마다 달라야 하므로 따옴표 안에 `-gzip`/`-br`을 붙인다.
+"""
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipResponder, IdentityResponder
+
+try:
+    import brotli
+except ImportError:  # 선택 의존성: 없으면 gzip만 사용
+    brotli = None
+
+# 동적 응답은 매번 압축하므로 압축률보다 속도 위주 (brotli 4는 gzip 6보다 빠르고 더 작음)
+_GZIP_LEVEL = 6
+_BROTLI_QUALITY = 4
+_ENCODINGS = ("br", "gzip")
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    return f'{etag[:-1]}-{encoding}"' if etag.endswith('"') else etag
+
+
+def strip_encoding(etag: str) -> str:
+    """encoded_etag로 붙인 인코딩 표시 제거 (조건부 요청의 If-None-Match 비교용)"""
+    for encoding in _ENCODINGS:
+        suffix = f'-{encoding}"'
+        if etag.endswith(suffix):
+            return etag[:-len(suffix)] + '"'
+    return etag
+
+
+class _EncodedETag:
+    """압축해서 보내는 응답(과 같은 표현의 304)의 ETag에 인코딩 표시를 붙임"""
+
+    content_encoding: str
+
+    async def __call__(self, scope, receive, send):
+        async def send_with_etag(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                etag = headers.get("etag")
+                compressed = headers.get("content-encoding") == self.content_encoding
+                if etag and (compressed or message["status"] == 304):
+                    headers["ETag"] = encoded_etag(etag, self.content_encoding)
+            await send(message)
+
+        await super().__call__(scope, receive, send_with_etag)
+
+
+class _GZipResponder(_EncodedETag, GZipResponder):
+    pass
+
+
+class _BrotliResponder(_EncodedETag, IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app, minimum_size: int):
+        super().__init__(app, minimum_size)
+        self.compressor = brotli.Compressor(quality=_BROTLI_QUALITY)
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        compressed = self.compressor.process(body)
+        # 스트리밍 중에는 받은 만큼 바로 내보내도록 flush
+        return compressed + (self.compressor.flush() if more_body else self.compressor.finish())
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = _negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding == "br":
+            responder = _BrotliResponder(self.app, self.minimum_size)
+        elif encoding == "gzip":
+            responder = _GZipResponder(self.app, self.minimum_size, compresslevel=_GZIP_LEVEL)
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size)
+        await responder(scope, receive, send)
+
+
+def _negotiate(accept_encoding: str) -> Optional[str]:
+    accepted = set()
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(name.strip().lower())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
@@ -6,12 +6,127 @@ class Settings(BaseSettings):
     # Database
     database_url: str = "sqlite:///./ai_note_app.db"
     
+    # SQLite 연결마다 적용하는 PRAGMA (WAL이면 쓰기 중에도 읽기가 막히지 않음)
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size_kb: int = 64 * 1024
+    
+    # PostgreSQL 등 서버형 DB 커넥션 풀
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    
     # OpenAI
     openai_api_key: str = ""
+    openai_base_url: str = ""
+    openai_timeout: float = 60.0
+    openai_max_retries: int = 2
+    openai_max_connections: int = 20
+    openai_max_concurrency: int = 10
+    
+    # OpenAI 호출 속도 제한 (워커 프로세스 안에서 공유하는 토큰 버킷, 0이면 제한 없음)
+    openai_requests_per_minute: int = 500
+    openai_tokens_per_minute: int = 90000
+    openai_rate_limit_burst_seconds: float = 10.0
+    openai_interactive_reserve: float = 0.2
+    openai_rate_limit_max_wait_seconds: float = 60.0
+    
+    # AI 메모 생성 모델 (유형별로 정하지 않았으면 llm_model, 입력이 짧으면 llm_short_input_model, 비우면 사용 안 함)
+    llm_model: str = "gpt-3.5-turbo"
+    llm_short_input_model: str = "gpt-4o-mini"
+    llm_short_input_tokens: int = 300
+    # 시스템 메시지를 포함한 프롬프트 최대 토큰 수 (넘으면 참고 자료부터 잘라냄)
+    llm_prompt_token_budget: int = 6000
+    
+    # LLM 응답 캐시 (sqlite 경로가 비어 있으면 메모리 캐시만 사용)
+    llm_cache_enabled: bool = True
+    llm_cache_max_entries: int = 512
+    llm_cache_ttl_seconds: int = 86400
+    llm_cache_sqlite_path: str = ""
+    llm_cache_sqlite_max_bytes: int = 64 * 1024 * 1024
+    # SQLite 캐시 항목의 마지막 사용 시각 갱신 간격 (히트마다 쓰지 않음)
+    llm_cache_sqlite_touch_seconds: int = 300
+    # 동일한 AI 생성 요청이 동시에 들어오면 업스트림 호출 하나로 합침
+    llm_single_flight_enabled: bool = True
+    
+    # LLM 호출 백엔드 (openai, replay: 녹화한 응답 재생) 와 녹화 저장소 (llm_record면 OpenAI 호출을 녹화)
+    llm_backend: str = "openai"
+    llm_record: bool = False
+    llm_recordings_path: str = "./llm_recordings.sqlite3"
+    # 재생 속도 (profile: recorded는 녹화된 시간 그대로, fixed는 첫 토큰 지연 + 초당 토큰 수, 대기 시간에 latency_scale을 곱함)
+    llm_replay_profile: str = "recorded"
+    llm_replay_latency_scale: float = 1.0
+    llm_replay_first_token_seconds: float = 0.5
+    llm_replay_tokens_per_second: float = 50.0
+    # 같은 요청의 녹화가 없을 때 (any: 같은 모델의 녹화 중 하나, error: 실패)
+    llm_replay_on_miss: str = "any"
+    
+    # 긴 문서 요약 (본문 토큰 수가 기준을 넘으면 조각별 요약 후 합쳐서 요약)
+    summary_long_threshold_tokens: int = 3000
+    summary_chunk_tokens: int = 1500
+    summary_chunk_summary_tokens: int = 300
+    summary_map_concurrency: int = 4
+    
+    # Prometheus 지표 (/metrics) 및 요청별 단계 시간 기록
+    metrics_enabled: bool = True
     
-    # Web Search
+    # HTTP 캐시 (문서/메모 조회의 ETag 응답에 붙임, no-cache면 매번 If-None-Match로 재검증해 바뀐 게 없으면 304)
+    http_cache_control: str = "private, no-cache"
+    # 이 크기(바이트) 이상인 응답만 압축 (brotli 패키지가 있으면 br, 없으면 gzip)
+    compression_minimum_size: int = 1024
+    
+    # 문서 본문/AI 메모/변경 기록 snapshot 압축 저장 (zlib, zstd(zstandard 패키지 필요), none)
+    # 설정을 바꾼 뒤 기존 행은 `python -m app.services.storage`로 다시 저장
+    content_compression: str = "zlib"
+    content_compression_min_size: int = 512
+    
+    # AI 메모 생성 작업 큐 (DB 테이블 기반, 외부 브로커 없음)
+    ai_job_workers: int = 4
+    ai_job_max_attempts: int = 3
+    ai_job_retry_backoff_seconds: float = 2.0
+    ai_job_poll_interval_seconds: float = 1.0
+    ai_job_lock_timeout_seconds: int = 600
+    ai_job_max_running_per_user: int = 2
+    
+    # 문서 변경 기록 (이 버전 간격마다 본문 전체 snapshot 저장)
+    revision_snapshot_interval: int = 50
+    
+    # 일괄 생성/수정/삭제 API가 요청 하나에 받는 최대 항목 수 (트랜잭션 하나로 처리)
+    bulk_max_items: int = 1000
+    
+    # 연관 노트 벡터 색인 (AI 요약 프롬프트에 웹 검색 대신 관련 노트를 넣을지 여부)
+    related_index_path: str = "./related_index"
+    related_index_dim: int = 1024
+    # 일괄 생성한 문서의 벡터를 계산할 작업자 프로세스 수 (0이면 스레드에서 계산)
+    related_index_workers: int = 1
+    related_notes_context: bool = False
+    
+    # Web Search (요약 프롬프트 보강, provider: google(Custom Search), fixture(로컬 JSON, 테스트용), none)
     search_api_key: str = ""
     search_engine_id: str = ""
+    web_search_provider: str = "google"
+    web_search_fixture_path: str = ""
+    web_search_max_results: int = 5
+    web_search_max_passages: int = 6
+    # 검색부터 페이지 수집까지 전체 제한 시간 (그 안에 받은 페이지만 사용)
+    web_search_timeout: float = 8.0
+    web_fetch_timeout: float = 5.0
+    web_fetch_per_host: int = 2
+    web_fetch_max_connections: int = 20
+    web_fetch_max_bytes: int = 1024 * 1024
+    # 페이지 추출 결과 캐시 (신선한 동안은 그대로, 지나면 ETag/Last-Modified로 재검증)
+    web_page_cache_path: str = "./web_page_cache.sqlite3"
+    web_page_cache_fresh_seconds: int = 3600
+    web_page_cache_max_bytes: int = 64 * 1024 * 1024
+    
+    # 사용자 구분 (앞단 인증 프록시가 확인한 사용자 id를 이 헤더로 전달)
+    # require_user_id가 False면 헤더 없는 요청은 익명 사용자(user_id 없음)의 문서만 다룸
+    user_id_header: str = "X-User-Id"
+    require_user_id: bool = False
     
     # Application
     secret_key: str = "your-secret-key-change-this-in-production"
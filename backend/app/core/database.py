@@ -1,15 +1,72 @@
-from sqlalchemy import create_engine
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
+from .metrics import stage
 
-# SQLite 데이터베이스 생성 (개발용)
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {}
+# 동기 URL의 DB 종류별 비동기 드라이버
+_ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+def async_database_url(database_url: str) -> URL:
+    """동기 DATABASE_URL을 비동기 드라이버 URL로 변환 (이미 비동기 드라이버면 그대로)"""
+    url = make_url(database_url)
+    if url.get_driver_name() in ("aiosqlite", "asyncpg"):
+        return url
+    return url.set(drivername=_ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+
+def _engine_options(database_url: str, is_async: bool = False) -> Dict[str, Any]:
+    """DB 종류별 엔진 인자 (SQLite는 스레드 검사 해제, 그 외는 풀 설정)"""
+    if make_url(database_url).get_backend_name() == "sqlite":
+        return {} if is_async else {"connect_args": {"check_same_thread": False}}
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+# SQLite(개발용) 또는 PostgreSQL
+# 동기 엔진은 시작 시 스키마 작업과 스크립트용, API 라우터는 비동기 엔진 사용
+engine = create_engine(settings.database_url, **_engine_options(settings.database_url))
+async_engine = create_async_engine(
+    async_database_url(settings.database_url), **_engine_options(settings.database_url, is_async=True)
 )
 
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """SQLite 연결마다 저널/동기화/캐시 설정 적용"""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode = {settings.sqlite_journal_mode}")
+        cursor.execute(f"PRAGMA synchronous = {settings.sqlite_synchronous}")
+        cursor.execute(f"PRAGMA busy_timeout = {int(settings.sqlite_busy_timeout_ms)}")
+        cursor.execute(f"PRAGMA mmap_size = {int(settings.sqlite_mmap_size)}")
+        # 음수는 KiB 단위
+        cursor.execute(f"PRAGMA cache_size = {-int(settings.sqlite_cache_size_kb)}")
+    finally:
+        cursor.close()
+
+for _engine in (engine, async_engine.sync_engine):
+    if _engine.dialect.name == "sqlite":
+        event.listen(_engine, "connect", _set_sqlite_pragmas)
+
+class _TimedAsyncSession(AsyncSession):
+    """커밋(flush + COMMIT) 시간을 요청의 db_commit 단계로 기록"""
+
+    async def commit(self):
+        with stage("db_commit"):
+            await super().commit()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# 커밋 후에도 응답 직렬화 중 지연 로딩이 일어나지 않도록 expire_on_commit=False
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=_TimedAsyncSession, autoflush=False, expire_on_commit=False
+)
 
 Base = declarative_base()
 
@@ -19,3 +76,36 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def utcnow() -> datetime:
+    """애플리케이션 측 타임스탬프 (keyset 비교가 가능하도록 항상 같은 형식으로 저장)"""
+    return datetime.now(timezone.utc)
+
+# CompressedText로 저장하는 (테이블, 컬럼)
+COMPRESSED_COLUMNS = (("documents", "content"), ("ai_memos", "content"), ("document_revisions", "snapshot"))
+
+def alembic_config():
+    """backend/alembic.ini 설정 (실행 위치와 관계없이)"""
+    from alembic.config import Config
+
+    return Config(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "alembic.ini"))
+
+def init_db():
+    """스키마 마이그레이션(alembic upgrade head)과 연관 노트 색인 동기화
+
+    배포 시 한 번 실행한다 (`python -m app.core.migrate`). API 프로세스는 시작할 때 스키마를 건드리지 않는다.
+    """
+    from alembic import command
+    from app.services.related import ensure_related_index
+    
+    config = alembic_config()
+    with engine.begin() as conn:
+        config.attributes["connection"] = conn
+        command.upgrade(config, "head")
+    
+    # 연관 노트 벡터 색인 (파일이 없으면 전체 구성, 있으면 놓친 변경분만 반영)
+    ensure_related_index(engine)
@@ -0,0 +1,212 @@
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi.routing import APIRoute
+from prometheus_client import REGISTRY, Counter, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy import event
+from starlette.datastructures import Headers, MutableHeaders
+
+from .config import settings
+
+# 요청/LLM 지연은 수 ms ~ 수십 초, DB 쿼리는 0.1 ms ~ 수백 ms
+_REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+_LLM_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120)
+_DB_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+_DB_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "PRAGMA"}
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP 요청 처리 시간", ["method", "route", "status"], buckets=_REQUEST_BUCKETS
+)
+REQUEST_STAGE_SECONDS = Histogram(
+    "http_request_stage_duration_seconds", "요청 하나에서 단계별로 쓴 시간 합계", ["route", "stage"], buckets=_REQUEST_BUCKETS
+)
+LLM_CALL_SECONDS = Histogram(
+    "llm_call_duration_seconds", "OpenAI 호출 시간 (속도 제한 대기 제외)", ["memo_type", "mode", "outcome"], buckets=_LLM_BUCKETS
+)
+LLM_TOKENS = Counter("llm_tokens", "OpenAI 사용 토큰 수 (스트리밍은 추정치)", ["memo_type", "kind"])
+LLM_PROMPT_TOKENS = Histogram(
+    "llm_prompt_tokens", "보내기 전에 센 프롬프트 토큰 수", ["memo_type", "model"],
+    buckets=(100, 250, 500, 1000, 2000, 4000, 8000, 16000),
+)
+LLM_PROMPT_TRIMMED = Counter("llm_prompt_trimmed", "토큰 예산을 넘어 참고 자료/본문을 잘라낸 프롬프트 수", ["memo_type"])
+DB_QUERY_SECONDS = Histogram("db_query_duration_seconds", "SQL 문 실행 시간", ["operation"], buckets=_DB_BUCKETS)
+
+
+class _RequestTimings:
+    """요청 하나의 단계별 시간 (단계는 겹칠 수 있음, 예: prompt 안의 web_search)"""
+
+    __slots__ = ("stages", "handler_end")
+
+    def __init__(self):
+        self.stages: Dict[str, List[float]] = {}
+        self.handler_end: Optional[float] = None
+
+    def add(self, name: str, seconds: float):
+        entry = self.stages.setdefault(name, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+
+
+_timings: ContextVar[Optional[_RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def record_stage(name: str, seconds: float):
+    """현재 요청의 단계 시간에 더함 (요청 밖에서 호출되면 무시)"""
+    timings = _timings.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+@contextmanager
+def stage(name: str):
+    """블록 실행 시간을 현재 요청의 name 단계로 기록"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - started)
+
+
+class MetricsMiddleware:
+    """라우트별 요청 지연과 단계별 시간을 기록하는 ASGI 미들웨어
+
+    요청에 `X-Timing: 1` 헤더가 있으면 응답에 단계별 시간을 `Server-Timing` 헤더로 붙인다.
+    스트리밍 응답은 헤더를 먼저 보내므로 첫 응답까지의 시간만 담긴다.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.metrics_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        timings = _RequestTimings()
+        token = _timings.set(timings)
+        want_header = Headers(scope=scope).get("x-timing") == "1"
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                now = time.perf_counter()
+                if timings.handler_end is not None:
+                    # 엔드포인트 반환 후 응답 모델 검증과 JSON 직렬화에 쓴 시간
+                    timings.add("serialize", now - timings.handler_end)
+                if want_header:
+                    MutableHeaders(scope=message).append("Server-Timing", _server_timing(timings, now - started))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            elapsed = time.perf_counter() - started
+            route = scope.get("route")
+            path = route.path if route is not None else "unmatched"
+            HTTP_REQUEST_SECONDS.labels(scope["method"], path, str(status)).observe(elapsed)
+            for name, (seconds, _) in timings.stages.items():
+                REQUEST_STAGE_SECONDS.labels(path, name).observe(seconds)
+            _timings.reset(token)
+
+
+def _server_timing(timings: _RequestTimings, total: float) -> str:
+    entries = [
+        f'{name};dur={seconds * 1000:.1f};desc="{count}x"' for name, (seconds, count) in timings.stages.items()
+    ]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+class TimedRoute(APIRoute):
+    """엔드포인트 함수 실행 시간을 handler 단계로 기록하는 라우트 (직렬화 시간과 구분하기 위해)"""
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        # include_router가 같은 엔드포인트로 라우트를 다시 만들 때 두 번 감싸지 않도록
+        if inspect.iscoroutinefunction(endpoint) and not getattr(endpoint, "_timed", False):
+            endpoint = _timed_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+def _timed_endpoint(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            now = time.perf_counter()
+            record_stage("handler", now - started)
+            timings = _timings.get()
+            if timings is not None:
+                timings.handler_end = now
+
+    wrapper._timed = True
+    return wrapper
+
+
+def instrument_engine(engine):
+    """SQL 문 실행 시간을 db 단계와 db_query_duration_seconds에 기록 (실패한 문은 operation=ERROR)"""
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+        DB_QUERY_SECONDS.labels(operation if operation in _DB_OPERATIONS else "OTHER").observe(elapsed)
+        record_stage("db", elapsed)
+
+    def handle_error(exception_context):
+        # 실패한 문은 after_cursor_execute가 불리지 않으므로 여기서 시작 시각을 꺼냄
+        # (남겨 두면 풀에 돌아간 연결에 계속 쌓임), 연결이나 문 준비 중 실패해서 넣은 적이 없으면 건너뜀
+        conn = exception_context.connection
+        started = conn.info.get("query_started") if conn is not None and exception_context.execution_context else None
+        if started:
+            elapsed = time.perf_counter() - started.pop()
+            DB_QUERY_SECONDS.labels("ERROR").observe(elapsed)
+            record_stage("db", elapsed)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine, "handle_error", handle_error)
+
+
+class _ServiceStatsCollector:
+    """서비스 객체가 이미 세고 있는 카운터(응답 캐시, 동시 요청 합치기, 속도 제한)를 수집 시점에 노출"""
+
+    def describe(self):
+        # 등록 시점에 collect()로 이름을 확인하지 않도록 (서비스 모듈은 수집할 때 임포트)
+        return []
+
+    def collect(self):
+        from app.services.llm_cache import llm_cache
+        from app.services.rate_limiter import rate_limiter
+        from app.services.single_flight import single_flight
+
+        cache = llm_cache.stats()
+        yield CounterMetricFamily("llm_cache_hits", "LLM 응답 캐시 히트 수", value=cache["hits"])
+        yield CounterMetricFamily("llm_cache_misses", "LLM 응답 캐시 미스 수", value=cache["misses"])
+        yield GaugeMetricFamily("llm_cache_hit_ratio", "LLM 응답 캐시 히트율", value=cache["hit_ratio"])
+
+        flights = single_flight.stats()
+        yield CounterMetricFamily("llm_single_flight_calls", "AI 생성 호출 수", value=flights["calls"])
+        yield CounterMetricFamily("llm_single_flight_collapsed", "진행 중인 호출에 합쳐진 호출 수", value=flights["collapsed"])
+
+        limits = rate_limiter.stats()
+        yield CounterMetricFamily("llm_rate_limited", "OpenAI 429 응답 수", value=limits["rate_limited"])
+        yield CounterMetricFamily("llm_rate_limit_timeouts", "속도 제한 대기 시간 초과 수", value=limits["timeouts"])
+        wait = CounterMetricFamily("llm_rate_limit_wait_seconds", "속도 제한 대기 시간 합계", labels=["priority"])
+        for priority, seconds in limits["wait_seconds"].items():
+            wait.add_metric([priority], seconds)
+        yield wait
+
+
+REGISTRY.register(_ServiceStatsCollector())
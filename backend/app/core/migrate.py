@@ -0,0 +1,20 @@
+"""배포 시 DB 준비 (스키마 마이그레이션 + 연관 노트 색인 동기화)
+
+API 서버를 (다시) 띄우기 전에 한 번 실행한다. backend 디렉터리에서:
+
+    python -m app.core.migrate
+
+스키마만 바꿀 때는 `alembic upgrade head`로도 된다 (연관 노트 색인은 다음 실행 때 맞춰짐).
+"""
+import logging
+
+from app.core.database import init_db
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    init_db()
+
+
+if __name__ == "__main__":
+    main()
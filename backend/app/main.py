@@ -1,16 +1,39 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from app.core.config import settings
-from app.core.database import engine, Base
-from app.api import documents, ai_memos
+from app.core.database import async_engine, engine
+from app.core.compression import CompressionMiddleware
+from app.core.metrics import MetricsMiddleware, instrument_engine
+from app.api import documents, ai_memos, search
+from app.services.job_queue import ai_job_queue
+from app.services.ai_service import shutdown_ai_services
+from app.services.related import shutdown_workers, start_workers
+from app.services.web_search import web_search
 
-# 데이터베이스 테이블 생성
-Base.metadata.create_all(bind=engine)
+# 스키마는 배포 시 마이그레이션으로 만든다 (python -m app.core.migrate), 워커 시작 시에는 DB 작업 없음
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 일괄 생성 문서의 연관 노트 벡터 계산 작업자 (다른 작업을 시작하기 전에 fork)
+    start_workers()
+    # AI 메모 생성 작업자 (AI_JOB_WORKERS=0이면 작업 저장만 하고 실행은 별도 프로세스에 맡김)
+    ai_job_queue.start()
+    yield
+    await ai_job_queue.stop()
+    # 연관 노트 벡터 계산 작업자 프로세스 정리
+    shutdown_workers()
+    # 공유 OpenAI/웹 검색 커넥션 풀과 비동기 DB 커넥션 풀 정리
+    await shutdown_ai_services()
+    await web_search.aclose()
+    await async_engine.dispose()
 
 app = FastAPI(
     title="AI Note App API",
     description="AI의 도움을 받는 노트 정리 웹 애플리케이션 API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS 설정
@@ -22,9 +45,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 큰 HTML 응답 압축 (지표 미들웨어 안쪽이라 압축 시간도 요청 시간에 포함)
+app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_minimum_size)
+
+# 라우트별 지연/단계별 시간 기록 (X-Timing: 1 요청 헤더로 Server-Timing 응답 헤더 확인)
+app.add_middleware(MetricsMiddleware)
+for _engine in (engine, async_engine.sync_engine):
+    instrument_engine(_engine)
+
 # 라우터 등록
 app.include_router(documents.router, prefix="/api/v1")
 app.include_router(ai_memos.router, prefix="/api/v1")
+app.include_router(search.router, prefix="/api/v1")
 
 @app.get("/")
 async def root():
@@ -34,8 +66,17 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus 수집용 지표 (워커 프로세스별 값)"""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 if __name__ == "__main__":
     import uvicorn
+    from app.core.database import init_db
+
+    # 개발 서버로 직접 실행할 때는 마이그레이션까지 적용
+    init_db()
     uvicorn.run(
         "app.main:app",
         host=settings.host,
@@ -0,0 +1,40 @@
+from typing import Iterable
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Index, update
+from app.core.database import Base, utcnow
+
+class AIJob(Base):
+    """AI 메모 생성 작업 (DB 테이블이 곧 작업 큐)"""
+    __tablename__ = "ai_jobs"
+    __table_args__ = (
+        # 작업자가 실행할 작업을 찾을 때 (status, next_run_at) 순으로 조회
+        Index("ix_ai_jobs_status_next_run_at", "status", "next_run_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(String, nullable=False, default="queued")  # 'queued', 'running', 'succeeded', 'failed'
+    type = Column(String, nullable=False)
+    content = Column(Text, nullable=False)
+    prompt = Column(Text, nullable=True)
+    use_cache = Column(Boolean, nullable=True)
+    # 문서/메모가 지워져도 작업 기록은 남도록 외래 키를 두지 않음
+    document_id = Column(Integer, nullable=False)
+    user_id = Column(Integer, nullable=True)  # 사용자별 공정 분배 기준 (없으면 익명 사용자 하나로 취급)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_run_at = Column(DateTime(timezone=True), default=utcnow)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    error = Column(Text, nullable=True)
+    memo_id = Column(Integer, nullable=True)
+    created_at = Column(DateTime(timezone=True), default=utcnow)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+
+def cancel_document_jobs(connection, document_ids: Iterable[int]):
+    """지워지는 문서들의 대기 중인 작업을 실패로 끝냄 (실행 중인 작업은 저장할 때 문서가 없어서 실패)"""
+    ids = set(document_ids)
+    if ids:
+        connection.execute(
+            update(AIJob)
+            .where(AIJob.document_id.in_(ids), AIJob.status == "queued")
+            .values(status="failed", error="Document deleted", finished_at=utcnow())
+        )
@@ -1,18 +1,49 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON
+from typing import Iterable
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Index, event, update
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
+from app.models.document import Document
+from app.models.types import CompressedText
 
 class AIMemo(Base):
     __tablename__ = "ai_memos"
+    __table_args__ = (
+        # 문서별 메모 조회 (document_id로 거르고 id 순으로 정렬)
+        Index("ix_ai_memos_document_id_id", "document_id", "id"),
+        # 문서의 특정 구간(화면에 보이는 부분)에 앵커가 걸친 메모 조회, 앵커 이동 대상 선택 (색인만 읽음)
+        Index("ix_ai_memos_document_id_anchor", "document_id", "anchor_position", "anchor_end"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     document_id = Column(Integer, ForeignKey("documents.id"), nullable=False)
     type = Column(String, nullable=False)  # 'summary', 'brainstorm', 'publish'
-    content = Column(Text, nullable=False)
+    content = Column(CompressedText, nullable=False)
+    # 본문에서 메모가 가리키는 [anchor_position, anchor_end) 구간 (UTF-16 위치, anchor_end가 없으면 한 점)
+    # 문서가 수정되면 app.services.anchors가 함께 옮김
     anchor_position = Column(Integer, nullable=True)
+    anchor_end = Column(Integer, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     memo_metadata = Column(JSON, nullable=True)  # sources, confidence, prompt 등
     
     # Relationships
     document = relationship("Document", back_populates="ai_memos")
+
+
+def bump_memo_version(connection, document_ids: Iterable[int]):
+    """문서들의 memo_version 증가 (문서 수정 시각과 버전은 그대로)"""
+    documents = Document.__table__
+    ids = set(document_ids)
+    if ids:
+        connection.execute(
+            update(documents)
+            .where(documents.c.id.in_(ids))
+            .values(memo_version=documents.c.memo_version + 1, updated_at=documents.c.updated_at)
+        )
+
+
+@event.listens_for(AIMemo, "after_insert")
+@event.listens_for(AIMemo, "after_update")
+@event.listens_for(AIMemo, "after_delete")
+def _memo_changed(mapper, connection, target):
+    bump_memo_version(connection, [target.document_id])
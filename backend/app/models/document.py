@@ -1,21 +1,60 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from typing import Optional
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, JSON, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from app.core.database import Base
+from app.core.database import Base, utcnow
+from app.models.types import CompressedText
 
 class Document(Base):
     __tablename__ = "documents"
+    __table_args__ = (
+        # 사용자별 목록 조회 keyset 페이지네이션 (user_id로 거르고 updated_at DESC, id DESC)
+        Index("ix_documents_user_id_updated_at_id", "user_id", "updated_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False, default="새 문서")
-    content = Column(Text, default="")
+    # 큰 HTML 본문은 압축해서 저장 (CONTENT_COMPRESSION)
+    content = Column(CompressedText, default="")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), default=utcnow, onupdate=utcnow)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    # 낙관적 동시성 제어용 버전 (ORM UPDATE마다 1씩 증가)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    
+    # AI 메모가 생기거나 바뀌거나 지워질 때마다 1씩 증가 (조회 ETag용, 자동 저장 버전 검사와는 별개)
+    memo_version = Column(Integer, nullable=False, default=0, server_default="0")
+    
+    __mapper_args__ = {"version_id_col": version}
     
     # Relationships
     user = relationship("User", back_populates="documents")
-    ai_memos = relationship("AIMemo", back_populates="document", cascade="all, delete-orphan")
+    ai_memos = relationship(
+        "AIMemo", back_populates="document", cascade="all, delete-orphan", order_by="AIMemo.id"
+    )
+
+def owned_by(user_id: Optional[int]):
+    """user_id 사용자의 문서 조건 (None은 익명 사용자, IS NULL로 비교해야 색인을 씀)"""
+    return Document.user_id.is_(None) if user_id is None else Document.user_id == user_id
+
+class DocumentRevision(Base):
+    """문서 변경 기록 (append-only)
+
+    보통은 적용한 편집 연산(ops)만 저장하고, 일정 간격 또는 전체 덮어쓰기 때는 본문 전체(snapshot)를 저장한다.
+    특정 버전의 본문은 그 이전의 가장 가까운 snapshot에 이후 ops를 차례로 적용해 복원한다.
+    """
+    __tablename__ = "document_revisions"
+    __table_args__ = (
+        UniqueConstraint("document_id", "version", name="uq_document_revisions_document_id_version"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False)
+    version = Column(Integer, nullable=False)
+    ops = Column(JSON, nullable=True)
+    snapshot = Column(CompressedText, nullable=True)
+    title = Column(String, nullable=True)  # 제목이 바뀐 버전에만 기록
+    created_at = Column(DateTime(timezone=True), default=utcnow)
 
 class User(Base):
     __tablename__ = "users"
@@ -0,0 +1,92 @@
+"""본문 압축 저장용 컬럼 타입
+
+큰 HTML 본문(문서 본문, AI 메모, 변경 기록 snapshot)을 압축해서 BLOB/bytea로 저장한다.
+압축한 값은 UTF-8에 나올 수 없는 0xFF 바이트와 코덱 번호로 시작하고, 그 외 값은 UTF-8 평문이다.
+그래서 압축하기 전에 저장한 행(SQLite TEXT 값, PostgreSQL에서 bytea로 바꾼 값)도 그대로 읽힌다.
+"""
+import zlib
+from typing import Optional, Union
+
+from sqlalchemy import LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+from app.core.config import settings
+
+try:
+    import zstandard
+except ImportError:  # 선택 의존성: 없으면 zlib로 압축
+    zstandard = None
+
+_MARKER = 0xFF
+_ZLIB = 1
+_ZSTD = 2
+_ZLIB_LEVEL = 6
+_ZSTD_LEVEL = 3
+
+
+def _codec() -> Optional[int]:
+    if settings.content_compression == "zstd" and zstandard is not None:
+        return _ZSTD
+    if settings.content_compression in ("zlib", "zstd"):
+        return _ZLIB
+    return None
+
+
+def compress_text(value: str) -> bytes:
+    """저장할 값 (기준 크기 이상이고 압축해서 작아질 때만 압축)"""
+    raw = value.encode("utf-8")
+    codec = _codec()
+    if codec is None or len(raw) < settings.content_compression_min_size:
+        return raw
+    if codec == _ZSTD:
+        compressed = zstandard.ZstdCompressor(level=_ZSTD_LEVEL).compress(raw)
+    else:
+        compressed = zlib.compress(raw, _ZLIB_LEVEL)
+    if len(compressed) + 2 >= len(raw):
+        return raw
+    return bytes((_MARKER, codec)) + compressed
+
+
+def is_compressed(data: Union[bytes, str, None]) -> bool:
+    return isinstance(data, (bytes, memoryview)) and len(data) > 1 and data[0] == _MARKER
+
+
+def decompress_text(data: Union[bytes, str], max_chars: Optional[int] = None) -> str:
+    """저장된 값을 문자열로 (max_chars를 주면 앞부분만 풀어서 그만큼 반환)"""
+    if isinstance(data, str):
+        return data if max_chars is None else data[:max_chars]
+    data = bytes(data)
+    # UTF-8 한 글자는 최대 4바이트
+    max_bytes = 0 if max_chars is None else max_chars * 4
+    if not is_compressed(data):
+        raw = data if max_chars is None else data[:max_bytes]
+    elif data[1] == _ZLIB:
+        raw = zlib.decompressobj().decompress(data[2:], max_bytes)
+    elif data[1] == _ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstd-compressed content requires the zstandard package")
+        reader = zstandard.ZstdDecompressor().stream_reader(data[2:])
+        raw = reader.read() if max_chars is None else reader.read(max_bytes)
+    else:
+        raise ValueError(f"Unknown content codec {data[1]}")
+    if max_chars is None:
+        return raw.decode("utf-8")
+    # 잘린 마지막 글자는 버림
+    return raw.decode("utf-8", errors="ignore")[:max_chars]
+
+
+class CompressedText(TypeDecorator):
+    """파이썬에서는 str, DB에는 (필요하면 압축한) 바이트로 저장"""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return compress_text(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return decompress_text(value)
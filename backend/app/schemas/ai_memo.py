@@ -1,11 +1,22 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 
+def _check_anchor(memo):
+    if memo.anchor_end is not None and (memo.anchor_position is None or memo.anchor_end < memo.anchor_position):
+        raise ValueError("anchor_end must be >= anchor_position")
+    return memo
+
 class AIMemoBase(BaseModel):
     type: str  # 'qa', 'critical-thinking', 'summary'
     content: str
-    anchor_position: Optional[int] = None
+    # 본문의 [anchor_position, anchor_end) 구간 (편집 연산과 같은 UTF-16 위치, anchor_end가 없으면 한 점)
+    anchor_position: Optional[int] = Field(None, ge=0)
+    anchor_end: Optional[int] = Field(None, ge=0)
+    
+    @model_validator(mode="after")
+    def check_anchor(self):
+        return _check_anchor(self)
 
 class AIMemoCreate(AIMemoBase):
     document_id: int
@@ -14,6 +25,28 @@ class AIMemoCreate(AIMemoBase):
 class AIMemoUpdate(BaseModel):
     content: Optional[str] = None
     memo_metadata: Optional[Dict[str, Any]] = None
+    anchor_position: Optional[int] = Field(None, ge=0)
+    anchor_end: Optional[int] = Field(None, ge=0)
+    
+    @model_validator(mode="after")
+    def check_anchor(self):
+        # 앵커는 구간 전체를 함께 바꿈 (시작만 보내면 한 점 앵커, 둘 다 null이면 앵커 제거)
+        if self.model_fields_set & {"anchor_position", "anchor_end"}:
+            self.model_fields_set.update(("anchor_position", "anchor_end"))
+        return _check_anchor(self)
+
+class AIMemoImport(AIMemoBase):
+    """문서 일괄 생성에 딸린 메모 (document_id는 새로 만든 문서 id)"""
+    memo_metadata: Optional[Dict[str, Any]] = None
+
+class AIMemoBulkCreate(BaseModel):
+    memos: List[AIMemoCreate]
+
+class AIMemoBulkUpdateItem(AIMemoUpdate):
+    id: int
+
+class AIMemoBulkUpdate(BaseModel):
+    memos: List[AIMemoBulkUpdateItem]
 
 class AIMemo(AIMemoBase):
     id: int
@@ -25,12 +58,31 @@ class AIMemo(AIMemoBase):
         from_attributes = True
 
 class AIRequest(BaseModel):
+    document_id: int  # 생성한 메모를 붙일 문서 (요청한 사용자의 문서여야 함)
     type: str  # 'qa', 'critical-thinking', 'summary'
     content: str
     context: Optional[str] = None
     prompt: Optional[str] = None
+    use_cache: Optional[bool] = None  # None이면 유형별 기본값, False면 캐시 우회
 
 class AIResponse(BaseModel):
     success: bool
     data: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
+
+class AIJobCreate(AIRequest):
+    pass
+
+class AIJob(BaseModel):
+    id: int
+    status: str  # 'queued', 'running', 'succeeded', 'failed'
+    type: str
+    document_id: int
+    attempts: int
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    memo: Optional[AIMemo] = None  # 성공한 경우 저장된 메모
+    
+    class Config:
+        from_attributes = True
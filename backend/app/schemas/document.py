@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
 
@@ -18,16 +18,89 @@ class Document(DocumentBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
     user_id: Optional[int] = None
+    version: int = 1
     
     class Config:
         from_attributes = True
 
+class PatchOp(BaseModel):
+    """[start, end) 구간을 text로 교체 (위치는 UTF-16 코드 단위, 앞 연산 적용 후 기준)"""
+    start: int = Field(..., ge=0)
+    end: int = Field(..., ge=0)
+    text: str = ""
+
+class DocumentPatch(BaseModel):
+    base_version: int
+    ops: List[PatchOp] = []
+    title: Optional[str] = None
+
+class DocumentPatchResult(BaseModel):
+    id: int
+    version: int
+    updated_at: Optional[datetime] = None
+
+class DocumentRevisionItem(BaseModel):
+    version: int
+    title: Optional[str] = None
+    created_at: Optional[datetime] = None
+    is_snapshot: bool
+    
+    class Config:
+        from_attributes = True
+
+class DocumentRevisionContent(BaseModel):
+    document_id: int
+    version: int
+    content: str
+
+class DocumentListItem(BaseModel):
+    """목록 조회용 경량 스키마 (content 제외)"""
+    id: int
+    title: str
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    user_id: Optional[int] = None
+    
+    class Config:
+        from_attributes = True
+
+class DocumentPage(BaseModel):
+    items: List[DocumentListItem]
+    next_cursor: Optional[str] = None
+
+class RelatedDocument(BaseModel):
+    """본문이 비슷한 문서 (score는 코사인 유사도)"""
+    id: int
+    title: str
+    updated_at: Optional[datetime] = None
+    score: float
+
 class DocumentWithMemos(Document):
     ai_memos: List["AIMemo"] = []
+    has_more_memos: bool = False  # memo_limit으로 잘린 경우 True
     
     class Config:
         from_attributes = True
 
+class DocumentImport(DocumentCreate):
+    """일괄 생성할 문서 (내보내기 NDJSON의 한 줄을 그대로 받을 수 있음)"""
+    ai_memos: List["AIMemoImport"] = []
+
+class DocumentBulkCreate(BaseModel):
+    documents: List[DocumentImport]
+
+class DocumentBulkUpdateItem(DocumentUpdate):
+    id: int
+
+class DocumentBulkUpdate(BaseModel):
+    documents: List[DocumentBulkUpdateItem]
+
+class BulkDelete(BaseModel):
+    ids: List[int]
+
+class BulkResult(BaseModel):
+    ids: List[int]  # 입력 순서대로 생성/삭제된 행 id
+
 class UserBase(BaseModel):
     name: str
     email: str
@@ -43,5 +116,7 @@ class User(UserBase):
         from_attributes = True
 
 # Forward reference 해결
-from .ai_memo import AIMemo
+from .ai_memo import AIMemo, AIMemoImport
 DocumentWithMemos.model_rebuild()
+DocumentImport.model_rebuild()
+DocumentBulkCreate.model_rebuild()
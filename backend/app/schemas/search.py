@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import List
+
+class SearchHit(BaseModel):
+    kind: str  # 'document', 'memo'
+    id: int
+    document_id: int
+    title: str
+    snippet: str  # HTML 이스케이프된 텍스트, 일치 구간은 <mark>로 강조
+    score: float
+
+class SearchResponse(BaseModel):
+    query: str
+    results: List[SearchHit]
@@ -1,209 +1,218 @@
-import openai
-import requests
-from bs4 import BeautifulSoup
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
+from sqlalchemy import select
 from app.core.config import settings
-import json
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import stage
+from app.models.document import Document
+from app.services.chunking import count_tokens, split_chunks
+from app.services.llm_cache import llm_cache
+from app.services.llm_client import llm_client
+from app.services.prompts import CHUNK_SUMMARY_SYSTEM, CHUNK_SUMMARY_TEMPLATE, instructions, memo_types
+from app.services.related import related_notes
+from app.services.single_flight import single_flight
+from app.services.text_utils import html_to_text
+from app.services.web_search import web_search
+import asyncio
+import hashlib
 
 class AIService:
-    def __init__(self):
-        self.openai_client = openai.OpenAI(api_key=settings.openai_api_key)
+    def __init__(self, priority: str = "interactive"):
+        # 커넥션 풀을 가진 공유 비동기 클라이언트 (인스턴스마다 새로 만들지 않음)
+        self.llm = llm_client
+        # 속도 제한 우선순위 ('interactive': 사용자가 기다리는 요청, 'background': 작업 큐)
+        self.priority = priority
     
-    async def generate_summary(self, content: str, custom_prompt: str = "") -> Dict[str, Any]:
-        """정보 요약 기능"""
-        try:
-            # 웹 검색을 통한 추가 정보 수집
-            search_results = await self._search_web(content)
-            
-            # OpenAI를 통한 요약 생성
-            prompt = f"""
-다음 내용을 요약하고, 관련 정보를 추가해주세요:
-
-내용: {content}
-
-{f"추가 지시사항: {custom_prompt}" if custom_prompt else ""}
-
-웹 검색 결과:
-{search_results}
-
-요약을 HTML 형식으로 작성해주세요. 주요 포인트는 <li> 태그로, 제목은 <h4> 태그로 감싸주세요.
-출처가 있는 경우 <strong>출처:</strong> 라고 표시해주세요.
-"""
-            
-            response = self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "당신은 전문적인 문서 요약 AI입니다. 한국어로 명확하고 정확한 요약을 제공합니다."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=1000,
-                temperature=0.3
-            )
-            
-            summary_content = response.choices[0].message.content
-            
-            return {
-                "content": summary_content,
-                "metadata": {
-                    "sources": self._extract_sources(search_results),
-                    "confidence": 0.85,
-                    "prompt": custom_prompt
-                }
-            }
-            
-        except Exception as e:
-            # API 키가 없는 경우 목업 응답 반환
-            return self._generate_mock_summary(content, custom_prompt)
-    
-    async def generate_brainstorm(self, topic: str, custom_prompt: str = "") -> Dict[str, Any]:
-        """브레인스토밍 기능"""
-        try:
-            prompt = f"""
-다음 주제에 대해 창의적이고 혁신적인 아이디어를 제안해주세요:
-
-주제: {topic}
-
-{f"추가 지시사항: {custom_prompt}" if custom_prompt else ""}
-
-다양한 관점에서 3-5개의 구체적인 아이디어를 제안하고, 각 아이디어에 대해 간단한 설명을 추가해주세요.
-HTML 형식으로 작성하며, 아이디어는 <div class="bg-blue-50 p-3 rounded"> 형태로 감싸주세요.
-"""
-            
-            response = self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "당신은 창의적인 브레인스토밍 AI입니다. 혁신적이고 실용적인 아이디어를 제안합니다."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=1200,
-                temperature=0.7
-            )
-            
-            brainstorm_content = response.choices[0].message.content
-            
-            return {
-                "content": brainstorm_content,
-                "metadata": {
-                    "confidence": 0.8,
-                    "prompt": custom_prompt
-                }
-            }
-            
-        except Exception as e:
-            return self._generate_mock_brainstorm(topic, custom_prompt)
-    
-    async def generate_publish_format(self, content: str, custom_prompt: str = "") -> Dict[str, Any]:
-        """출판 형식 변환 기능"""
-        try:
-            prompt = f"""
-다음 내용을 전문적인 출판물 형태로 다듬어주세요:
-
-내용: {content}
-
-{f"추가 지시사항: {custom_prompt}" if custom_prompt else ""}
-
-출판물에 적합한 구조와 형식을 제안하고, 가독성을 높이는 방법을 포함해주세요.
-HTML 형식으로 작성하며, 제안사항은 <ol> 또는 <ul> 태그로 정리해주세요.
-"""
-            
-            response = self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "당신은 전문적인 편집자 AI입니다. 출판물에 적합한 형식과 구조를 제안합니다."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=1000,
-                temperature=0.4
-            )
-            
-            publish_content = response.choices[0].message.content
-            
-            return {
-                "content": publish_content,
-                "metadata": {
-                    "confidence": 0.9,
-                    "prompt": custom_prompt
-                }
-            }
-            
-        except Exception as e:
-            return self._generate_mock_publish(content, custom_prompt)
-    
-    async def _search_web(self, query: str) -> str:
-        """웹 검색 (시뮬레이션)"""
-        # 실제로는 Google Search API, Bing Search API 등을 사용
-        # 현재는 목업 데이터 반환
-        return f"'{query}'에 대한 웹 검색 결과 시뮬레이션"
-    
-    def _extract_sources(self, search_results: str) -> List[str]:
-        """검색 결과에서 출처 추출"""
-        # 실제로는 검색 결과 파싱
-        return ["웹 검색 결과 1", "웹 검색 결과 2"]
-    
-    def _generate_mock_summary(self, content: str, custom_prompt: str) -> Dict[str, Any]:
-        """목업 요약 생성"""
-        return {
-            "content": f"""
-            <h4>요약</h4>
-            <p>입력하신 내용에 대한 요약입니다:</p>
-            <ul>
-                <li>주요 포인트 1: {content[:50]}...</li>
-                <li>주요 포인트 2: 관련된 중요한 정보</li>
-                <li>주요 포인트 3: 추가 고려사항</li>
-            </ul>
-            <p><strong>결론:</strong> 이 주제에 대해 더 자세히 알아보시려면 관련 자료를 참고하시기 바랍니다.</p>
-            <p><strong>출처:</strong> 웹 검색 결과 1, 웹 검색 결과 2</p>
-            """,
-            "metadata": {
-                "sources": ["웹 검색 결과 1", "웹 검색 결과 2"],
-                "confidence": 0.85,
-                "prompt": custom_prompt
-            }
-        }
-    
-    def _generate_mock_brainstorm(self, topic: str, custom_prompt: str) -> Dict[str, Any]:
-        """목업 브레인스토밍 생성"""
-        return {
-            "content": f"""
-            <h4>브레인스토밍 아이디어</h4>
-            <p><strong>주제:</strong> {topic}</p>
-            <div class="space-y-2">
-                <div class="bg-blue-50 p-3 rounded">
-                    <strong>💡 아이디어 1:</strong> 혁신적인 접근 방식
-                </div>
-                <div class="bg-green-50 p-3 rounded">
-                    <strong>🌟 아이디어 2:</strong> 창의적인 해결책
-                </div>
-                <div class="bg-purple-50 p-3 rounded">
-                    <strong>🚀 아이디어 3:</strong> 실용적인 구현 방안
-                </div>
-            </div>
-            <p class="mt-3 text-sm text-gray-600">이 아이디어들을 바탕으로 더 구체적인 계획을 세워보세요!</p>
-            """,
-            "metadata": {
-                "confidence": 0.8,
-                "prompt": custom_prompt
-            }
+    async def generate(
+        self, memo_type: str, content: str, custom_prompt: str = "", use_cache: Optional[bool] = None,
+        user_id: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """메모 유형(app.services.prompts.memo_types에 등록된 것)에 맞는 메모 생성 (실패하면 목업으로 대체하지 않고 예외를 그대로 올림)
+
+        API 키가 설정되지 않은 개발 환경에서만 (LLM_BACKEND=replay가 아니면) 목업 응답(metadata.mock=True)을 반환한다. 같은 사용자의 같은 요청(유형, 내용, 추가 지시사항)이 동시에 들어오면 OpenAI 호출 하나의 결과를 함께 받는다.
+        캐시 사용 여부는 먼저 시작한 호출의 설정을 따른다. 관련 노트 문맥은 user_id 사용자의 노트에서만 찾는다.
+        """
+        if memo_type not in memo_types:
+            raise ValueError(f"Unsupported memo type: {memo_type}")
+        return await single_flight.do(
+            ("generate", user_id, memo_type, content, custom_prompt),
+            lambda: self._generate_once(memo_type, content, custom_prompt, use_cache, user_id),
+        )
+
+    async def stream(
+        self, memo_type: str, content: str, custom_prompt: str = "", use_cache: Optional[bool] = None,
+        user_id: Optional[int] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """메모 생성 스트리밍
+
+        토큰 조각은 {"delta": str}, 마지막에는 {"result": {"content", "metadata"}} 형태로 내보낸다.
+        실패하면 예외를 그대로 올린다 (API 키가 없을 때만 목업 응답).
+        같은 사용자의 같은 요청이 이미 스트리밍 중이면 그 스트림에 합류해 지금까지의 조각부터 이어서 받는다.
+        """
+        if memo_type not in memo_types:
+            raise ValueError(f"Unsupported memo type: {memo_type}")
+
+        async for event in single_flight.stream(
+            ("stream", user_id, memo_type, content, custom_prompt),
+            lambda: self._stream_once(memo_type, content, custom_prompt, use_cache, user_id),
+        ):
+            yield event
+
+    async def _generate_once(
+        self, memo_type: str, content: str, custom_prompt: str, use_cache: Optional[bool], user_id: Optional[int]
+    ) -> Dict[str, Any]:
+        if not self.llm.configured:
+            # API 키가 없는 경우 (재생 백엔드가 아니면) 목업 응답 반환
+            return self._mock_for(memo_type, content, custom_prompt)
+        with stage("prompt"):
+            request, metadata = await self._prepare(memo_type, content, custom_prompt, user_id)
+        generated = await self.llm.chat(
+            **request, use_cache=self._use_cache(memo_type, use_cache), priority=self.priority, memo_type=memo_type
+        )
+        return {"content": generated, "metadata": metadata}
+
+    async def _stream_once(
+        self, memo_type: str, content: str, custom_prompt: str, use_cache: Optional[bool], user_id: Optional[int]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        if not self.llm.configured:
+            mock = self._mock_for(memo_type, content, custom_prompt)
+            yield {"delta": mock["content"]}
+            yield {"result": mock}
+            return
+
+        parts: List[str] = []
+        with stage("prompt"):
+            request, metadata = await self._prepare(memo_type, content, custom_prompt, user_id)
+        async for delta in self.llm.stream_chat(
+            **request, use_cache=self._use_cache(memo_type, use_cache), priority=self.priority, memo_type=memo_type
+        ):
+            parts.append(delta)
+            yield {"delta": delta}
+
+        yield {"result": {"content": "".join(parts), "metadata": metadata}}
+
+    async def _prepare(
+        self, memo_type: str, content: str, custom_prompt: str, user_id: Optional[int] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """메모 유형별 OpenAI 요청 인자와 메타데이터 구성"""
+        memo = memo_types.get(memo_type)
+        metadata: Dict[str, Any] = {"confidence": memo.confidence, "prompt": custom_prompt}
+        if memo.condense:
+            # 긴 문서는 조각별 요약을 먼저 만들고 그 결과를 생성 대상으로 사용 (map-reduce)
+            content = await self._condense(content)
+        values = {"content": content, "instructions": instructions(custom_prompt)}
+
+        if memo.reference_context:
+            # 웹 검색(또는 설정 시 연관 노트)을 통한 추가 정보 수집
+            if settings.related_notes_context:
+                values["context_label"] = "관련 노트"
+                with stage("related_notes"):
+                    values["context"], sources = await self._related_notes(content, user_id)
+            else:
+                values["context_label"] = "웹 검색 결과"
+                with stage("web_search"):
+                    values["context"], sources = await web_search.enrich(content)
+            metadata = {"sources": sources, **metadata}
+
+        request, prompt_tokens = memo.build_request(values)
+        request["prompt_tokens"] = prompt_tokens
+        metadata["model"] = request["model"]
+        return request, metadata
+
+    async def _condense(self, content: str) -> str:
+        """기준보다 긴 문서를 조각별로 요약해 한 번에 요약할 수 있는 길이로 줄임 (짧으면 그대로)"""
+        text = html_to_text(content)
+        if count_tokens(text) <= settings.summary_long_threshold_tokens:
+            return content
+
+        semaphore = asyncio.Semaphore(settings.summary_map_concurrency)
+        parts = split_chunks(text, settings.summary_chunk_tokens)
+        while True:
+            summaries = await asyncio.gather(*(self._summarize_chunk(part, semaphore) for part in parts))
+            combined = "\n".join(summaries)
+            if count_tokens(combined) <= settings.summary_long_threshold_tokens:
+                break
+            # 조각 요약을 합쳐도 길면 요약끼리 묶어서 한 번 더 줄임
+            next_parts = split_chunks(combined, settings.summary_chunk_tokens)
+            if len(next_parts) >= len(parts):
+                break
+            parts = next_parts
+        return f"(긴 문서를 {len(summaries)}개 부분으로 나누어 먼저 요약한 내용입니다)\n{combined}"
+
+    async def _summarize_chunk(self, chunk: str, semaphore: asyncio.Semaphore) -> str:
+        """조각 하나 요약 (조각 해시로 캐시하므로 문서를 고쳐도 바뀐 조각만 다시 요약)"""
+        request = {
+            "model": memo_types.get("summary").default_model,
+            "messages": [
+                {"role": "system", "content": CHUNK_SUMMARY_SYSTEM},
+                {"role": "user", "content": CHUNK_SUMMARY_TEMPLATE.render({"chunk": chunk})}
+            ],
+            "max_tokens": settings.summary_chunk_summary_tokens,
+            "temperature": 0.2
         }
+        key = llm_cache.make_key(
+            task="summary_chunk",
+            chunk=hashlib.sha256(chunk.encode("utf-8")).hexdigest(),
+            template=CHUNK_SUMMARY_TEMPLATE.source,
+            model=request["model"],
+            max_tokens=request["max_tokens"],
+        )
+        if settings.llm_cache_enabled:
+            cached = await llm_cache.aget(key)
+            if cached is not None:
+                return cached
+
+        async with semaphore:
+            summary = await single_flight.do(("summary_chunk", key), lambda: self.llm.chat(**request, priority=self.priority, memo_type="summary_chunk"))
+        if settings.llm_cache_enabled:
+            await llm_cache.aset(key, summary)
+        return summary
+
+    def _use_cache(self, memo_type: str, use_cache: Optional[bool]) -> bool:
+        """요청별 지정이 없으면 유형별 기본값 사용 (False로 캐시 우회)"""
+        if use_cache is None:
+            return memo_types.get(memo_type).cache_default
+        return use_cache
+
+    def _mock_for(self, memo_type: str, content: str, custom_prompt: str) -> Dict[str, Any]:
+        """메모 유형별 목업 응답 (실제 생성 결과와 구분할 수 있게 metadata.mock 표시)"""
+        mock = memo_types.get(memo_type).mock_response(content, custom_prompt)
+        mock["metadata"]["mock"] = True
+        return mock
     
-    def _generate_mock_publish(self, content: str, custom_prompt: str) -> Dict[str, Any]:
-        """목업 출판 형식 생성"""
-        return {
-            "content": f"""
-            <h4>출판 형식 제안</h4>
-            <p>다음과 같은 구조로 정리하면 전문적인 문서가 될 것입니다:</p>
-            <ol>
-                <li><strong>제목:</strong> 명확하고 매력적인 제목</li>
-                <li><strong>서론:</strong> 배경 및 목적</li>
-                <li><strong>본문:</strong> 세부 내용을 논리적으로 구성</li>
-                <li><strong>결론:</strong> 요약 및 향후 방향</li>
-            </ol>
-            <div class="mt-3 p-3 bg-yellow-50 rounded">
-                <strong>💡 팁:</strong> 각 섹션에 적절한 제목을 추가하고, 목록과 인용을 활용하면 가독성이 향상됩니다.
-            </div>
-            """,
-            "metadata": {
-                "confidence": 0.9,
-                "prompt": custom_prompt
-            }
-        }
+    async def _related_notes(self, content: str, user_id: Optional[int] = None, limit: int = 3) -> Tuple[str, List[str]]:
+        """user_id 사용자의 노트 중 본문과 비슷한 것을 프롬프트용 텍스트와 출처 목록으로 반환"""
+        # 벡터화와 행렬 곱은 CPU 작업이므로 스레드에서 실행
+        hits = await asyncio.to_thread(related_notes.similar, content, limit + 1, user_id)
+        # 요약 대상 문서 자신은 유사도가 거의 1이므로 제외
+        hits = [(id, score) for id, score in hits if score < 0.999][:limit]
+        documents = []
+        if hits:
+            async with AsyncSessionLocal() as db:
+                rows = (await db.scalars(select(Document).where(Document.id.in_([id for id, _ in hits])))).all()
+            by_id = {document.id: document for document in rows}
+            documents = [by_id[id] for id, _ in hits if id in by_id]
+        if not documents:
+            return "관련 노트 없음", []
+        context = "\n\n".join(
+            f"- {document.title}: {html_to_text(document.content)[:500]}" for document in documents
+        )
+        return context, [f"노트: {document.title}" for document in documents]
+
+
+# 우선순위별로 프로세스당 하나씩, 처음 쓸 때 생성 (앱 종료 시 lifespan에서 shutdown_ai_services로 정리)
+_services: Dict[str, AIService] = {}
+
+def ai_service_for(priority: str = "interactive") -> AIService:
+    service = _services.get(priority)
+    if service is None:
+        service = _services[priority] = AIService(priority=priority)
+    return service
+
+def get_ai_service() -> AIService:
+    """요청 처리용 AIService (FastAPI 의존성)"""
+    return ai_service_for("interactive")
+
+async def shutdown_ai_services():
+    """공유 OpenAI 클라이언트 정리 후 인스턴스 제거"""
+    _services.clear()
+    await llm_client.aclose()
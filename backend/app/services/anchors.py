@@ -0,0 +1,188 @@
+"""AI 메모 앵커 (문서 본문의 [anchor_position, anchor_end) 구간)
+
+앵커 위치는 편집 연산(PatchOp)과 같은 좌표, 즉 저장된 본문 문자열의 UTF-16 코드 단위 위치다.
+문서가 수정되면 같은 트랜잭션에서 그 문서의 앵커를 편집 연산에 따라 한꺼번에 옮긴다. 메모마다 본문을
+다시 찾지 않고, 연산 목록을 앵커 위치 배열 전체에 한 번에 적용한다 (numpy, DB에서는 구간 UPDATE).
+본문 전체를 바꾼 경우(PUT)는 이전 본문과 비교한 최소 편집 연산 목록으로 옮긴다.
+
+위치 이동 규칙 (연산이 [start, end)를 길이 size인 글로 바꿀 때):
+- start 앞의 위치는 그대로, end 뒤의 위치는 늘어난 길이만큼 이동
+- 바뀐 구간 경계의 위치는 start는 start로, end는 start + size로 (구간 전체를 바꾸면 앵커가 새 글을 감쌈)
+- 바뀐 구간 안쪽이나 같은 위치에 끼워 넣은 글은 앵커 시작 쪽은 뒤로, 끝 쪽은 앞으로 붙음
+  (앵커 바로 앞뒤에 입력한 글은 앵커에 포함되지 않음)
+- 앵커 구간이 모두 지워지면 지워진 위치의 한 점 앵커가 됨
+"""
+import re
+from difflib import SequenceMatcher
+from itertools import accumulate
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.orm import Session
+
+from app.models.ai_memo import AIMemo, bump_memo_version
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# 본문 전체 비교 단위 (이보다 짧은 구간만 UTF-16 코드 단위로 비교)
+_CHAR_DIFF_UNITS = 2000
+_TOKEN = re.compile(r"\w+|\s+|[^\w\s]")
+
+
+def _utf16_length(text: str) -> int:
+    return len(text.encode("utf-16-le", "surrogatepass")) // 2
+
+
+def _map_positions(positions: "np.ndarray", start: int, end: int, size: int, assoc: int) -> "np.ndarray":
+    """연산 하나를 위치 배열에 적용 (assoc: 끼워 넣은 글의 뒤(1)/앞(-1)에 붙을지)"""
+    # numpy는 워커 시작 시간을 늘리므로 처음 앵커를 옮길 때 불러옴
+    import numpy as np
+
+    mapped = np.where(positions > end, positions + size - (end - start), positions)
+    inside = (positions >= start) & (positions <= end)
+    if start == end:
+        side = np.full(positions.shape, assoc)
+    else:
+        side = np.where(positions == start, -1, np.where(positions == end, 1, assoc))
+    return np.where(inside, start + np.where(side > 0, size, 0), mapped)
+
+
+def map_anchors(starts: "np.ndarray", ends: "np.ndarray", ops: List[Dict[str, Any]]) -> Tuple["np.ndarray", "np.ndarray"]:
+    """편집 연산 목록(앞 연산 적용 후 기준, apply_ops와 같은 형식)에 따라 앵커 구간 배열을 옮김"""
+    import numpy as np
+
+    for op in ops:
+        start, end = op["start"], op["end"]
+        size = _utf16_length(op.get("text", ""))
+        starts = _map_positions(starts, start, end, size, assoc=1)
+        ends = _map_positions(ends, start, end, size, assoc=-1)
+        ends = np.maximum(starts, ends)
+    return starts, ends
+
+
+def _common_prefix(a: memoryview, b: memoryview) -> int:
+    """두 바이트 열의 공통 접두 길이 (구간 비교를 이분 탐색하므로 비교는 C의 memcmp로 함)"""
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[:middle] == b[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _changes(a: memoryview, b: memoryview, offset_a: int, offset_b: int) -> List[Tuple[int, int, int, int]]:
+    """UTF-16 바이트 열 a를 b로 바꾸는 최소 변경 구간 목록 [(a 시작, a 끝, b 시작, b 끝)] (코드 단위, offset 더함)
+
+    짧으면 코드 단위로 비교하고, 길면 단어/공백/기호 단위로 먼저 비교한 뒤 바뀐 구간 중 짧은 것만
+    코드 단위로 다시 비교한다 (긴 본문을 글자 단위로 비교하면 SequenceMatcher가 느림).
+    """
+    if (len(a) + len(b)) // 2 <= _CHAR_DIFF_UNITS:
+        matcher = SequenceMatcher(None, a.cast("H").tolist(), b.cast("H").tolist(), autojunk=False)
+        return [
+            (offset_a + i1, offset_a + i2, offset_b + j1, offset_b + j2)
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+            if tag != "equal"
+        ]
+    tokens_a = _TOKEN.findall(bytes(a).decode("utf-16-le", "surrogatepass"))
+    tokens_b = _TOKEN.findall(bytes(b).decode("utf-16-le", "surrogatepass"))
+    starts_a = list(accumulate(map(_utf16_length, tokens_a), initial=0))
+    starts_b = list(accumulate(map(_utf16_length, tokens_b), initial=0))
+    changes = []
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, tokens_a, tokens_b).get_opcodes():
+        if tag == "equal":
+            continue
+        a1, a2, b1, b2 = starts_a[i1], starts_a[i2], starts_b[j1], starts_b[j2]
+        if tag == "replace" and (a2 - a1) + (b2 - b1) <= _CHAR_DIFF_UNITS:
+            changes += _changes(a[a1 * 2:a2 * 2], b[b1 * 2:b2 * 2], offset_a + a1, offset_b + b1)
+        else:
+            changes.append((offset_a + a1, offset_a + a2, offset_b + b1, offset_b + b2))
+    return changes
+
+
+def diff_ops(old: str, new: str) -> List[Dict[str, Any]]:
+    """본문 전체를 바꾼 경우의 편집 연산 목록 (apply_ops와 같은 형식, 바뀌지 않은 구간의 앵커는 그대로 남음)
+
+    공통 앞뒤를 먼저 잘라내고 가운데만 비교한다.
+    """
+    a = memoryview((old or "").encode("utf-16-le", "surrogatepass"))
+    b = memoryview((new or "").encode("utf-16-le", "surrogatepass"))
+    prefix = _common_prefix(a, b) // 2
+    rest_a, rest_b = a[prefix * 2:], b[prefix * 2:]
+    suffix = _common_prefix(rest_a[::-1], rest_b[::-1]) // 2
+    if prefix * 2 == len(a) == len(b):
+        return []
+    changes = _changes(rest_a[:len(rest_a) - suffix * 2], rest_b[:len(rest_b) - suffix * 2], prefix, prefix)
+    # 변경 구간은 원래 본문 기준이므로 앞 연산으로 늘거나 준 길이만큼 옮김
+    ops, shift = [], 0
+    for a1, a2, b1, b2 in changes:
+        text = bytes(b[b1 * 2:b2 * 2]).decode("utf-16-le", "surrogatepass")
+        ops.append({"start": a1 + shift, "end": a2 + shift, "text": text})
+        shift += (b2 - b1) - (a2 - a1)
+    return ops
+
+
+def _affected_range(ops: List[Dict[str, Any]]) -> Tuple[int, int, int]:
+    """(low, high, delta): 연산 전 위치가 low보다 앞이면 그대로, high보다 뒤면 delta만큼만 이동"""
+    low = min(op["start"] for op in ops)
+    high = delta = 0
+    for op in ops:
+        # 연산은 앞 연산 적용 후 기준이므로 원래 위치로 되돌려서 비교
+        high = max(high, op["end"] - delta)
+        delta += _utf16_length(op.get("text", "")) - (op["end"] - op["start"])
+    return low, high, delta
+
+
+def remap_anchors(db: Session, document_id: int, ops: List[Dict[str, Any]]) -> int:
+    """문서의 앵커를 편집 연산에 따라 옮기고 옮긴 앵커 수 반환 (문서 수정과 같은 트랜잭션에서 호출)
+
+    연산 수와 관계없이 쿼리는 세 번이다. 모든 연산보다 뒤에 있는 앵커는 UPDATE 한 번으로 같은 길이만큼
+    옮기고, 연산 구간에 걸친 앵커만 한 번 읽어서 모든 연산을 메모리에서 적용한 뒤 executemany로 쓴다.
+    둘 다 (document_id, anchor_position, anchor_end) 색인 범위만 읽는다.
+    """
+    if not ops:
+        return 0
+    import numpy as np
+
+    memos = AIMemo.__table__
+    end_column = func.coalesce(memos.c.anchor_end, memos.c.anchor_position)
+    low, high, delta = _affected_range(ops)
+    # 뒤쪽 앵커를 옮기기 전에 읽어야 옮긴 앵커가 다시 걸리지 않음
+    touching = db.execute(
+        select(memos.c.id, memos.c.anchor_position, end_column, memos.c.anchor_end)
+        .where(memos.c.document_id == document_id, memos.c.anchor_position <= high, end_column >= low)
+    ).all()
+    moved = 0
+    if delta:
+        moved += db.execute(
+            update(memos)
+            .where(memos.c.document_id == document_id, memos.c.anchor_position > high)
+            .values(anchor_position=memos.c.anchor_position + delta, anchor_end=memos.c.anchor_end + delta)
+        ).rowcount
+    if touching:
+        starts = np.array([row[1] for row in touching], dtype=np.int64)
+        ends = np.array([row[2] for row in touching], dtype=np.int64)
+        new_starts, new_ends = map_anchors(starts, ends, ops)
+        changed = np.flatnonzero((new_starts != starts) | (new_ends != ends))
+        if len(changed):
+            db.execute(
+                update(memos)
+                .where(memos.c.id == bindparam("memo_id"))
+                .values(anchor_position=bindparam("new_start"), anchor_end=bindparam("new_end")),
+                [
+                    {
+                        "memo_id": touching[i][0],
+                        "new_start": int(new_starts[i]),
+                        # 한 점 앵커(anchor_end 없음)는 계속 한 점으로 남음
+                        "new_end": int(new_ends[i]) if touching[i][3] is not None else None,
+                    }
+                    for i in changed
+                ],
+            )
+            moved += len(changed)
+    if moved:
+        # ORM 이벤트를 거치지 않았으므로 메모 버전(목록 ETag)은 직접 올림
+        bump_memo_version(db.connection(), [document_id])
+    return moved
@@ -0,0 +1,166 @@
+"""문서/AI 메모 일괄 생성·수정·삭제 (가져오기용)
+
+요청 하나의 모든 행을 트랜잭션 하나에서 처리한다 (SQLite면 fsync 한 번). 생성과 삭제는 행마다 ORM
+단위 작업을 거치지 않고 여러 행을 한 번에 보내는 INSERT/DELETE를 쓰므로, ORM 이벤트가 하던 전문 검색/
+연관 노트 색인 갱신을 직접 한다. 수정은 버전 검사와 변경 기록을 위해 ORM으로 한 번에 flush한다.
+모두 AsyncSession.run_sync로 호출하며, user_id 사용자(None은 익명 사용자)의 문서와 그 메모만 다룬다.
+"""
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.ai_job import cancel_document_jobs
+from app.models.ai_memo import AIMemo, bump_memo_version
+from app.models.document import Document, DocumentRevision, owned_by
+from app.services import related, search
+from app.services.anchors import diff_ops, remap_anchors
+from app.services.revisions import record_revision
+
+
+class MissingRowsError(Exception):
+    """요청에 없는 행의 id가 들어 있음 (아무것도 바꾸지 않음)"""
+
+    def __init__(self, ids: List[int]):
+        super().__init__(f"Not found: {ids}")
+        self.ids = ids
+
+
+def _require(db: Session, column, ids: List[int], owner) -> List[int]:
+    """ids가 모두 있고 owner 조건에 맞는지 확인하고 중복을 뺀 목록 반환 (하나라도 아니면 MissingRowsError)
+
+    다른 사용자의 행은 없는 행과 똑같이 취급한다 (있는지 여부도 알려주지 않음).
+    """
+    found = set(db.scalars(select(column).where(column.in_(set(ids)), owner)).all())
+    missing = sorted(set(ids) - found)
+    if missing:
+        raise MissingRowsError(missing)
+    return list(dict.fromkeys(ids))
+
+
+def create_documents(db: Session, documents: List[Dict[str, Any]], user_id: Optional[int] = None) -> List[int]:
+    """문서(각각 ai_memos 목록 포함 가능) 일괄 생성, 입력 순서대로 문서 id 반환
+
+    연관 노트 색인은 커밋 후 호출 측에서 related.upsert_documents로 반영한다.
+    """
+    if not documents:
+        return []
+    rows = [{"title": d["title"], "content": d["content"], "user_id": user_id} for d in documents]
+    ids = _insert_returning_ids(db, Document, rows)
+    conn = db.connection()
+    search.index_documents(conn, [{"id": id, "title": row["title"], "content": row["content"]} for id, row in zip(ids, rows)])
+
+    memos = [
+        {**memo, "document_id": id}
+        for id, document in zip(ids, documents)
+        for memo in document.get("ai_memos") or []
+    ]
+    _insert_memos(db, memos)
+    return ids
+
+
+def update_documents(db: Session, updates: List[Dict[str, Any]], user_id: Optional[int] = None) -> List[Document]:
+    """문서 일괄 수정 (같은 id가 여러 번 있으면 뒤의 값이 이김), 수정한 문서 목록 반환
+
+    다른 저장과 겹치면 flush에서 StaleDataError가 나므로 호출 측에서 롤백한다.
+    """
+    by_id = {update["id"]: update for update in updates}
+    _require(db, Document.id, list(by_id), owned_by(user_id))
+    documents = {d.id: d for d in db.scalars(select(Document).where(Document.id.in_(by_id)))}
+
+    base = {id: (document.version, document.content) for id, document in documents.items()}
+    for id, update in by_id.items():
+        for field, value in update.items():
+            if field != "id":
+                setattr(documents[id], field, value)
+    db.flush()
+
+    for id, update in by_id.items():
+        document = documents[id]
+        base_version, base_content = base[id]
+        if document.version != base_version:
+            # PUT과 같은 기록 방식 (본문이 바뀌면 전체 snapshot, 제목만 바뀌면 빈 연산)
+            record_revision(
+                db, document, base_content,
+                ops=None if "content" in update else [],
+                title=update.get("title"),
+            )
+            if "content" in update:
+                remap_anchors(db, id, diff_ops(base_content, document.content))
+    return [documents[id] for id in by_id]
+
+
+def delete_documents(db: Session, ids: List[int], user_id: Optional[int] = None) -> List[int]:
+    """문서와 그 AI 메모, 변경 기록 일괄 삭제"""
+    ids = _require(db, Document.id, ids, owned_by(user_id))
+    memo_ids = db.scalars(select(AIMemo.id).where(AIMemo.document_id.in_(ids))).all()
+    db.execute(delete(DocumentRevision).where(DocumentRevision.document_id.in_(ids)))
+    db.execute(delete(AIMemo).where(AIMemo.document_id.in_(ids)), execution_options={"synchronize_session": False})
+    db.execute(delete(Document).where(Document.id.in_(ids)), execution_options={"synchronize_session": False})
+    cancel_document_jobs(db.connection(), ids)
+
+    conn = db.connection()
+    search.remove_memos(conn, list(memo_ids))
+    search.remove_documents(conn, ids)
+    related.stage_removed(db, ids)
+    return ids
+
+
+def create_memos(db: Session, memos: List[Dict[str, Any]], user_id: Optional[int] = None) -> List[int]:
+    """AI 메모 일괄 생성, 입력 순서대로 메모 id 반환"""
+    _require(db, Document.id, [memo["document_id"] for memo in memos], owned_by(user_id))
+    return _insert_memos(db, memos)
+
+
+def update_memos(db: Session, updates: List[Dict[str, Any]], user_id: Optional[int] = None) -> List[AIMemo]:
+    """AI 메모 일괄 수정 (색인은 ORM 이벤트가 갱신)"""
+    by_id = {update["id"]: update for update in updates}
+    _require(db, AIMemo.id, list(by_id), AIMemo.document.has(owned_by(user_id)))
+    memos = {m.id: m for m in db.scalars(select(AIMemo).where(AIMemo.id.in_(by_id)))}
+    for id, update in by_id.items():
+        for field, value in update.items():
+            if field != "id":
+                setattr(memos[id], field, value)
+    db.flush()
+    return [memos[id] for id in by_id]
+
+
+def delete_memos(db: Session, ids: List[int], user_id: Optional[int] = None) -> List[int]:
+    ids = _require(db, AIMemo.id, ids, AIMemo.document.has(owned_by(user_id)))
+    document_ids = db.scalars(select(AIMemo.document_id).where(AIMemo.id.in_(ids))).all()
+    bump_memo_version(db.connection(), document_ids)
+    db.execute(delete(AIMemo).where(AIMemo.id.in_(ids)), execution_options={"synchronize_session": False})
+    search.remove_memos(db.connection(), ids)
+    return ids
+
+
+def _insert_returning_ids(db: Session, model, rows: List[Dict[str, Any]]) -> List[int]:
+    """여러 행 INSERT 후 입력 순서대로 id 반환
+
+    SQLite는 RETURNING 순서를 입력 순서에 맞추는 방법(sort_by_parameter_order)이 없어서 요청하면 행마다
+    INSERT를 따로 보낸다. 쓰기 트랜잭션 안에서 INTEGER PRIMARY KEY는 VALUES 순서대로 증가하므로
+    여러 행 INSERT로 받은 id를 정렬해서 쓴다.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        return sorted(db.scalars(insert(model).returning(model.id), rows).all())
+    return list(db.scalars(insert(model).returning(model.id, sort_by_parameter_order=True), rows).all())
+
+
+def _insert_memos(db: Session, memos: List[Dict[str, Any]]) -> List[int]:
+    if not memos:
+        return []
+    rows = [
+        {
+            "document_id": memo["document_id"],
+            "type": memo["type"],
+            "content": memo["content"],
+            "anchor_position": memo.get("anchor_position"),
+            "anchor_end": memo.get("anchor_end"),
+            "memo_metadata": memo.get("memo_metadata"),
+        }
+        for memo in memos
+    ]
+    ids = _insert_returning_ids(db, AIMemo, rows)
+    bump_memo_version(db.connection(), [row["document_id"] for row in rows])
+    search.index_memos(db.connection(), [{"id": id, "content": row["content"]} for id, row in zip(ids, rows)])
+    return ids
@@ -0,0 +1,102 @@
+import math
+import re
+import zlib
+from functools import lru_cache
+from typing import List
+
+try:
+    import tiktoken
+except ImportError:  # 선택 의존성: 없으면 문자 수 기반으로 토큰 수 추정
+    tiktoken = None
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?。])\s+")
+
+
+@lru_cache(maxsize=None)
+def _encoding(model: str):
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except Exception:
+        # 모르는 모델이거나 BPE 파일을 받을 수 없는 환경
+        return None
+
+
+def count_tokens(text: str, model: str = "gpt-3.5-turbo") -> int:
+    """모델 토크나이저 기준 토큰 수 (tiktoken이 없으면 보수적으로 추정)"""
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    # 영문은 대략 4글자에 1토큰, 한글 등 비ASCII 문자는 글자당 1토큰 이상
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return math.ceil(ascii_chars / 4) + (len(text) - ascii_chars)
+
+
+def truncate_tokens(text: str, max_tokens: int, model: str = "gpt-3.5-turbo") -> str:
+    """앞에서부터 max_tokens 토큰 이하로 자름"""
+    if max_tokens <= 0 or not text:
+        return ""
+    encoding = _encoding(model)
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    # 추정치는 길이에 따라 단조 증가하므로 이분 탐색
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens(text[:middle], model) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low]
+
+
+def split_chunks(text: str, max_tokens: int, model: str = "gpt-3.5-turbo") -> List[str]:
+    """평문을 문단 경계에서 max_tokens 이하 조각으로 나눔
+
+    조각 경계는 크기만이 아니라 문단 내용(해시)으로도 정해지므로, 앞쪽 문단을 고쳐도 다음 내용 기반
+    경계부터는 이전과 같은 조각이 만들어진다 (조각별 요약 캐시가 수정된 부분만 다시 요약하도록).
+    한 문단이 max_tokens를 넘으면 문장, 그래도 넘으면 글자 단위로 자른다.
+    """
+    pieces: List[str] = []
+    for paragraph in text.split("\n"):
+        paragraph = paragraph.strip()
+        if paragraph:
+            pieces.extend(_split_long(paragraph, max_tokens, model))
+
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for piece in pieces:
+        tokens = count_tokens(piece, model)
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append("\n".join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += tokens
+        # 절반 이상 찼으면 문단 해시로 경계 결정 (평균 4문단에 한 번)
+        if current_tokens >= max_tokens // 2 and zlib.crc32(piece.encode("utf-8")) % 4 == 0:
+            chunks.append("\n".join(current))
+            current, current_tokens = [], 0
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def _split_long(paragraph: str, max_tokens: int, model: str) -> List[str]:
+    if count_tokens(paragraph, model) <= max_tokens:
+        return [paragraph]
+    pieces: List[str] = []
+    for sentence in _SENTENCE_RE.split(paragraph):
+        tokens = count_tokens(sentence, model)
+        if tokens <= max_tokens:
+            pieces.append(sentence)
+            continue
+        size = max(1, len(sentence) * max_tokens // tokens)
+        pieces.extend(sentence[i:i + size] for i in range(0, len(sentence), size))
+    return pieces
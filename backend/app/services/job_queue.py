@@ -0,0 +1,254 @@
+import asyncio
+import logging
+from datetime import timedelta
+from typing import List, Optional, Union
+
+from fastapi import HTTPException
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.core.config import settings
+from app.api.documents import require_document
+from app.core.database import AsyncSessionLocal, utcnow
+from app.models.ai_job import AIJob
+from app.models.ai_memo import AIMemo
+from app.services.ai_service import ai_service_for
+
+logger = logging.getLogger(__name__)
+
+
+class AIJobQueue:
+    """DB 테이블 기반 AI 메모 생성 작업 큐
+
+    요청은 ai_jobs 행으로 저장하고 바로 반환한다. 작업자 태스크는 조건부 UPDATE로 작업을
+    하나씩 선점하므로, 여러 프로세스가 같은 테이블을 나눠 처리해도 같은 작업을 두 번 실행하지 않는다.
+    선점할 때는 실행 중인 작업이 적은 사용자의 작업을 먼저 고르고, 사용자별 동시 실행 수를 제한한다.
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        max_attempts: int = 3,
+        backoff_seconds: float = 2.0,
+        poll_interval: float = 1.0,
+        lock_timeout: float = 600,
+        max_running_per_user: int = 2,
+    ):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.poll_interval = poll_interval
+        self.lock_timeout = lock_timeout
+        self.max_running_per_user = max_running_per_user
+
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+
+    async def enqueue(
+        self,
+        db: AsyncSession,
+        memo_type: str,
+        content: str,
+        document_id: int,
+        prompt: Optional[str] = None,
+        use_cache: Optional[bool] = None,
+        user_id: Optional[int] = None,
+    ) -> AIJob:
+        """작업 저장 후 대기 중인 작업자를 깨움"""
+        job = AIJob(
+            type=memo_type,
+            content=content,
+            prompt=prompt,
+            use_cache=use_cache,
+            document_id=document_id,
+            user_id=user_id,
+        )
+        db.add(job)
+        await db.commit()
+        await db.refresh(job)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    def start(self):
+        """현재 이벤트 루프에서 작업자 태스크 시작 (workers가 0이면 저장만 하는 인스턴스)"""
+        if self._tasks or self.workers <= 0:
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self, timeout: float = 5.0):
+        """작업자 종료 (진행 중인 작업은 timeout까지 기다린 뒤 취소하고 대기열로 되돌림)"""
+        if not self._tasks:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        _, pending = await asyncio.wait(self._tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._tasks = []
+        self._wakeup = None
+
+    async def _worker(self):
+        while not self._stopping:
+            try:
+                job = await self._claim()
+            except Exception:
+                logger.exception("Failed to claim AI job")
+                job = None
+            if job is None:
+                await self._wait()
+                continue
+            try:
+                await self._run(job)
+            except asyncio.CancelledError:
+                # 종료 중이면 다른 작업자가 바로 가져갈 수 있도록 대기 상태로 되돌림
+                await asyncio.shield(self._release(job.id))
+                raise
+            except Exception:
+                logger.exception("AI job %s crashed", job.id)
+
+    async def _wait(self):
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+        if not self._stopping:
+            self._wakeup.clear()
+
+    async def _claim(self) -> Optional[AIJob]:
+        """실행할 작업 하나를 선점 (시도 횟수 증가, max_attempts번 시도한 작업은 고르지 않음)"""
+        now = utcnow()
+        async with AsyncSessionLocal() as db:
+            # 작업 중 죽은 프로세스가 잡고 있던 작업은 다시 대기열로 (시도 횟수를 다 썼으면 실패로 끝냄)
+            expired = AIJob.locked_at < now - timedelta(seconds=self.lock_timeout)
+            await db.execute(
+                update(AIJob)
+                .where(AIJob.status == "running", expired, AIJob.attempts >= self.max_attempts)
+                .values(status="failed", finished_at=now, error="Job lock expired on the last attempt")
+            )
+            await db.execute(
+                update(AIJob)
+                .where(AIJob.status == "running", expired)
+                .values(status="queued", next_run_at=now)
+            )
+            # 시도 횟수를 다 쓴 대기 작업 (max_attempts를 줄인 경우 등)은 실행하지 않고 실패로 끝냄
+            await db.execute(
+                update(AIJob)
+                .where(AIJob.status == "queued", AIJob.attempts >= self.max_attempts)
+                .values(status="failed", finished_at=now, error=func.coalesce(AIJob.error, "Max attempts exceeded"))
+            )
+
+            running = aliased(AIJob)
+            running_count = (
+                select(func.count())
+                .select_from(running)
+                .where(running.status == "running", running.user_id.is_not_distinct_from(AIJob.user_id))
+                .correlate(AIJob)
+                .scalar_subquery()
+            )
+            candidates = (await db.scalars(
+                select(AIJob.id)
+                .where(
+                    AIJob.status == "queued",
+                    AIJob.next_run_at <= now,
+                    AIJob.attempts < self.max_attempts,
+                    running_count < self.max_running_per_user,
+                )
+                .order_by(running_count, AIJob.id)
+                .limit(self.workers + 1)
+            )).all()
+
+            for job_id in candidates:
+                result = await db.execute(
+                    update(AIJob)
+                    .where(AIJob.id == job_id, AIJob.status == "queued")
+                    .values(status="running", locked_at=now, attempts=AIJob.attempts + 1)
+                )
+                if result.rowcount == 1:
+                    await db.commit()
+                    return await db.get(AIJob, job_id, populate_existing=True)
+            await db.commit()
+            return None
+
+    async def _run(self, job: AIJob):
+        # 마지막 시도까지 실패하면 목업으로 대체하지 않고 failed 상태와 오류를 남김
+        # (생성 결과 저장이 실패해도 같은 규칙으로 재시도하거나 끝냄)
+        last_attempt = job.attempts >= self.max_attempts
+        try:
+            # 사용자가 기다리는 생성 요청보다 뒤로 밀리도록 백그라운드 우선순위로 호출
+            result = await ai_service_for("background").generate(
+                job.type, job.content, job.prompt or "", job.use_cache, job.user_id
+            )
+            async with AsyncSessionLocal() as db:
+                # 외래 키 검사가 없으므로 그 사이 문서가 지워졌거나 소유자가 바뀌었는지 직접 확인
+                await require_document(db, job.document_id, job.user_id)
+                memo = AIMemo(
+                    document_id=job.document_id,
+                    type=job.type,
+                    content=result["content"],
+                    memo_metadata=result["metadata"],
+                )
+                db.add(memo)
+                await db.flush()
+                await db.execute(
+                    update(AIJob)
+                    .where(AIJob.id == job.id)
+                    .values(status="succeeded", memo_id=memo.id, error=None, finished_at=utcnow())
+                )
+                await db.commit()
+        except HTTPException as e:
+            # 문서가 없으면 다시 시도해도 저장할 곳이 없음
+            await self._fail(job, e.detail, retry=False)
+        except Exception as e:
+            await self._fail(job, e, retry=not last_attempt)
+
+    async def _fail(self, job: AIJob, error: Union[Exception, str], retry: bool):
+        now = utcnow()
+        if retry:
+            # 지수 백오프 (2초, 4초, 8초 ...)
+            delay = self.backoff_seconds * (2 ** (job.attempts - 1))
+            values = {"status": "queued", "next_run_at": now + timedelta(seconds=delay)}
+        else:
+            values = {"status": "failed", "finished_at": now}
+        async with AsyncSessionLocal() as db:
+            await db.execute(update(AIJob).where(AIJob.id == job.id).values(error=str(error), **values))
+            await db.commit()
+
+    async def _release(self, job_id: int):
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(AIJob)
+                .where(AIJob.id == job_id, AIJob.status == "running")
+                .values(status="queued", attempts=AIJob.attempts - 1, next_run_at=utcnow())
+            )
+            await db.commit()
+
+
+ai_job_queue = AIJobQueue(
+    workers=settings.ai_job_workers,
+    max_attempts=settings.ai_job_max_attempts,
+    backoff_seconds=settings.ai_job_retry_backoff_seconds,
+    poll_interval=settings.ai_job_poll_interval_seconds,
+    lock_timeout=settings.ai_job_lock_timeout_seconds,
+    max_running_per_user=settings.ai_job_max_running_per_user,
+)
+
+
+async def _run_workers():
+    ai_job_queue.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await ai_job_queue.stop()
+
+
+if __name__ == "__main__":
+    # API 서버와 별도 프로세스로 작업자만 실행 (API 쪽은 AI_JOB_WORKERS=0으로 저장만 하게 할 수 있음)
+    # 스키마는 배포 시 마이그레이션으로 준비되어 있어야 함 (python -m app.core.migrate)
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_run_workers())
@@ -0,0 +1,307 @@
+"""LLM 호출 백엔드 (llm_client가 속도 제한/재시도/지표를 거친 뒤 실제 호출을 맡기는 곳)
+
+- OpenAIBackend: OpenAI(호환) API 호출
+- RecordingBackend: 다른 백엔드를 감싸서 요청과 응답 조각(도착 시각 포함)을 녹화 저장소에 기록
+- ReplayBackend: 녹화한 응답을 네트워크 없이 돌려줌 (녹화된 시간 그대로, 또는 지정한 첫 토큰 지연/초당 토큰 수로)
+
+백엔드는 settings.llm_backend로 고르고 llm_record를 켜면 OpenAI 호출을 녹화한다.
+재생 백엔드를 쓰면 API 키 없이도 목업이 아닌 전체 생성 경로(프롬프트 구성, 속도 제한, 스트리밍, 저장)를 지난다.
+"""
+import asyncio
+import hashlib
+import itertools
+import time
+import weakref
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.core.config import settings
+from app.services.chunking import count_tokens
+from app.services.llm_recordings import LLMRecordingStore, Recording, request_key
+from app.services.rate_limiter import retry_after_seconds
+
+if TYPE_CHECKING:
+    import openai
+
+
+class LLMResponse:
+    """채팅 완성 결과 (사용량을 모르면 토큰 수는 None)"""
+
+    def __init__(self, content: str, prompt_tokens: Optional[int] = None, completion_tokens: Optional[int] = None):
+        self.content = content
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+
+
+class LLMBackend:
+    """백엔드 인터페이스
+
+    request는 model, messages, max_tokens, temperature, timeout을 담은 dict이다.
+    open_stream은 응답이 시작될 때까지 기다린 뒤 조각을 내보내는 async iterator를 돌려준다
+    (여는 중의 오류만 재시도 대상).
+    """
+
+    # False면 AIService가 호출 대신 목업 응답을 돌려줌
+    configured = True
+
+    async def complete(self, request: Dict[str, Any]) -> LLMResponse:
+        raise NotImplementedError
+
+    async def open_stream(self, request: Dict[str, Any]) -> AsyncIterator[str]:
+        raise NotImplementedError
+
+    def failure(self, error: Exception, attempt: int) -> Optional[Tuple[str, float]]:
+        """재시도할 오류면 (결과 라벨 'rate_limited' 또는 'error', 기다릴 초), 아니면 None"""
+        return None
+
+    async def aclose(self):
+        pass
+
+
+class OpenAIBackend(LLMBackend):
+    """OpenAI 비동기 클라이언트 호출
+
+    httpx 커넥션 풀은 이벤트 루프에 묶이므로 루프마다 한 번만 만들어 재사용한다.
+    openai SDK는 임포트만 수백 ms라 첫 호출 때 불러온다. SDK 자체 재시도는 끄고 llm_client가 재시도한다.
+    """
+
+    def __init__(self):
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, openai.AsyncOpenAI]" = weakref.WeakKeyDictionary()
+
+    @property
+    def configured(self) -> bool:
+        return bool(settings.openai_api_key)
+
+    def _get_client(self) -> "openai.AsyncOpenAI":
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            import openai
+
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.openai_max_connections,
+                    max_keepalive_connections=settings.openai_max_connections,
+                ),
+                timeout=settings.openai_timeout,
+            )
+            client = openai.AsyncOpenAI(
+                api_key=settings.openai_api_key,
+                base_url=settings.openai_base_url or None,
+                timeout=settings.openai_timeout,
+                max_retries=0,
+                http_client=http_client,
+            )
+            self._clients[loop] = client
+        return client
+
+    async def complete(self, request: Dict[str, Any]) -> LLMResponse:
+        response = await self._get_client().chat.completions.create(**request)
+        usage = response.usage
+        return LLMResponse(
+            response.choices[0].message.content,
+            usage.prompt_tokens if usage else None,
+            usage.completion_tokens if usage else None,
+        )
+
+    async def open_stream(self, request: Dict[str, Any]) -> AsyncIterator[str]:
+        stream = await self._get_client().chat.completions.create(**request, stream=True)
+        return self._deltas(stream)
+
+    @staticmethod
+    async def _deltas(stream) -> AsyncIterator[str]:
+        async with stream:
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield delta
+
+    def failure(self, error: Exception, attempt: int) -> Optional[Tuple[str, float]]:
+        import openai
+
+        # 429는 Retry-After(없으면 지수 백오프)만큼 모든 호출을 멈추고, 연결 오류/5xx는 잠시 기다림
+        if isinstance(error, openai.RateLimitError):
+            return "rate_limited", retry_after_seconds(error.response.headers, attempt)
+        if isinstance(error, (openai.APIConnectionError, openai.InternalServerError)):
+            return "error", min(8.0, 0.5 * 2 ** attempt)
+        return None
+
+    async def aclose(self):
+        """현재 이벤트 루프에 묶인 클라이언트 정리"""
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.close()
+
+
+class RecordingBackend(LLMBackend):
+    """감싼 백엔드의 성공한 호출을 녹화 (스트림은 끝까지 받은 것만)"""
+
+    def __init__(self, backend: LLMBackend, store: LLMRecordingStore):
+        self.backend = backend
+        self.store = store
+
+    @property
+    def configured(self) -> bool:
+        return self.backend.configured
+
+    async def complete(self, request: Dict[str, Any]) -> LLMResponse:
+        started = time.perf_counter()
+        response = await self.backend.complete(request)
+        await asyncio.to_thread(
+            self._add,
+            request,
+            "chat",
+            [[time.perf_counter() - started, response.content]],
+            response.prompt_tokens,
+            response.completion_tokens,
+        )
+        return response
+
+    async def open_stream(self, request: Dict[str, Any]) -> AsyncIterator[str]:
+        # 도착 시각은 여는 시간(첫 토큰까지의 지연)을 포함하도록 열기 전부터 잼
+        started = time.perf_counter()
+        deltas = await self.backend.open_stream(request)
+        return self._record(request, started, deltas)
+
+    async def _record(self, request: Dict[str, Any], started: float, deltas: AsyncIterator[str]) -> AsyncIterator[str]:
+        chunks: List[List[Any]] = []
+        try:
+            async for delta in deltas:
+                chunks.append([time.perf_counter() - started, delta])
+                yield delta
+        finally:
+            await deltas.aclose()
+        await asyncio.to_thread(self._add, request, "stream", chunks)
+
+    def _add(
+        self, request: Dict[str, Any], mode: str, chunks: List[List[Any]], prompt_tokens: Optional[int] = None,
+        completion_tokens: Optional[int] = None,
+    ):
+        """녹화 저장 (키 계산, 압축, SQLite 쓰기가 이벤트 루프를 막지 않도록 작업 스레드에서 호출)"""
+        if mode == "stream":
+            completion_tokens = count_tokens("".join(delta for _, delta in chunks), request["model"])
+        self.store.add(request_key(request), request["model"], mode, chunks, prompt_tokens, completion_tokens)
+
+    def failure(self, error: Exception, attempt: int) -> Optional[Tuple[str, float]]:
+        return self.backend.failure(error, attempt)
+
+    async def aclose(self):
+        await self.backend.aclose()
+
+
+class ReplayMissError(RuntimeError):
+    """재생할 녹화가 없음"""
+
+
+class ReplayBackend(LLMBackend):
+    """녹화한 응답 재생
+
+    같은 요청의 녹화가 있으면 그것을(여러 개면 차례로), 없으면 on_miss가 'any'일 때 같은 모델의 녹화 중
+    요청 키 해시로 고른 것을 돌려준다 (요청마다 항상 같은 녹화이고, 요청이 다양하면 녹화 분포를 고르게 따름).
+    'error'면 ReplayMissError.
+
+    profile:
+    - recorded: 녹화된 조각 도착 시각 그대로
+    - fixed: 첫 조각은 first_token_seconds 뒤, 이후는 tokens_per_second 속도로
+    두 경우 모두 대기 시간에 latency_scale을 곱한다 (0이면 기다리지 않음).
+    """
+
+    def __init__(
+        self,
+        store: LLMRecordingStore,
+        profile: str = "recorded",
+        latency_scale: float = 1.0,
+        first_token_seconds: float = 0.5,
+        tokens_per_second: float = 50.0,
+        on_miss: str = "any",
+    ):
+        if profile not in ("recorded", "fixed"):
+            raise ValueError(f"Unknown replay profile: {profile}")
+        if on_miss not in ("any", "error"):
+            raise ValueError(f"Unknown replay miss policy: {on_miss}")
+        self.store = store
+        self.profile = profile
+        self.latency_scale = latency_scale
+        self.first_token_seconds = first_token_seconds
+        self.tokens_per_second = tokens_per_second
+        self.on_miss = on_miss
+
+        self._turns: Dict[str, "itertools.count[int]"] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def _recording(self, request: Dict[str, Any]) -> Recording:
+        # 저장소 조회(처음엔 id 목록 전체 읽기)와 압축 풀기는 재생 지연에 섞이지 않도록 작업 스레드에서
+        key = await asyncio.to_thread(request_key, request)
+        ids = await asyncio.to_thread(self.store.ids_for_key, key)
+        if ids:
+            self.hits += 1
+            turn = self._turns.setdefault(key, itertools.count())
+            return await asyncio.to_thread(self.store.get, ids[next(turn) % len(ids)])
+        self.misses += 1
+        ids = await asyncio.to_thread(self.store.ids_for_model, request["model"]) if self.on_miss == "any" else []
+        if not ids:
+            raise ReplayMissError(f"No recording for {request['model']} request {key[:12]}")
+        return await asyncio.to_thread(
+            self.store.get, ids[int(hashlib.sha256(key.encode("ascii")).hexdigest()[:8], 16) % len(ids)]
+        )
+
+    def _schedule(self, recording: Recording) -> List[List[Any]]:
+        """[(요청 시작부터 내보낼 때까지 초, 조각)]"""
+        if self.profile == "recorded":
+            chunks = recording.chunks
+        else:
+            chunks, offset = [], self.first_token_seconds
+            for delta in self._split(recording):
+                chunks.append([offset, delta])
+                offset += count_tokens(delta, recording.model) / self.tokens_per_second if self.tokens_per_second else 0.0
+        return [[offset * self.latency_scale, delta] for offset, delta in chunks]
+
+    @staticmethod
+    def _split(recording: Recording) -> List[str]:
+        """fixed 재생용 조각 (chat으로 녹화한 응답은 한 덩어리라 단어 단위로 나눔)"""
+        if recording.mode == "stream":
+            return [delta for _, delta in recording.chunks]
+        words = recording.content.split(" ")
+        return [word + " " for word in words[:-1]] + words[-1:]
+
+    async def complete(self, request: Dict[str, Any]) -> LLMResponse:
+        recording = await self._recording(request)
+        schedule = self._schedule(recording)
+        if schedule:
+            await asyncio.sleep(schedule[-1][0])
+        return LLMResponse(recording.content, recording.prompt_tokens, recording.completion_tokens)
+
+    async def open_stream(self, request: Dict[str, Any]) -> AsyncIterator[str]:
+        return self._play(self._schedule(await self._recording(request)))
+
+    @staticmethod
+    async def _play(schedule: List[List[Any]]) -> AsyncIterator[str]:
+        # 시작 시각 기준으로 기다리므로 조각마다의 처리 지연이 쌓이지 않음
+        started = time.perf_counter()
+        for offset, delta in schedule:
+            wait = started + offset - time.perf_counter()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            yield delta
+
+
+def build_backend() -> LLMBackend:
+    """설정에 맞는 백엔드 (llm_record면 OpenAI 호출을 녹화)"""
+    if settings.llm_backend == "replay":
+        return ReplayBackend(
+            LLMRecordingStore(settings.llm_recordings_path),
+            profile=settings.llm_replay_profile,
+            latency_scale=settings.llm_replay_latency_scale,
+            first_token_seconds=settings.llm_replay_first_token_seconds,
+            tokens_per_second=settings.llm_replay_tokens_per_second,
+            on_miss=settings.llm_replay_on_miss,
+        )
+    if settings.llm_backend != "openai":
+        raise ValueError(f"Unknown LLM backend: {settings.llm_backend}")
+    if settings.llm_record:
+        return RecordingBackend(OpenAIBackend(), LLMRecordingStore(settings.llm_recordings_path))
+    return OpenAIBackend()
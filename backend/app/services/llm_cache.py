@@ -0,0 +1,217 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+
+class LLMResponseCache:
+    """LLM 응답 캐시
+
+    키는 완성된 프롬프트(messages)와 모델 파라미터의 해시이다.
+    1차는 프로세스 내 LRU, 2차는 선택적인 SQLite 파일(TTL + 용량 기반 정리)이다.
+    이벤트 루프에서는 aget/aset을 쓴다 (메모리 히트는 바로, SQLite 조회/쓰기는 스레드에서).
+    SQLite 항목의 마지막 사용 시각은 touch_seconds보다 오래됐을 때만 갱신한다 (히트마다 쓰지 않도록).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl_seconds: float = 86400,
+        sqlite_path: str = "",
+        sqlite_max_bytes: int = 64 * 1024 * 1024,
+        touch_seconds: float = 300,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.sqlite_max_bytes = sqlite_max_bytes
+        self.touch_seconds = touch_seconds
+
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        # 메모리 LRU/카운터용과 SQLite 연결용 잠금을 나눔 (스레드의 SQLite 쓰기가 메모리 히트를 막지 않도록)
+        self._lock = threading.Lock()
+        self._sqlite_lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.sqlite_hits = 0
+
+        self._sqlite: Optional[sqlite3.Connection] = None
+        self._sqlite_bytes = 0
+        if sqlite_path:
+            self._open_sqlite(sqlite_path)
+
+    @staticmethod
+    def make_key(**request: Any) -> str:
+        """요청 파라미터 전체를 정규화해서 해시한 캐시 키"""
+        payload = json.dumps(request, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._memory_get(key)
+        if value is None:
+            value = self._fallback_get(key)
+        return value
+
+    async def aget(self, key: str) -> Optional[str]:
+        """get의 비동기 버전 (SQLite 조회는 스레드에서)"""
+        value = self._memory_get(key)
+        if value is None:
+            if self._sqlite is None:
+                return self._fallback_get(key)
+            value = await asyncio.to_thread(self._fallback_get, key)
+        return value
+
+    def set(self, key: str, value: str):
+        now = time.time()
+        with self._lock:
+            self._memory_set(key, value, now + self.ttl_seconds)
+        self._locked_sqlite_set(key, value, now)
+
+    async def aset(self, key: str, value: str):
+        """set의 비동기 버전 (SQLite 쓰기는 스레드에서)"""
+        now = time.time()
+        with self._lock:
+            self._memory_set(key, value, now + self.ttl_seconds)
+        if self._sqlite is not None:
+            await asyncio.to_thread(self._locked_sqlite_set, key, value, now)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        with self._sqlite_lock:
+            if self._sqlite is not None:
+                self._sqlite.execute("DELETE FROM llm_cache")
+                self._sqlite.commit()
+                self._sqlite_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """히트/미스 카운터"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "sqlite_hits": self.sqlite_hits,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "memory_entries": len(self._memory),
+                "sqlite_bytes": self._sqlite_bytes,
+            }
+
+    def _memory_get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at > now:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._memory[key]
+            return None
+
+    def _fallback_get(self, key: str) -> Optional[str]:
+        """메모리에 없을 때 SQLite 조회 (있으면 메모리에도 넣음)"""
+        now = time.time()
+        with self._sqlite_lock:
+            value = self._sqlite_get(key, now)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self._memory_set(key, value, now + self.ttl_seconds)
+            self.hits += 1
+            self.sqlite_hits += 1
+            return value
+
+    def _locked_sqlite_set(self, key: str, value: str, now: float):
+        with self._sqlite_lock:
+            self._sqlite_set(key, value, now)
+
+    def _memory_set(self, key: str, value: str, expires_at: float):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _open_sqlite(self, path: str):
+        self._sqlite = sqlite3.connect(path, check_same_thread=False)
+        self._sqlite.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+            """
+        )
+        self._sqlite.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_last_access ON llm_cache (last_access)")
+        self._sqlite.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),))
+        self._sqlite.commit()
+        self._sqlite_bytes = self._sqlite.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+
+    def _sqlite_get(self, key: str, now: float) -> Optional[str]:
+        if self._sqlite is None:
+            return None
+        row = self._sqlite.execute(
+            "SELECT value, expires_at, last_access, size FROM llm_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at, last_access, size = row
+        if expires_at <= now:
+            self._sqlite.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self._sqlite_bytes -= size
+            self._sqlite.commit()
+            return None
+        if now - last_access > self.touch_seconds:
+            # 용량 정리 순서에만 쓰이므로 touch_seconds 단위로만 기록
+            self._sqlite.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._sqlite.commit()
+        return value
+
+    def _sqlite_set(self, key: str, value: str, now: float):
+        if self._sqlite is None:
+            return
+        size = len(value.encode("utf-8"))
+        old = self._sqlite.execute("SELECT size FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        if old is not None:
+            self._sqlite_bytes -= old[0]
+        self._sqlite.execute(
+            "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, last_access, size) VALUES (?, ?, ?, ?, ?)",
+            (key, value, now + self.ttl_seconds, now, size),
+        )
+        self._sqlite_bytes += size
+
+        # 용량 초과 시 만료된 항목부터, 그 다음 오래 사용되지 않은 항목 순으로 정리
+        if self._sqlite_bytes > self.sqlite_max_bytes:
+            self._sqlite.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+            rows = self._sqlite.execute("SELECT key, size FROM llm_cache ORDER BY last_access").fetchall()
+            total = sum(size for _, size in rows)
+            evicted = []
+            for old_key, old_size in rows:
+                if total <= self.sqlite_max_bytes:
+                    break
+                evicted.append((old_key,))
+                total -= old_size
+            self._sqlite.executemany("DELETE FROM llm_cache WHERE key = ?", evicted)
+            self._sqlite_bytes = total
+        self._sqlite.commit()
+
+
+llm_cache = LLMResponseCache(
+    max_entries=settings.llm_cache_max_entries,
+    ttl_seconds=settings.llm_cache_ttl_seconds,
+    sqlite_path=settings.llm_cache_sqlite_path,
+    sqlite_max_bytes=settings.llm_cache_sqlite_max_bytes,
+    touch_seconds=settings.llm_cache_sqlite_touch_seconds,
+)
@@ -0,0 +1,227 @@
+import asyncio
+import itertools
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import LLM_CALL_SECONDS, LLM_TOKENS, record_stage, stage
+from app.services.chunking import count_tokens
+from app.services.llm_backends import LLMBackend, build_backend
+from app.services.llm_cache import llm_cache
+from app.services.rate_limiter import rate_limiter
+
+
+class LLMClient:
+    """프로세스 단위로 공유되는 비동기 LLM 호출 엔진
+
+    실제 호출은 백엔드(app.services.llm_backends, 기본은 OpenAI)가 맡고, 여기서는 공통 처리만 한다.
+    동시 호출 제한(semaphore)은 이벤트 루프에 묶이므로 루프마다 한 번만 만들어 재사용한다.
+
+    모든 호출은 프로세스 공유 속도 제한(rate_limiter)을 거치며, 429와 일시적인 오류는
+    SDK 대신 여기서 재시도한다 (429의 Retry-After를 속도 제한에 반영하기 위해).
+    """
+
+    def __init__(self):
+        self.limiter = rate_limiter
+        self._backend: Optional[LLMBackend] = None
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+    @property
+    def backend(self) -> LLMBackend:
+        """설정으로 고른 백엔드 (처음 쓸 때 생성, 벤치마크 등에서는 직접 바꿔 끼울 수 있음)"""
+        if self._backend is None:
+            self._backend = build_backend()
+        return self._backend
+
+    @backend.setter
+    def backend(self, backend: LLMBackend):
+        self._backend = backend
+
+    @property
+    def configured(self) -> bool:
+        """실제 호출이 가능한지 (OpenAI 백엔드인데 API 키가 없으면 False)"""
+        return self.backend.configured
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(settings.openai_max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = "gpt-3.5-turbo",
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        timeout: Optional[float] = None,
+        use_cache: bool = False,
+        priority: str = "interactive",
+        memo_type: str = "other",
+        prompt_tokens: Optional[int] = None,
+    ) -> str:
+        """채팅 완성 요청 (속도 제한 + 동시 호출 수 제한 + 요청별 타임아웃)
+
+        memo_type은 지표 라벨 (유형별 지연/토큰 수 집계용), prompt_tokens는 호출 측에서 이미 센 프롬프트 토큰 수
+        """
+        cache_key = self._cache_key(use_cache, messages, model, max_tokens, temperature)
+        if cache_key:
+            cached = await llm_cache.aget(cache_key)
+            if cached is not None:
+                return cached
+
+        estimate = self._estimate_tokens(messages, model, max_tokens, prompt_tokens)
+        async with self._request(
+            estimate,
+            priority,
+            memo_type,
+            "chat",
+            model=model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            timeout=timeout or settings.openai_timeout,
+        ) as response:
+            pass
+        if response.prompt_tokens is not None and response.completion_tokens is not None:
+            self.limiter.settle(estimate, response.prompt_tokens + response.completion_tokens)
+            LLM_TOKENS.labels(memo_type, "prompt").inc(response.prompt_tokens)
+            LLM_TOKENS.labels(memo_type, "completion").inc(response.completion_tokens)
+        content = response.content
+        if cache_key:
+            await llm_cache.aset(cache_key, content)
+        return content
+
+    async def stream_chat(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = "gpt-3.5-turbo",
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        timeout: Optional[float] = None,
+        use_cache: bool = False,
+        priority: str = "interactive",
+        memo_type: str = "other",
+        prompt_tokens: Optional[int] = None,
+    ) -> AsyncIterator[str]:
+        """채팅 완성 스트리밍 요청 (도착하는 토큰 조각을 순서대로 반환)"""
+        cache_key = self._cache_key(use_cache, messages, model, max_tokens, temperature)
+        if cache_key:
+            cached = await llm_cache.aget(cache_key)
+            if cached is not None:
+                yield cached
+                return
+
+        parts: List[str] = []
+        opened = False
+        estimate = self._estimate_tokens(messages, model, max_tokens, prompt_tokens)
+        try:
+            async with self._request(
+                estimate,
+                priority,
+                memo_type,
+                "stream",
+                model=model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                timeout=timeout or settings.openai_timeout,
+            ) as deltas:
+                opened = True
+                try:
+                    async for delta in deltas:
+                        parts.append(delta)
+                        yield delta
+                finally:
+                    await deltas.aclose()
+        finally:
+            # 스트리밍 응답에는 사용량이 없으므로 프롬프트 추정치 + 받은 조각으로 계산
+            if opened:
+                completion_tokens = count_tokens("".join(parts), model)
+                self.limiter.settle(estimate, estimate - max_tokens + completion_tokens)
+                LLM_TOKENS.labels(memo_type, "prompt").inc(estimate - max_tokens)
+                LLM_TOKENS.labels(memo_type, "completion").inc(completion_tokens)
+        if cache_key:
+            await llm_cache.aset(cache_key, "".join(parts))
+
+    @asynccontextmanager
+    async def _request(self, estimate: int, priority: str, memo_type: str, mode: str, **kwargs: Any):
+        """속도 제한을 통과하고 동시 호출 슬롯을 잡은 채로 응답(또는 스트림)을 넘겨줌
+
+        대기 시간은 llm_wait, 호출(스트림이면 다 받을 때까지) 시간은 llm 단계로 기록한다. 429는 Retry-After(없으면 지수 백오프)만큼 모든 호출을 멈추게 한 뒤, 연결 오류/5xx는
+        잠시 기다린 뒤 openai_max_retries번까지 다시 보낸다. 그래도 실패하면 예외를 그대로 올린다.
+        """
+        backend = self.backend
+        semaphore = self._get_semaphore()
+        for attempt in itertools.count():
+            # 속도 제한 대기는 슬롯을 잡기 전에 (대기 중인 백그라운드 요청이 슬롯을 막지 않도록)
+            with stage("llm_wait"):
+                await self.limiter.acquire(estimate, priority)
+                await semaphore.acquire()
+            started = time.perf_counter()
+            try:
+                if mode == "stream":
+                    response = await backend.open_stream(kwargs)
+                else:
+                    response = await backend.complete(kwargs)
+            except Exception as e:
+                semaphore.release()
+                retry = backend.failure(e, attempt)
+                if retry is None:
+                    self._observe(memo_type, mode, "error", started)
+                    raise
+                outcome, delay = retry
+                self._observe(memo_type, mode, outcome, started)
+                if outcome == "rate_limited":
+                    self.limiter.on_rate_limited(delay)
+                if attempt >= settings.openai_max_retries:
+                    raise
+                if outcome != "rate_limited":
+                    await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                semaphore.release()
+                self._observe(memo_type, mode, "error", started)
+                raise
+
+            self.limiter.on_success()
+            outcome = "error"
+            try:
+                yield response
+                outcome = "ok"
+            finally:
+                semaphore.release()
+                self._observe(memo_type, mode, outcome, started)
+            return
+
+    @staticmethod
+    def _observe(memo_type: str, mode: str, outcome: str, started: float):
+        elapsed = time.perf_counter() - started
+        LLM_CALL_SECONDS.labels(memo_type, mode, outcome).observe(elapsed)
+        record_stage("llm", elapsed)
+
+    @staticmethod
+    def _estimate_tokens(messages: List[Dict[str, str]], model: str, max_tokens: int, prompt_tokens: Optional[int] = None) -> int:
+        """요청 전에 버킷에서 꺼낼 토큰 수 (프롬프트 + 최대 출력, 메시지당 형식 토큰 포함)"""
+        if prompt_tokens is None:
+            prompt_tokens = sum(count_tokens(message["content"], model) + 4 for message in messages)
+        return prompt_tokens + max_tokens
+
+    @staticmethod
+    def _cache_key(use_cache: bool, messages: List[Dict[str, str]], model: str, max_tokens: int, temperature: float) -> Optional[str]:
+        if not (use_cache and settings.llm_cache_enabled):
+            return None
+        return llm_cache.make_key(messages=messages, model=model, max_tokens=max_tokens, temperature=temperature)
+
+    async def aclose(self):
+        """현재 이벤트 루프에 묶인 클라이언트 정리"""
+        self._semaphores.pop(asyncio.get_running_loop(), None)
+        if self._backend is not None:
+            await self._backend.aclose()
+
+
+llm_client = LLMClient()
@@ -0,0 +1,178 @@
+"""LLM 호출 녹화 저장소 (SQLite 파일 하나)
+
+녹화 하나는 요청 키(모델, 메시지, max_tokens, temperature의 해시)와 응답 조각 목록이다. 조각마다 요청을
+보낸 시점부터의 도착 시각(ms)을 함께 저장하므로 첫 토큰까지의 지연과 토큰 사이 간격까지 재현할 수 있다.
+본문은 zlib으로 압축하고, 통계용 값(첫 토큰 지연, 전체 시간, 토큰 수)은 열로 따로 둔다.
+같은 키로 여러 번 녹화하면 모두 남긴다 (재생할 때 차례로 돌려씀).
+
+녹화 통계 확인 (모델/호출 방식별 지연 분포):
+
+    python -m app.services.llm_recordings ./llm_recordings.sqlite3
+"""
+import json
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional
+
+from app.services.llm_cache import llm_cache
+
+
+def request_key(request: Dict[str, Any]) -> str:
+    """녹화를 찾는 키 (응답에 영향을 주는 파라미터만, 타임아웃 등은 제외)"""
+    return llm_cache.make_key(
+        model=request["model"],
+        messages=request["messages"],
+        max_tokens=request.get("max_tokens"),
+        temperature=request.get("temperature"),
+    )
+
+
+class Recording:
+    """녹화 하나 (chunks: [(요청 시작부터 도착까지 초, 조각)] 순서대로)"""
+
+    def __init__(self, model: str, mode: str, chunks: List[List[Any]], prompt_tokens: Optional[int], completion_tokens: Optional[int]):
+        self.model = model
+        self.mode = mode
+        self.chunks = chunks
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+
+    @property
+    def content(self) -> str:
+        return "".join(delta for _, delta in self.chunks)
+
+    @property
+    def total_seconds(self) -> float:
+        return self.chunks[-1][0] if self.chunks else 0.0
+
+
+class LLMRecordingStore:
+    """녹화 저장/조회 (파일은 처음 쓸 때 열고, 재생용 id 목록은 처음 조회할 때 한 번 읽음)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._sqlite: Optional[sqlite3.Connection] = None
+        self._by_key: Optional[Dict[str, List[int]]] = None
+        self._by_model: Dict[str, List[int]] = {}
+
+    def add(self, key: str, model: str, mode: str, chunks: List[List[Any]], prompt_tokens: Optional[int] = None, completion_tokens: Optional[int] = None):
+        """녹화 추가 (도착 시각은 ms 정수로 줄여서 저장)"""
+        packed = [[round(offset * 1000), delta] for offset, delta in chunks]
+        value = zlib.compress(json.dumps(packed, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        first = packed[0][0] if packed else 0
+        total = packed[-1][0] if packed else 0
+        with self._lock:
+            db = self._db()
+            cursor = db.execute(
+                "INSERT INTO recordings (key, model, mode, created_at, first_ms, total_ms, prompt_tokens, completion_tokens, value) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, model, mode, time.time(), first, total, prompt_tokens, completion_tokens, value),
+            )
+            db.commit()
+            if self._by_key is not None:
+                self._by_key.setdefault(key, []).append(cursor.lastrowid)
+                self._by_model.setdefault(model, []).append(cursor.lastrowid)
+
+    def ids_for_key(self, key: str) -> List[int]:
+        self._load_ids()
+        return self._by_key.get(key, [])
+
+    def ids_for_model(self, model: str) -> List[int]:
+        """모델의 녹화 id 목록 (그 모델 녹화가 없으면 전체)"""
+        self._load_ids()
+        return self._by_model.get(model) or [id for ids in self._by_model.values() for id in ids]
+
+    def get(self, id: int) -> Recording:
+        with self._lock:
+            model, mode, prompt_tokens, completion_tokens, value = self._db().execute(
+                "SELECT model, mode, prompt_tokens, completion_tokens, value FROM recordings WHERE id = ?", (id,)
+            ).fetchone()
+        chunks = [[offset / 1000, delta] for offset, delta in json.loads(zlib.decompress(value))]
+        return Recording(model, mode, chunks, prompt_tokens, completion_tokens)
+
+    def latency_summary(self) -> List[Dict[str, Any]]:
+        """모델/호출 방식별 녹화 수와 첫 토큰 지연, 전체 시간, 초당 출력 토큰 수의 p50/p95"""
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT model, mode, first_ms, total_ms, completion_tokens FROM recordings ORDER BY model, mode"
+            ).fetchall()
+        groups: Dict[tuple, List[tuple]] = {}
+        for model, mode, first, total, tokens in rows:
+            groups.setdefault((model, mode), []).append((first, total, tokens))
+
+        def percentiles(values: List[float]) -> Dict[str, float]:
+            values = sorted(values)
+            if not values:
+                return {"p50": 0.0, "p95": 0.0}
+            return {"p50": values[len(values) // 2], "p95": values[min(len(values) - 1, int(len(values) * 0.95))]}
+
+        return [
+            {
+                "model": model,
+                "mode": mode,
+                "count": len(values),
+                "first_token_ms": percentiles([first for first, _, _ in values]),
+                "total_ms": percentiles([total for _, total, _ in values]),
+                "tokens_per_second": percentiles([
+                    tokens * 1000 / (total - first) for first, total, tokens in values if tokens and total > first
+                ]),
+            }
+            for (model, mode), values in groups.items()
+        ]
+
+    def _load_ids(self):
+        if self._by_key is not None:
+            return
+        with self._lock:
+            by_key: Dict[str, List[int]] = {}
+            by_model: Dict[str, List[int]] = {}
+            for id, key, model in self._db().execute("SELECT id, key, model FROM recordings ORDER BY id"):
+                by_key.setdefault(key, []).append(id)
+                by_model.setdefault(model, []).append(id)
+            self._by_key, self._by_model = by_key, by_model
+
+    def _db(self) -> sqlite3.Connection:
+        if self._sqlite is None:
+            self._sqlite = sqlite3.connect(self.path, check_same_thread=False)
+            self._sqlite.execute("PRAGMA journal_mode=WAL")
+            self._sqlite.execute(
+                """
+                CREATE TABLE IF NOT EXISTS recordings (
+                    id INTEGER PRIMARY KEY,
+                    key TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    mode TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    first_ms INTEGER NOT NULL,
+                    total_ms INTEGER NOT NULL,
+                    prompt_tokens INTEGER,
+                    completion_tokens INTEGER,
+                    value BLOB NOT NULL
+                )
+                """
+            )
+            self._sqlite.commit()
+        return self._sqlite
+
+    def close(self):
+        with self._lock:
+            if self._sqlite is not None:
+                self._sqlite.close()
+                self._sqlite = None
+
+
+if __name__ == "__main__":
+    from app.core.config import settings
+
+    store = LLMRecordingStore(sys.argv[1] if len(sys.argv) > 1 else settings.llm_recordings_path)
+    for row in store.latency_summary():
+        print(
+            f"{row['model']:<20} {row['mode']:<6} n={row['count']:<6} "
+            f"first token p50={row['first_token_ms']['p50']}ms p95={row['first_token_ms']['p95']}ms  "
+            f"total p50={row['total_ms']['p50']}ms p95={row['total_ms']['p95']}ms  "
+            f"tokens/s p50={row['tokens_per_second']['p50']:.1f}"
+        )
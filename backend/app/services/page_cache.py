@@ -0,0 +1,121 @@
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+
+
+class PageCache:
+    """웹 페이지 추출 결과 캐시 (SQLite 파일, 경로가 비어 있으면 메모리)
+
+    URL별로 추출한 제목/문단과 응답의 ETag/Last-Modified를 저장한다. fresh_seconds 안에는 그대로 쓰고,
+    지나면 조건부 요청으로 다시 확인해서 304면 본문을 받거나 파싱하지 않고 재사용한다.
+    파일은 처음 쓸 때 연다.
+    """
+
+    def __init__(self, path: str = "", fresh_seconds: float = 3600, max_bytes: int = 64 * 1024 * 1024):
+        self.path = path
+        self.fresh_seconds = fresh_seconds
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._sqlite: Optional[sqlite3.Connection] = None
+        self._bytes = 0
+
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """저장된 항목 (fresh=False면 쓰기 전에 재검증 필요), 없으면 None"""
+        now = time.time()
+        with self._lock:
+            row = self._db().execute(
+                "SELECT value, etag, last_modified, fetched_at FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, etag, last_modified, fetched_at = row
+            fresh = fetched_at + self.fresh_seconds > now
+            if fresh:
+                self.hits += 1
+            self._db().execute("UPDATE pages SET last_access = ? WHERE url = ?", (now, url))
+            self._db().commit()
+        entry = json.loads(zlib.decompress(value))
+        entry.update(etag=etag, last_modified=last_modified, fresh=fresh)
+        return entry
+
+    def set(self, url: str, title: str, passages: List[str], etag: Optional[str], last_modified: Optional[str]):
+        now = time.time()
+        value = zlib.compress(json.dumps({"title": title, "passages": passages}, ensure_ascii=False).encode("utf-8"))
+        with self._lock:
+            db = self._db()
+            old = db.execute("SELECT size FROM pages WHERE url = ?", (url,)).fetchone()
+            if old is not None:
+                self._bytes -= old[0]
+            db.execute(
+                "INSERT OR REPLACE INTO pages (url, value, etag, last_modified, fetched_at, last_access, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, value, etag, last_modified, now, now, len(value)),
+            )
+            self._bytes += len(value)
+            if self._bytes > self.max_bytes:
+                # 오래 사용되지 않은 항목부터 정리
+                rows = db.execute("SELECT url, size FROM pages ORDER BY last_access").fetchall()
+                evicted = []
+                for old_url, size in rows:
+                    if self._bytes <= self.max_bytes:
+                        break
+                    evicted.append((old_url,))
+                    self._bytes -= size
+                db.executemany("DELETE FROM pages WHERE url = ?", evicted)
+            db.commit()
+
+    def touch(self, url: str):
+        """재검증 결과 바뀌지 않음 (304), 다시 fresh_seconds 동안 그대로 사용"""
+        with self._lock:
+            self.revalidated += 1
+            self._db().execute("UPDATE pages SET fetched_at = ? WHERE url = ?", (time.time(), url))
+            self._db().commit()
+
+    def clear(self):
+        with self._lock:
+            self._db().execute("DELETE FROM pages")
+            self._db().commit()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"hits": self.hits, "revalidated": self.revalidated, "misses": self.misses, "bytes": self._bytes}
+
+    def _db(self) -> sqlite3.Connection:
+        if self._sqlite is None:
+            self._sqlite = sqlite3.connect(self.path or ":memory:", check_same_thread=False)
+            self._sqlite.execute(
+                """
+                CREATE TABLE IF NOT EXISTS pages (
+                    url TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    size INTEGER NOT NULL
+                )
+                """
+            )
+            self._sqlite.execute("CREATE INDEX IF NOT EXISTS ix_pages_last_access ON pages (last_access)")
+            self._sqlite.commit()
+            self._bytes = self._sqlite.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        return self._sqlite
+
+
+page_cache = PageCache(
+    path=settings.web_page_cache_path,
+    fresh_seconds=settings.web_page_cache_fresh_seconds,
+    max_bytes=settings.web_page_cache_max_bytes,
+)
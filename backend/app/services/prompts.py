@@ -0,0 +1,349 @@
+"""AI 메모 유형 등록부 (프롬프트 템플릿, 유형별 모델 설정, 목업 응답)
+
+템플릿은 등록할 때 한 번 파싱해 두고 요청마다 자리표시자만 채운다. 템플릿 고정 부분의 토큰 수도 모델별로
+한 번만 세므로, 보내기 전 프롬프트 크기는 채운 값의 토큰만 세서 구한다. 예산을 넘으면 유형에 정한 순서대로
+(참고 자료 → 본문) 뒤쪽을 잘라내고, 입력이 짧으면 더 싼 모델을 고른다.
+
+새 메모 유형은 memo_types.register()로 추가하면 생성/스트리밍/작업 큐 API에서 그대로 쓸 수 있다.
+"""
+import string
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import LLM_PROMPT_TOKENS, LLM_PROMPT_TRIMMED
+from app.services.chunking import count_tokens, truncate_tokens
+
+# 메시지마다 붙는 형식 토큰 (llm_client의 사용량 추정과 같은 값)
+_MESSAGE_OVERHEAD_TOKENS = 4
+
+
+class PromptTemplate:
+    """`{이름}` 자리표시자를 가진 템플릿 (한 번 파싱해서 재사용)"""
+
+    def __init__(self, source: str):
+        self.source = source
+        self._parts: List[Tuple[str, Optional[str]]] = [
+            (literal, field) for literal, field, _, _ in string.Formatter().parse(source)
+        ]
+        self.fields = tuple(field for _, field in self._parts if field is not None)
+        self._static = "".join(literal for literal, _ in self._parts)
+        self._static_tokens: Dict[str, int] = {}
+
+    def render(self, values: Dict[str, str]) -> str:
+        return "".join(literal + (values[field] if field is not None else "") for literal, field in self._parts)
+
+    def static_tokens(self, model: str) -> int:
+        """자리표시자를 뺀 고정 부분의 토큰 수 (모델별로 한 번만 셈)"""
+        tokens = self._static_tokens.get(model)
+        if tokens is None:
+            tokens = self._static_tokens[model] = count_tokens(self._static, model)
+        return tokens
+
+
+class MemoType:
+    """메모 유형 하나의 프롬프트와 생성 설정
+
+    reference_context가 True면 생성 전에 웹 검색 결과(또는 관련 노트)를 모아 `{context_label}`, `{context}`에 넣고,
+    condense가 True면 긴 본문을 조각별로 먼저 요약한다. trim_order는 예산을 넘을 때 잘라낼 자리표시자 순서.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        system: str,
+        template: str,
+        mock: str,
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        confidence: float = 0.8,
+        cache_default: bool = False,
+        model: Optional[str] = None,
+        reference_context: bool = False,
+        condense: bool = False,
+        trim_order: Iterable[str] = ("content",),
+        mock_sources: Optional[List[str]] = None,
+    ):
+        self.name = name
+        self.system = system
+        self.template = PromptTemplate(template)
+        self.mock = PromptTemplate(mock)
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.confidence = confidence
+        self.cache_default = cache_default
+        self.model = model
+        self.reference_context = reference_context
+        self.condense = condense
+        self.trim_order = tuple(trim_order)
+        self.mock_sources = mock_sources
+        self._system_tokens: Dict[str, int] = {}
+
+    @property
+    def default_model(self) -> str:
+        return self.model or settings.llm_model
+
+    def choose_model(self, input_tokens: int) -> str:
+        """입력(채운 값)이 짧으면 더 싼 모델 (유형에 모델을 정해 두었으면 그 모델)"""
+        if self.model is None and settings.llm_short_input_model and input_tokens <= settings.llm_short_input_tokens:
+            return settings.llm_short_input_model
+        return self.default_model
+
+    def build_request(self, values: Dict[str, str]) -> Tuple[Dict[str, Any], int]:
+        """OpenAI 요청 인자와 프롬프트 토큰 수 (예산을 넘으면 trim_order 순으로 잘라냄)"""
+        model = self.default_model
+        values = {field: values.get(field) or "" for field in self.template.fields}
+        sizes = {field: count_tokens(value, model) for field, value in values.items()}
+        fixed = self.template.static_tokens(model) + self._system_token_count(model) + 2 * _MESSAGE_OVERHEAD_TOKENS
+        over = fixed + sum(sizes.values()) - settings.llm_prompt_token_budget
+        if over > 0:
+            LLM_PROMPT_TRIMMED.labels(self.name).inc()
+            for field in self.trim_order:
+                if over <= 0:
+                    break
+                values[field] = truncate_tokens(values[field], max(0, sizes[field] - over), model)
+                trimmed = count_tokens(values[field], model)
+                over -= sizes[field] - trimmed
+                sizes[field] = trimmed
+
+        input_tokens = sum(sizes.values())
+        chosen = self.choose_model(input_tokens)
+        prompt_tokens = fixed + input_tokens
+        if chosen != model:
+            # 토크나이저가 다를 수 있으므로 고른 모델 기준으로 다시 셈 (짧은 입력이라 비용이 작음)
+            prompt_tokens = (
+                self.template.static_tokens(chosen) + self._system_token_count(chosen) + 2 * _MESSAGE_OVERHEAD_TOKENS
+                + sum(count_tokens(value, chosen) for value in values.values())
+            )
+        LLM_PROMPT_TOKENS.labels(self.name, chosen).observe(prompt_tokens)
+        request = {
+            "model": chosen,
+            "messages": [
+                {"role": "system", "content": self.system},
+                {"role": "user", "content": self.template.render(values)},
+            ],
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+        }
+        return request, prompt_tokens
+
+    def mock_response(self, content: str, custom_prompt: str = "") -> Dict[str, Any]:
+        """API 키가 없을 때 쓰는 목업 응답"""
+        metadata: Dict[str, Any] = {"confidence": self.confidence, "prompt": custom_prompt}
+        if self.mock_sources is not None:
+            metadata = {"sources": list(self.mock_sources), **metadata}
+        return {
+            "content": self.mock.render({"content": content, "excerpt": content[:50]}),
+            "metadata": metadata,
+        }
+
+    def _system_token_count(self, model: str) -> int:
+        tokens = self._system_tokens.get(model)
+        if tokens is None:
+            tokens = self._system_tokens[model] = count_tokens(self.system, model)
+        return tokens
+
+
+def instructions(custom_prompt: str) -> str:
+    """템플릿의 `{instructions}` 값 (추가 지시사항이 없으면 빈 줄)"""
+    return f"추가 지시사항: {custom_prompt}" if custom_prompt else ""
+
+
+class MemoTypeRegistry:
+    def __init__(self):
+        self._types: Dict[str, MemoType] = {}
+
+    def register(self, memo_type: MemoType) -> MemoType:
+        self._types[memo_type.name] = memo_type
+        return memo_type
+
+    def get(self, name: str) -> Optional[MemoType]:
+        return self._types.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._types
+
+    def names(self) -> Tuple[str, ...]:
+        return tuple(self._types)
+
+
+memo_types = MemoTypeRegistry()
+
+_SUMMARY_SYSTEM = "당신은 전문적인 문서 요약 AI입니다. 한국어로 명확하고 정확한 요약을 제공합니다."
+
+# 긴 문서 요약의 조각별 요약 프롬프트 (바꾸면 조각 요약 캐시 키도 바뀜)
+CHUNK_SUMMARY_TEMPLATE = PromptTemplate("""
+다음은 긴 문서의 일부입니다. 이 부분의 핵심 내용을 빠짐없이 간결한 문장 목록으로 요약해주세요.
+HTML 태그 없이 평문으로, 각 항목은 "- "로 시작해주세요.
+
+{chunk}
+""")
+CHUNK_SUMMARY_SYSTEM = _SUMMARY_SYSTEM
+
+memo_types.register(MemoType(
+    "summary",
+    system=_SUMMARY_SYSTEM,
+    template="""
+다음 내용을 요약하고, 관련 정보를 추가해주세요:
+
+내용: {content}
+
+{instructions}
+
+{context_label}:
+{context}
+
+요약을 HTML 형식으로 작성해주세요. 주요 포인트는 <li> 태그로, 제목은 <h4> 태그로 감싸주세요.
+출처가 있는 경우 <strong>출처:</strong> 라고 표시해주세요.
+""",
+    mock="""
+            <h4>요약</h4>
+            <p>입력하신 내용에 대한 요약입니다:</p>
+            <ul>
+                <li>주요 포인트 1: {excerpt}...</li>
+                <li>주요 포인트 2: 관련된 중요한 정보</li>
+                <li>주요 포인트 3: 추가 고려사항</li>
+            </ul>
+            <p><strong>결론:</strong> 이 주제에 대해 더 자세히 알아보시려면 관련 자료를 참고하시기 바랍니다.</p>
+            <p><strong>출처:</strong> 웹 검색 결과 1, 웹 검색 결과 2</p>
+            """,
+    max_tokens=1000,
+    temperature=0.3,
+    confidence=0.85,
+    cache_default=True,
+    reference_context=True,
+    condense=True,
+    trim_order=("context", "content"),
+    mock_sources=["웹 검색 결과 1", "웹 검색 결과 2"],
+))
+
+memo_types.register(MemoType(
+    "brainstorm",
+    system="당신은 창의적인 브레인스토밍 AI입니다. 혁신적이고 실용적인 아이디어를 제안합니다.",
+    template="""
+다음 주제에 대해 창의적이고 혁신적인 아이디어를 제안해주세요:
+
+주제: {content}
+
+{instructions}
+
+다양한 관점에서 3-5개의 구체적인 아이디어를 제안하고, 각 아이디어에 대해 간단한 설명을 추가해주세요.
+HTML 형식으로 작성하며, 아이디어는 <div class="bg-blue-50 p-3 rounded"> 형태로 감싸주세요.
+""",
+    mock="""
+            <h4>브레인스토밍 아이디어</h4>
+            <p><strong>주제:</strong> {content}</p>
+            <div class="space-y-2">
+                <div class="bg-blue-50 p-3 rounded">
+                    <strong>💡 아이디어 1:</strong> 혁신적인 접근 방식
+                </div>
+                <div class="bg-green-50 p-3 rounded">
+                    <strong>🌟 아이디어 2:</strong> 창의적인 해결책
+                </div>
+                <div class="bg-purple-50 p-3 rounded">
+                    <strong>🚀 아이디어 3:</strong> 실용적인 구현 방안
+                </div>
+            </div>
+            <p class="mt-3 text-sm text-gray-600">이 아이디어들을 바탕으로 더 구체적인 계획을 세워보세요!</p>
+            """,
+    max_tokens=1200,
+    temperature=0.7,
+    confidence=0.8,
+))
+
+memo_types.register(MemoType(
+    "publish",
+    system="당신은 전문적인 편집자 AI입니다. 출판물에 적합한 형식과 구조를 제안합니다.",
+    template="""
+다음 내용을 전문적인 출판물 형태로 다듬어주세요:
+
+내용: {content}
+
+{instructions}
+
+출판물에 적합한 구조와 형식을 제안하고, 가독성을 높이는 방법을 포함해주세요.
+HTML 형식으로 작성하며, 제안사항은 <ol> 또는 <ul> 태그로 정리해주세요.
+""",
+    mock="""
+            <h4>출판 형식 제안</h4>
+            <p>다음과 같은 구조로 정리하면 전문적인 문서가 될 것입니다:</p>
+            <ol>
+                <li><strong>제목:</strong> 명확하고 매력적인 제목</li>
+                <li><strong>서론:</strong> 배경 및 목적</li>
+                <li><strong>본문:</strong> 세부 내용을 논리적으로 구성</li>
+                <li><strong>결론:</strong> 요약 및 향후 방향</li>
+            </ol>
+            <div class="mt-3 p-3 bg-yellow-50 rounded">
+                <strong>💡 팁:</strong> 각 섹션에 적절한 제목을 추가하고, 목록과 인용을 활용하면 가독성이 향상됩니다.
+            </div>
+            """,
+    max_tokens=1000,
+    temperature=0.4,
+    confidence=0.9,
+    cache_default=True,
+))
+
+memo_types.register(MemoType(
+    "qa",
+    system="당신은 정확하고 신뢰할 수 있는 질의응답 AI입니다. 사실에 기반한 정확한 정보만 제공하고, 추측이나 불확실한 내용은 피합니다.",
+    template="""
+다음 질문에 대해 정확하고 도움이 되는 답변을 제공해주세요:
+
+질문: {content}
+
+{instructions}
+
+답변 요구사항:
+1. 한 문단으로 간결하게 답변해주세요
+2. 사실에 기반한 정확한 정보만 제공해주세요
+3. 확실하지 않은 내용은 추측하지 말고 "정확한 정보를 확인할 수 없습니다"라고 명시해주세요
+4. HTML 형식으로 작성해주세요 (<p> 태그 사용)
+""",
+    mock="""
+                <p><strong>질문:</strong> {content}</p>
+                <p>이 질문에 대한 답변을 제공하기 위해 정확한 정보를 검토하고 있습니다. 실제 AI 서비스에서는 더 정확하고 상세한 답변을 제공할 수 있습니다.</p>
+                <p><em>※ 이는 목업 응답입니다. 실제 API 키를 설정하면 더 정확한 답변을 받을 수 있습니다.</em></p>
+                """,
+    max_tokens=600,
+    temperature=0.3,
+    confidence=0.9,
+    cache_default=True,
+))
+
+memo_types.register(MemoType(
+    "critical-thinking",
+    system="당신은 비판적 사고와 창의적 분석을 전문으로 하는 AI입니다. 객관적이고 균형잡힌 관점에서 주제를 분석하고 개선방안을 제시합니다.",
+    template="""
+다음 주제에 대해 비판적이고 창의적인 관점에서 분석하고 평가해주세요:
+
+주제/질문: {content}
+
+{instructions}
+
+분석 요구사항:
+1. 먼저 주제에 대한 객관적인 평가를 내려주세요
+2. 장점과 단점을 균형있게 분석해주세요
+3. 개선점이나 대안을 제시해주세요
+4. 개조식으로 정리해주세요 (• 또는 번호 사용)
+5. HTML 형식으로 작성해주세요
+6. 각 항목은 <div class="bg-blue-50 p-3 rounded mb-2"> 형태로 감싸주세요
+""",
+    mock="""
+                <h4>비판적 분석</h4>
+                <p><strong>주제:</strong> {content}</p>
+                <div class="bg-blue-50 p-3 rounded mb-2">
+                    <strong>• 객관적 평가:</strong> 주제에 대한 균형잡힌 관점
+                </div>
+                <div class="bg-green-50 p-3 rounded mb-2">
+                    <strong>• 장점:</strong> 긍정적인 측면들
+                </div>
+                <div class="bg-red-50 p-3 rounded mb-2">
+                    <strong>• 단점:</strong> 개선이 필요한 부분들
+                </div>
+                <div class="bg-yellow-50 p-3 rounded mb-2">
+                    <strong>• 개선방안:</strong> 구체적인 제안사항
+                </div>
+                """,
+    max_tokens=1200,
+    temperature=0.7,
+    confidence=0.85,
+))
@@ -0,0 +1,165 @@
+import asyncio
+import email.utils
+import time
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+PRIORITIES = ("interactive", "background")
+
+
+class RateLimitTimeout(Exception):
+    """속도 제한 때문에 max_wait 안에 요청을 보낼 수 없음"""
+
+
+class _Bucket:
+    """분당 한도를 초당 속도로 채우는 토큰 버킷 (limit가 0이면 제한 없음)"""
+
+    def __init__(self, per_minute: int, burst_seconds: float):
+        self.limit = per_minute
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds) if per_minute else 0.0
+        self.level = self.capacity
+
+    def refill(self, elapsed: float, scale: float):
+        if self.limit:
+            self.level = min(self.capacity, self.level + elapsed * self.rate * scale)
+
+    def wait_time(self, amount: float, reserve: float, scale: float) -> float:
+        """amount를 꺼내고도 reserve 비율이 남을 때까지 기다릴 시간"""
+        if not self.limit:
+            return 0.0
+        required = min(self.capacity, amount + reserve * self.capacity)
+        missing = required - self.level
+        return missing / (self.rate * scale) if missing > 0 else 0.0
+
+
+class RateLimiter:
+    """OpenAI 호출 속도 제한 (요청 수/분, 토큰 수/분)
+
+    프로세스 안의 모든 코루틴이 같은 버킷을 나눠 쓴다. 백그라운드 요청은 대화형 요청이 기다리는
+    동안 보내지 않고, 버킷의 interactive_reserve 비율은 대화형 요청 몫으로 남겨 둔다.
+    429를 받으면 Retry-After 동안 모든 요청을 멈추고 채우는 속도를 절반으로 줄였다가,
+    성공할 때마다 조금씩 원래 속도로 되돌린다.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        burst_seconds: float = 10.0,
+        interactive_reserve: float = 0.2,
+        max_wait: float = 60.0,
+    ):
+        self.interactive_reserve = interactive_reserve
+        self.max_wait = max_wait
+
+        self._requests = _Bucket(requests_per_minute, burst_seconds)
+        self._tokens = _Bucket(tokens_per_minute, burst_seconds)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._scale = 1.0
+        self._waiting_interactive = 0
+
+        self.granted = 0
+        self.rate_limited = 0
+        self.timeouts = 0
+        self.wait_seconds = {priority: 0.0 for priority in PRIORITIES}
+
+    async def acquire(self, tokens: int, priority: str = "interactive"):
+        """요청 하나와 예상 토큰 수만큼 버킷에서 꺼냄 (여유가 없으면 기다림)"""
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+        interactive = priority == "interactive"
+        reserve = 0.0 if interactive else self.interactive_reserve
+        started = time.monotonic()
+        deadline = started + self.max_wait
+
+        if interactive:
+            self._waiting_interactive += 1
+        try:
+            while True:
+                now = self._refill()
+                wait = self._blocked_until - now
+                if wait <= 0:
+                    if not interactive and self._waiting_interactive:
+                        wait = 0.05
+                    else:
+                        wait = max(
+                            self._requests.wait_time(1, reserve, self._scale),
+                            self._tokens.wait_time(tokens, reserve, self._scale),
+                        )
+                        if wait <= 0:
+                            self._requests.level -= 1
+                            self._tokens.level -= tokens
+                            self.granted += 1
+                            self.wait_seconds[priority] += now - started
+                            return
+                if now + wait > deadline:
+                    self.timeouts += 1
+                    raise RateLimitTimeout(f"OpenAI rate limit: no capacity within {self.max_wait:.0f}s")
+                await asyncio.sleep(min(max(wait, 0.01), 1.0))
+        finally:
+            if interactive:
+                self._waiting_interactive -= 1
+
+    def settle(self, reserved: int, used: int):
+        """예상 토큰 수와 실제 사용량의 차이를 반영 (남으면 돌려주고 넘치면 더 뺌)"""
+        self._tokens.level += reserved - used
+
+    def on_success(self):
+        self._scale = min(1.0, self._scale + 0.05)
+
+    def on_rate_limited(self, retry_after: float):
+        """429 응답: retry_after 동안 멈추고 채우는 속도를 줄임"""
+        self.rate_limited += 1
+        self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+        self._scale = max(0.1, self._scale / 2)
+
+    def _refill(self) -> float:
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests.refill(elapsed, self._scale)
+        self._tokens.refill(elapsed, self._scale)
+        return now
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "granted": self.granted,
+            "rate_limited": self.rate_limited,
+            "timeouts": self.timeouts,
+            "rate_scale": self._scale,
+            "waiting_interactive": self._waiting_interactive,
+            "wait_seconds": dict(self.wait_seconds),
+        }
+
+
+def retry_after_seconds(headers: Any, attempt: int) -> float:
+    """429 응답의 retry-after-ms / Retry-After 헤더 (없으면 지수 백오프)"""
+    value: Optional[str] = headers.get("retry-after-ms") if headers is not None else None
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after") if headers is not None else None
+    if value:
+        try:
+            return float(value)
+        except ValueError:
+            pass
+        try:
+            return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            pass
+    return min(60.0, 2.0 ** attempt)
+
+
+rate_limiter = RateLimiter(
+    requests_per_minute=settings.openai_requests_per_minute,
+    tokens_per_minute=settings.openai_tokens_per_minute,
+    burst_seconds=settings.openai_rate_limit_burst_seconds,
+    interactive_reserve=settings.openai_interactive_reserve,
+    max_wait=settings.openai_rate_limit_max_wait_seconds,
+)
@@ -0,0 +1,485 @@
+import asyncio
+import functools
+import json
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import settings
+from app.core.database import utcnow
+from app.models.document import Document
+from app.services.text_utils import html_to_text
+
+try:
+    import fcntl
+except ImportError:  # Windows: 파일 잠금 없이 한 프로세스만 쓴다고 가정
+    fcntl = None
+
+if TYPE_CHECKING:
+    import numpy as np
+    from sklearn.feature_extraction.text import HashingVectorizer
+
+logger = logging.getLogger(__name__)
+
+# 아주 긴 문서는 앞부분만 벡터화 (n-gram 수가 본문 길이에 비례하므로)
+_MAX_CHARS = 20000
+_BACKFILL_BATCH = 1000
+# 커밋 후 파일 반영 전에 프로세스가 죽은 변경분을 다음 동기화 때 다시 색인하기 위한 여유 시간
+_SYNC_SLACK = timedelta(minutes=1)
+_PENDING_KEY = "related_pending"
+# 파일 형식 (바뀌면 sync가 전체를 다시 구성)
+_FORMAT = 2
+
+
+class RelatedNotesIndex:
+    """문서 본문 벡터 색인 (연관 노트 추천)
+
+    HashingVectorizer는 어휘를 학습하지 않으므로 문서가 바뀌면 그 행만 다시 계산한다.
+    벡터는 L2 정규화된 float32 행렬 파일에 저장하고 memmap으로 열어, 코사인 유사도를
+    행렬-벡터 곱 한 번으로 구한다. 행마다 문서 소유자(익명 사용자는 0)를 함께 저장해서 같은 사용자의
+    문서끼리만 비교한다.
+
+    여러 워커 프로세스가 같은 파일을 쓰므로 쓰기는 파일 잠금(lock 파일의 flock)을 잡고 한다.
+    쓸 때마다 meta.json을 다시 쓰므로, 그 수정 시각이 마지막으로 본 것과 다르면 다른 프로세스가 쓴 것으로
+    보고 파일을 다시 연다 (메모리에 든 id→행 대응이 어긋나지 않도록).
+    """
+
+    def __init__(self, path: str, dim: int = 1024):
+        self.path = path
+        self.dim = dim
+        self._lock = threading.RLock()
+        self._vectors: Optional["np.memmap"] = None  # (capacity, dim)
+        self._ids: Optional["np.memmap"] = None  # (capacity,), 0이면 빈 행
+        self._owners: Optional["np.memmap"] = None  # (capacity,)
+        self._rows: Dict[int, int] = {}
+        self._free: List[int] = []
+        self._size = 0  # 한 번이라도 사용한 행 수
+        self._synced_at: Optional[datetime] = None
+        self._meta_mtime: Optional[int] = None
+        self._lock_file = None
+        self._lock_depth = 0
+
+    # 파일 관리
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _open(self) -> bool:
+        """기존 색인 파일 열기 (없거나 차원이 다르면 False)"""
+        import numpy as np
+
+        try:
+            with open(self._file("meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if meta.get("dim") != self.dim or meta.get("format") != _FORMAT:
+            return False
+        capacity = meta["capacity"]
+        self._vectors = np.memmap(self._file("vectors.f32"), dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+        self._ids = np.memmap(self._file("ids.i64"), dtype=np.int64, mode="r+", shape=(capacity,))
+        self._owners = np.memmap(self._file("owners.i64"), dtype=np.int64, mode="r+", shape=(capacity,))
+        used = np.flatnonzero(self._ids)
+        self._rows = {int(self._ids[row]): int(row) for row in used}
+        self._size = int(used[-1]) + 1 if len(used) else 0
+        self._free = np.flatnonzero(self._ids[:self._size] == 0).tolist()
+        self._synced_at = datetime.fromisoformat(meta["synced_at"]) if meta.get("synced_at") else None
+        self._meta_mtime = self._stat_meta()
+        return True
+
+    def _stat_meta(self) -> Optional[int]:
+        try:
+            return os.stat(self._file("meta.json")).st_mtime_ns
+        except OSError:
+            return None
+
+    def _ensure_open(self):
+        """열려 있지 않거나 다른 프로세스가 파일을 바꿨으면 다시 열기 (잠금을 잡은 채로 호출)"""
+        if self._vectors is not None and self._stat_meta() == self._meta_mtime:
+            return
+        if not self._open():
+            self._create(1024)
+
+    @contextmanager
+    def _locked(self, exclusive: bool = False):
+        """프로세스 안(RLock)과 프로세스 사이(flock) 잠금 (같은 스레드에서 다시 잡아도 됨)
+
+        flock은 처음 잡을 때의 종류를 유지하므로 쓰기 잠금 안에서 읽기 잠금을 잡는 것은 괜찮고,
+        읽기 잠금 안에서 쓰기를 하지 않는다.
+        """
+        with self._lock:
+            if self._lock_depth == 0 and fcntl is not None:
+                os.makedirs(self.path, exist_ok=True)
+                self._lock_file = open(self._file("lock"), "a+b")
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0 and self._lock_file is not None:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+                    self._lock_file.close()
+                    self._lock_file = None
+
+    def _create(self, capacity: int):
+        import numpy as np
+
+        os.makedirs(self.path, exist_ok=True)
+        self._vectors = np.memmap(self._file("vectors.f32"), dtype=np.float32, mode="w+", shape=(capacity, self.dim))
+        self._ids = np.memmap(self._file("ids.i64"), dtype=np.int64, mode="w+", shape=(capacity,))
+        self._owners = np.memmap(self._file("owners.i64"), dtype=np.int64, mode="w+", shape=(capacity,))
+        self._rows = {}
+        self._free = []
+        self._size = 0
+        self._synced_at = None
+        self._write_meta()
+
+    def _grow(self, needed: int):
+        """행렬 용량을 두 배씩 늘림 (파일을 키운 뒤 다시 매핑)"""
+        import numpy as np
+
+        capacity = len(self._ids)
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2, 1024)
+        self._vectors.flush()
+        self._ids.flush()
+        self._owners.flush()
+        del self._vectors, self._ids, self._owners
+        for name, itemsize in (("vectors.f32", 4 * self.dim), ("ids.i64", 8), ("owners.i64", 8)):
+            with open(self._file(name), "r+b") as f:
+                f.truncate(new_capacity * itemsize)
+        self._vectors = np.memmap(self._file("vectors.f32"), dtype=np.float32, mode="r+", shape=(new_capacity, self.dim))
+        self._ids = np.memmap(self._file("ids.i64"), dtype=np.int64, mode="r+", shape=(new_capacity,))
+        self._owners = np.memmap(self._file("owners.i64"), dtype=np.int64, mode="r+", shape=(new_capacity,))
+
+    def _write_meta(self):
+        meta = {
+            "format": _FORMAT,
+            "dim": self.dim,
+            "capacity": len(self._ids),
+            "synced_at": self._synced_at.isoformat() if self._synced_at else None,
+        }
+        tmp = self._file("meta.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._file("meta.json"))
+        self._meta_mtime = self._stat_meta()
+
+    def _flush(self):
+        self._vectors.flush()
+        self._ids.flush()
+        self._owners.flush()
+        self._synced_at = utcnow()
+        self._write_meta()
+
+    # 색인 갱신
+
+    def vectorize(self, texts: List[str]) -> "np.ndarray":
+        """HTML 본문 목록을 L2 정규화된 float32 벡터로 변환"""
+        return _vectorize(texts, self.dim)
+
+    def upsert(
+        self, documents: List[Tuple[int, str, Optional[int]]], flush: bool = True, vectors: Optional["np.ndarray"] = None
+    ):
+        """(id, 본문, 소유자) 목록 색인 (이미 있으면 해당 행만 덮어씀, vectors를 주면 계산을 건너뜀)"""
+        if not documents:
+            return
+        if vectors is None:
+            vectors = self.vectorize([text for _, text, _ in documents])
+        with self._locked(exclusive=True):
+            self._ensure_open()
+            new = sum(1 for id, _, _ in documents if id not in self._rows)
+            self._grow(self._size + max(0, new - len(self._free)))
+            for (id, _, user_id), vector in zip(documents, vectors):
+                row = self._rows.get(id)
+                if row is None:
+                    if self._free:
+                        row = self._free.pop()
+                    else:
+                        row = self._size
+                        self._size += 1
+                    self._rows[id] = row
+                    self._ids[row] = id
+                self._owners[row] = _owner(user_id)
+                self._vectors[row] = vector
+            if flush:
+                self._flush()
+
+    def remove(self, ids: Iterable[int]):
+        with self._locked(exclusive=True):
+            self._ensure_open()
+            for id in ids:
+                row = self._rows.pop(id, None)
+                if row is None:
+                    continue
+                self._ids[row] = 0
+                self._owners[row] = 0
+                self._vectors[row] = 0
+                self._free.append(row)
+            self._flush()
+
+    # 조회
+
+    def related(self, document_id: int, limit: int = 5) -> List[Tuple[int, float]]:
+        """같은 사용자의 문서 중 본문이 비슷한 다른 문서 (id, 코사인 유사도) 목록"""
+        import numpy as np
+
+        with self._locked():
+            self._ensure_open()
+            row = self._rows.get(document_id)
+            if row is None:
+                return []
+            return self._top_k(np.array(self._vectors[row]), limit, int(self._owners[row]), exclude=document_id)
+
+    def similar(self, text: str, limit: int = 5, user_id: Optional[int] = None) -> List[Tuple[int, float]]:
+        """user_id 사용자의 문서 중 임의의 본문과 비슷한 문서 (id, 코사인 유사도) 목록"""
+        query = self.vectorize([text])[0]
+        with self._locked():
+            self._ensure_open()
+            return self._top_k(query, limit, _owner(user_id))
+
+    def _top_k(self, query: "np.ndarray", limit: int, owner: int, exclude: int = 0) -> List[Tuple[int, float]]:
+        import numpy as np
+
+        if self._size == 0 or not query.any():
+            return []
+        scores = np.asarray(self._vectors[:self._size] @ query)
+        ids = self._ids[:self._size]
+        # 빈 행, 자기 자신, 다른 사용자의 문서는 후보에서 제외
+        scores[(ids == 0) | (ids == exclude) | (self._owners[:self._size] != owner)] = -1.0
+        k = min(limit, self._size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(ids[row]), float(scores[row])) for row in top if scores[row] > 0]
+
+    # DB 동기화
+
+    def sync(self, engine: Engine):
+        """DB와 맞춤 (파일이 없으면 전체 구성, 있으면 놓친 변경분만 반영)"""
+        with self._locked(exclusive=True), engine.connect() as conn:
+            if not self._open():
+                self.rebuild(conn)
+                return
+            db_ids = set(conn.execute(select(Document.id)).scalars())
+            removed = [id for id in self._rows if id not in db_ids]
+            if removed:
+                self.remove(removed)
+            stale = db_ids.difference(self._rows)
+            if self._synced_at is not None:
+                stale.update(conn.execute(
+                    select(Document.id).where(Document.updated_at > self._synced_at - _SYNC_SLACK)
+                ).scalars())
+            else:
+                stale = db_ids
+            stale = sorted(stale)
+            for start in range(0, len(stale), _BACKFILL_BATCH):
+                rows = conn.execute(
+                    select(Document.id, Document.title, Document.content, Document.user_id)
+                    .where(Document.id.in_(stale[start:start + _BACKFILL_BATCH]))
+                ).all()
+                self.upsert(
+                    [(id, _document_text(title, content), user_id) for id, title, content, user_id in rows], flush=False
+                )
+            self._flush()
+
+    def rebuild(self, conn: Connection):
+        """전체 색인 재구성 (배치 단위로 읽어서 채움)"""
+        with self._locked(exclusive=True):
+            count = conn.execute(select(func.count()).select_from(Document)).scalar()
+            self._create(max(1024, count))
+            last_id = 0
+            while True:
+                rows = conn.execute(
+                    select(Document.id, Document.title, Document.content, Document.user_id)
+                    .where(Document.id > last_id)
+                    .order_by(Document.id)
+                    .limit(_BACKFILL_BATCH)
+                ).all()
+                if not rows:
+                    break
+                self.upsert(
+                    [(id, _document_text(title, content), user_id) for id, title, content, user_id in rows], flush=False
+                )
+                last_id = rows[-1][0]
+            self._flush()
+
+
+@functools.lru_cache(maxsize=None)
+def _vectorizer(dim: int) -> "HashingVectorizer":
+    # scikit-learn(scipy 포함)과 numpy 임포트가 워커 시작 시간의 절반 가까이라 처음 벡터화할 때 불러옴
+    import numpy as np
+    from sklearn.feature_extraction.text import HashingVectorizer
+
+    # 조사가 붙는 한국어도 맞도록 단어 경계 안의 문자 2~3-gram 사용
+    return HashingVectorizer(
+        n_features=dim,
+        analyzer="char_wb",
+        ngram_range=(2, 3),
+        alternate_sign=False,
+        norm="l2",
+        dtype=np.float32,
+    )
+
+
+def _vectorize(texts: List[str], dim: int) -> "np.ndarray":
+    # 작업자 프로세스에서도 부르므로 모듈 함수 (어휘를 학습하지 않아 어느 프로세스에서 계산해도 같은 벡터)
+    plain = [html_to_text(text)[:_MAX_CHARS] for text in texts]
+    return _vectorizer(dim).transform(plain).toarray()
+
+
+def _warm_up(dim: int):
+    _vectorizer(dim)
+
+
+def _document_text(title: Optional[str], content: Optional[str]) -> str:
+    return f"{title or ''}\n{content or ''}"
+
+
+def _owner(user_id: Optional[int]) -> int:
+    # users.id는 1부터이므로 0을 익명 사용자로 씀
+    return user_id or 0
+
+
+related_notes = RelatedNotesIndex(settings.related_index_path, dim=settings.related_index_dim)
+_pool: Optional[ProcessPoolExecutor] = None
+# 색인 쓰기는 이 스레드 하나에서 순서대로 (커밋 후 이벤트 루프를 막지 않고, 추가/삭제 순서를 지킴)
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="related-index")
+
+
+def ensure_related_index(engine: Engine):
+    """연관 노트 색인을 DB 내용과 맞춤"""
+    related_notes.sync(engine)
+
+
+# 색인 파일은 트랜잭션 밖에 있으므로 ORM 변경을 세션에 모아 두었다가 커밋 후에 반영
+def _pending(target) -> Optional[Dict[int, Optional[Tuple[str, Optional[int]]]]]:
+    session = object_session(target)
+    if session is None:
+        return None
+    return session.info.setdefault(_PENDING_KEY, {})
+
+
+def stage_removed(session: Session, ids: Iterable[int]):
+    """ORM 이벤트를 거치지 않고 지운 문서를 커밋 후 색인에서 빼도록 등록"""
+    pending = session.info.setdefault(_PENDING_KEY, {})
+    for id in ids:
+        pending[id] = None
+
+
+async def upsert_documents(documents: List[Tuple[int, Optional[str], Optional[str]]], user_id: Optional[int] = None):
+    """user_id 사용자의 (id, 제목, 본문) 목록 색인 (ORM 이벤트를 거치지 않는 일괄 생성용, 커밋 후 호출)
+
+    벡터 계산이 문서당 수 ms라 작업자 프로세스에서 한다. 같은 프로세스의 스레드에서 계산하면 GIL을 오래
+    잡아서 그동안 다른 요청이 모두 느려진다 (작업자가 없으면 스레드에서 계산). 반영 전에 프로세스가
+    죽어도 배포 시 init_db의 sync가 색인에 없는 문서를 채운다.
+    """
+    texts = [_document_text(title, content) for _, title, content in documents]
+    if _pool is not None:
+        vectors = await asyncio.get_running_loop().run_in_executor(_pool, _vectorize, texts, related_notes.dim)
+    else:
+        vectors = await asyncio.to_thread(_vectorize, texts, related_notes.dim)
+    await asyncio.get_running_loop().run_in_executor(
+        _writer,
+        functools.partial(
+            related_notes.upsert, [(id, text, user_id) for (id, _, _), text in zip(documents, texts)], vectors=vectors
+        ),
+    )
+
+
+def _apply_changes(upserts: List[Tuple[int, str, Optional[int]]], removed: List[int]):
+    """커밋된 변경을 색인에 반영 (쓰기 스레드에서 실행, 벡터는 작업자가 있으면 작업자 프로세스에서 계산)"""
+    try:
+        if upserts:
+            vectors = None
+            if _pool is not None:
+                vectors = _pool.submit(_vectorize, [text for _, text, _ in upserts], related_notes.dim).result()
+            related_notes.upsert(upserts, vectors=vectors)
+        if removed:
+            related_notes.remove(removed)
+    except Exception:
+        # 반영하지 못한 변경은 다음 sync가 updated_at 기준으로 다시 색인
+        logger.exception("Failed to update related notes index")
+
+
+def wait_for_index():
+    """지금까지 등록된 색인 변경이 모두 반영될 때까지 대기 (벤치마크, 종료 시)"""
+    _writer.submit(int).result()
+
+
+def start_workers():
+    """벡터 계산 작업자 프로세스 시작 (앱 시작 시 호출)
+
+    spawn은 작업자마다 실행한 메인 모듈과 앱 모듈 전체를 다시 임포트하므로 쓰지 않고,
+    스레드가 생기기 전인 시작 시점에 fork해 둔다. fork가 없는 플랫폼에서는 스레드에서 계산한다.
+    """
+    global _pool
+    if _pool is not None or settings.related_index_workers <= 0:
+        return
+    if "fork" not in multiprocessing.get_all_start_methods():
+        return
+    _pool = ProcessPoolExecutor(settings.related_index_workers, mp_context=multiprocessing.get_context("fork"))
+    # 작업자는 첫 작업을 받을 때 fork되므로 바로 빈 작업을 보내서 지금 띄움
+    _pool.submit(int).result()
+    # scikit-learn 임포트는 작업자에서 미리 해 둠 (기다리지 않으므로 시작을 늦추지 않음)
+    for _ in range(settings.related_index_workers):
+        _pool.submit(_warm_up, related_notes.dim)
+
+
+def shutdown_workers():
+    global _pool
+    wait_for_index()
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+@event.listens_for(Document, "after_insert")
+def _document_inserted(mapper, connection, target):
+    pending = _pending(target)
+    if pending is not None:
+        pending[target.id] = (_document_text(target.title, target.content), target.user_id)
+
+
+@event.listens_for(Document, "after_update")
+def _document_updated(mapper, connection, target):
+    state = inspect(target)
+    if state.attrs.title.history.has_changes() or state.attrs.content.history.has_changes():
+        pending = _pending(target)
+        if pending is not None:
+            pending[target.id] = (_document_text(target.title, target.content), target.user_id)
+
+
+@event.listens_for(Document, "after_delete")
+def _document_deleted(mapper, connection, target):
+    pending = _pending(target)
+    if pending is not None:
+        pending[target.id] = None
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    # 벡터 계산과 파일 쓰기는 문서 저장마다 수 ms라 쓰기 스레드로 넘김 (요청은 기다리지 않음)
+    _writer.submit(
+        _apply_changes,
+        [(id, *change) for id, change in pending.items() if change is not None],
+        [id for id, change in pending.items() if change is None],
+    )
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session):
+    session.info.pop(_PENDING_KEY, None)
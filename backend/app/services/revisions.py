@@ -0,0 +1,91 @@
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.document import Document, DocumentRevision
+
+
+class PatchError(ValueError):
+    """편집 연산을 본문에 적용할 수 없음 (범위 초과 등)"""
+
+
+def apply_ops(content: str, ops: List[Dict[str, Any]]) -> str:
+    """편집 연산 목록을 차례로 적용
+
+    각 연산은 {"start", "end", "text"}로 [start, end) 구간을 text로 바꾼다.
+    위치는 앞 연산을 적용한 뒤의 본문 기준이며, 브라우저 문자열 인덱스와 같도록
+    UTF-16 코드 단위로 센다.
+    """
+    buffer = bytearray(content.encode("utf-16-le"))
+    for op in ops:
+        start, end = op["start"] * 2, op["end"] * 2
+        if not 0 <= start <= end <= len(buffer):
+            raise PatchError(f"Patch range {op['start']}:{op['end']} is out of bounds")
+        # 클라이언트 diff가 서로게이트 쌍 중간에서 나뉠 수 있으므로 개별 서로게이트도 허용
+        buffer[start:end] = op.get("text", "").encode("utf-16-le", "surrogatepass")
+    try:
+        return buffer.decode("utf-16-le")
+    except UnicodeDecodeError:
+        raise PatchError("Patch splits a surrogate pair")
+
+
+def record_revision(
+    db: Session,
+    document: Document,
+    base_content: str,
+    ops: Optional[List[Dict[str, Any]]] = None,
+    title: Optional[str] = None,
+):
+    """document의 새 버전을 변경 기록에 추가 (flush 후 호출해서 document.version이 새 버전이어야 함)
+
+    ops가 없으면(전체 덮어쓰기) 본문 전체를 저장한다. 기록이 없는 문서는 먼저 이전 버전의
+    본문을 기준 snapshot으로 남겨서 이후 버전을 복원할 수 있게 한다.
+    """
+    version = document.version
+    has_log = db.query(DocumentRevision.id).filter(DocumentRevision.document_id == document.id).first()
+    if not has_log and ops is not None:
+        db.add(DocumentRevision(document_id=document.id, version=version - 1, snapshot=base_content))
+
+    snapshot = None
+    if ops is None or version % settings.revision_snapshot_interval == 0:
+        snapshot = document.content
+    db.add(DocumentRevision(
+        document_id=document.id,
+        version=version,
+        ops=ops,
+        snapshot=snapshot,
+        title=title,
+    ))
+
+
+def content_at(db: Session, document_id: int, version: int) -> Optional[str]:
+    """특정 버전의 본문 복원 (가장 가까운 이전 snapshot + 이후 ops), 기록이 없으면 None"""
+    base = (
+        db.query(DocumentRevision)
+        .filter(
+            DocumentRevision.document_id == document_id,
+            DocumentRevision.version <= version,
+            DocumentRevision.snapshot.isnot(None),
+        )
+        .order_by(DocumentRevision.version.desc())
+        .first()
+    )
+    if base is None:
+        return None
+    revisions = (
+        db.query(DocumentRevision.version, DocumentRevision.ops)
+        .filter(
+            DocumentRevision.document_id == document_id,
+            DocumentRevision.version > base.version,
+            DocumentRevision.version <= version,
+        )
+        .order_by(DocumentRevision.version)
+        .all()
+    )
+    if (revisions[-1].version if revisions else base.version) != version:
+        return None
+    content = base.snapshot
+    for revision in revisions:
+        content = apply_ops(content, revision.ops or [])
+    return content
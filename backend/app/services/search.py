@@ -0,0 +1,299 @@
+import html
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import Integer, String, bindparam, event, inspect, text
+from sqlalchemy.engine import Connection
+
+from app.models.ai_memo import AIMemo
+from app.models.document import Document
+from app.models.types import CompressedText
+from app.services.text_utils import html_to_text, make_snippet, tokenize
+
+# 색인 텍스트는 HTML을 벗긴 평문이며, 스니펫 강조 구간은 제어 문자로 표시한 뒤 이스케이프 후 치환
+_MARK_START = "\x02"
+_MARK_END = "\x03"
+_BACKFILL_BATCH = 1000
+
+
+class _SQLiteFTS:
+    """SQLite FTS5 색인 (rowid = 원본 행 id)"""
+
+    def setup(self, conn: Connection) -> bool:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'documents_fts'")
+        ).first()
+        if exists:
+            return False
+        conn.execute(text(
+            "CREATE VIRTUAL TABLE documents_fts USING fts5(title, body, tokenize = 'unicode61 remove_diacritics 2')"
+        ))
+        conn.execute(text(
+            "CREATE VIRTUAL TABLE ai_memos_fts USING fts5(body, tokenize = 'unicode61 remove_diacritics 2')"
+        ))
+        return True
+
+    def teardown(self, conn: Connection):
+        conn.execute(text("DROP TABLE IF EXISTS documents_fts"))
+        conn.execute(text("DROP TABLE IF EXISTS ai_memos_fts"))
+
+    def clear(self, conn: Connection):
+        conn.execute(text("DELETE FROM documents_fts"))
+        conn.execute(text("DELETE FROM ai_memos_fts"))
+
+    def index_documents(self, conn: Connection, rows: List[Dict[str, Any]]):
+        if not rows:
+            return
+        conn.execute(text("DELETE FROM documents_fts WHERE rowid = :id"), [{"id": row["id"]} for row in rows])
+        conn.execute(text("INSERT INTO documents_fts (rowid, title, body) VALUES (:id, :title, :body)"), rows)
+
+    def remove_documents(self, conn: Connection, ids: List[int]):
+        conn.execute(text("DELETE FROM documents_fts WHERE rowid = :id"), [{"id": id} for id in ids])
+
+    def index_memos(self, conn: Connection, rows: List[Dict[str, Any]]):
+        if not rows:
+            return
+        conn.execute(text("DELETE FROM ai_memos_fts WHERE rowid = :id"), [{"id": row["id"]} for row in rows])
+        conn.execute(text("INSERT INTO ai_memos_fts (rowid, body) VALUES (:id, :body)"), rows)
+
+    def remove_memos(self, conn: Connection, ids: List[int]):
+        conn.execute(text("DELETE FROM ai_memos_fts WHERE rowid = :id"), [{"id": id} for id in ids])
+
+    def search(self, conn: Connection, terms: List[str], kind: str, limit: int, user_id: Optional[int]) -> List[Dict[str, Any]]:
+        # 각 단어를 따옴표로 감싸 FTS 문법을 무력화하고, 조사가 붙은 한국어 단어도 맞도록 접두 검색
+        match = " ".join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+        mark = f"'{_MARK_START}', '{_MARK_END}'"
+        parts = []
+        if kind in ("all", "document"):
+            parts.append(f"""
+                SELECT * FROM (
+                    SELECT 'document' AS kind, d.id AS id, d.id AS document_id, d.title AS title,
+                           snippet(documents_fts, 1, {mark}, '…', 16) AS snippet,
+                           bm25(documents_fts, 5.0, 1.0) AS score
+                    FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid
+                    WHERE documents_fts MATCH :match AND d.user_id IS :user_id
+                    ORDER BY score LIMIT :limit
+                )""")
+        if kind in ("all", "memo"):
+            parts.append(f"""
+                SELECT * FROM (
+                    SELECT 'memo' AS kind, m.id AS id, m.document_id AS document_id, d.title AS title,
+                           snippet(ai_memos_fts, 0, {mark}, '…', 16) AS snippet,
+                           bm25(ai_memos_fts) AS score
+                    FROM ai_memos_fts
+                    JOIN ai_memos m ON m.id = ai_memos_fts.rowid
+                    JOIN documents d ON d.id = m.document_id
+                    WHERE ai_memos_fts MATCH :match AND d.user_id IS :user_id
+                    ORDER BY score LIMIT :limit
+                )""")
+        # 안쪽 쿼리도 바깥과 같은 점수(제목 가중치 포함)로 골라야 제목이 맞은 문서가 미리 잘리지 않음
+        sql = " UNION ALL ".join(parts) + " ORDER BY score LIMIT :limit"
+        rows = conn.execute(text(sql), {"match": match, "limit": limit, "user_id": user_id}).mappings().all()
+        # bm25는 작을수록 관련도가 높으므로 부호를 바꿔 큰 값이 위로 오게 함
+        return [
+            {**row, "snippet": _render_marks(row["snippet"]), "score": -row["score"]}
+            for row in rows
+        ]
+
+
+class _PostgresFTS:
+    """PostgreSQL tsvector + GIN 색인 (search_vector 컬럼을 애플리케이션에서 갱신)"""
+
+    config = "simple"
+
+    def setup(self, conn: Connection) -> bool:
+        exists = conn.execute(text(
+            "SELECT 1 FROM information_schema.columns "
+            "WHERE table_name = 'documents' AND column_name = 'search_vector'"
+        )).first()
+        conn.execute(text("ALTER TABLE documents ADD COLUMN IF NOT EXISTS search_vector tsvector"))
+        conn.execute(text("ALTER TABLE ai_memos ADD COLUMN IF NOT EXISTS search_vector tsvector"))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_documents_search_vector ON documents USING GIN (search_vector)"
+        ))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_ai_memos_search_vector ON ai_memos USING GIN (search_vector)"
+        ))
+        return not exists
+
+    def teardown(self, conn: Connection):
+        conn.execute(text("DROP INDEX IF EXISTS ix_documents_search_vector"))
+        conn.execute(text("DROP INDEX IF EXISTS ix_ai_memos_search_vector"))
+        conn.execute(text("ALTER TABLE documents DROP COLUMN IF EXISTS search_vector"))
+        conn.execute(text("ALTER TABLE ai_memos DROP COLUMN IF EXISTS search_vector"))
+
+    def clear(self, conn: Connection):
+        conn.execute(text("UPDATE documents SET search_vector = NULL"))
+        conn.execute(text("UPDATE ai_memos SET search_vector = NULL"))
+
+    def index_documents(self, conn: Connection, rows: List[Dict[str, Any]]):
+        if not rows:
+            return
+        conn.execute(text(
+            f"UPDATE documents SET search_vector = "
+            f"setweight(to_tsvector('{self.config}', :title), 'A') || "
+            f"setweight(to_tsvector('{self.config}', :body), 'B') "
+            f"WHERE id = :id"
+        ), rows)
+
+    def remove_documents(self, conn: Connection, ids: List[int]):
+        # 행 삭제와 함께 색인도 사라짐
+        pass
+
+    def index_memos(self, conn: Connection, rows: List[Dict[str, Any]]):
+        if not rows:
+            return
+        conn.execute(text(
+            f"UPDATE ai_memos SET search_vector = to_tsvector('{self.config}', :body) WHERE id = :id"
+        ), rows)
+
+    def remove_memos(self, conn: Connection, ids: List[int]):
+        pass
+
+    def search(self, conn: Connection, terms: List[str], kind: str, limit: int, user_id: Optional[int]) -> List[Dict[str, Any]]:
+        tsquery = " & ".join(f"{term}:*" for term in terms)
+        parts = []
+        if kind in ("all", "document"):
+            parts.append(f"""
+                (SELECT 'document' AS kind, d.id AS id, d.id AS document_id, d.title AS title,
+                        d.content AS body, ts_rank_cd(d.search_vector, q) AS score
+                 FROM documents d, to_tsquery('{self.config}', :tsquery) q
+                 WHERE d.search_vector @@ q AND d.user_id IS NOT DISTINCT FROM :user_id
+                 ORDER BY score DESC LIMIT :limit)""")
+        if kind in ("all", "memo"):
+            parts.append(f"""
+                (SELECT 'memo' AS kind, m.id AS id, m.document_id AS document_id, d.title AS title,
+                        m.content AS body, ts_rank_cd(m.search_vector, q) AS score
+                 FROM ai_memos m JOIN documents d ON d.id = m.document_id, to_tsquery('{self.config}', :tsquery) q
+                 WHERE m.search_vector @@ q AND d.user_id IS NOT DISTINCT FROM :user_id
+                 ORDER BY score DESC LIMIT :limit)""")
+        sql = " UNION ALL ".join(parts) + " ORDER BY score DESC LIMIT :limit"
+        # body는 압축 저장된 본문이므로 컬럼 타입을 지정해서 풀어서 받음
+        query = text(sql).bindparams(bindparam("user_id", type_=Integer)).columns(body=CompressedText)
+        rows = conn.execute(query, {"tsquery": tsquery, "limit": limit, "user_id": user_id}).mappings().all()
+        # 스니펫은 상위 결과에 대해서만 파이썬에서 생성
+        return [
+            {
+                "kind": row["kind"],
+                "id": row["id"],
+                "document_id": row["document_id"],
+                "title": row["title"],
+                "snippet": make_snippet(html_to_text(row["body"]), terms),
+                "score": float(row["score"]),
+            }
+            for row in rows
+        ]
+
+
+_BACKENDS = {"sqlite": _SQLiteFTS(), "postgresql": _PostgresFTS()}
+
+
+def _backend(conn: Connection):
+    return _BACKENDS[conn.dialect.name]
+
+
+def _render_marks(snippet: str) -> str:
+    return html.escape(snippet or "").replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+
+def _document_row(id: int, title: str, content: str) -> Dict[str, Any]:
+    return {"id": id, "title": title or "", "body": html_to_text(content or "")}
+
+
+def _memo_row(id: int, content: str) -> Dict[str, Any]:
+    return {"id": id, "body": html_to_text(content or "")}
+
+
+def ensure_search_schema(conn: Connection):
+    """전문 검색 색인 생성 (처음 만들 때는 기존 행으로 채움, 마이그레이션에서 호출)"""
+    if _backend(conn).setup(conn):
+        rebuild_index(conn)
+
+
+def drop_search_schema(conn: Connection):
+    _backend(conn).teardown(conn)
+
+
+def rebuild_index(conn: Connection):
+    """전체 색인 재구성 (배치 단위로 읽어서 채움)"""
+    backend = _backend(conn)
+    backend.clear(conn)
+    last_id = 0
+    while True:
+        rows = conn.execute(text(
+            "SELECT id, title, content FROM documents WHERE id > :last_id ORDER BY id LIMIT :batch"
+        ).columns(id=Integer, title=String, content=CompressedText), {"last_id": last_id, "batch": _BACKFILL_BATCH}).all()
+        if not rows:
+            break
+        backend.index_documents(conn, [_document_row(*row) for row in rows])
+        last_id = rows[-1][0]
+    last_id = 0
+    while True:
+        rows = conn.execute(text(
+            "SELECT id, content FROM ai_memos WHERE id > :last_id ORDER BY id LIMIT :batch"
+        ).columns(id=Integer, content=CompressedText), {"last_id": last_id, "batch": _BACKFILL_BATCH}).all()
+        if not rows:
+            break
+        backend.index_memos(conn, [_memo_row(*row) for row in rows])
+        last_id = rows[-1][0]
+
+
+def index_documents(conn: Connection, documents: List[Dict[str, Any]]):
+    """문서 여러 건 색인 (id, title, content 키를 가진 dict 목록)"""
+    _backend(conn).index_documents(conn, [_document_row(d["id"], d["title"], d["content"]) for d in documents])
+
+
+def index_memos(conn: Connection, memos: List[Dict[str, Any]]):
+    """AI 메모 여러 건 색인 (id, content 키를 가진 dict 목록)"""
+    _backend(conn).index_memos(conn, [_memo_row(m["id"], m["content"]) for m in memos])
+
+
+def remove_documents(conn: Connection, ids: List[int]):
+    if ids:
+        _backend(conn).remove_documents(conn, ids)
+
+
+def remove_memos(conn: Connection, ids: List[int]):
+    if ids:
+        _backend(conn).remove_memos(conn, ids)
+
+
+def search(conn: Connection, query: str, kind: str = "all", limit: int = 20, user_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """user_id 사용자의 문서/AI 메모 전문 검색 (관련도 순, None은 익명 사용자)"""
+    terms = tokenize(query)
+    if not terms:
+        return []
+    return _backend(conn).search(conn, terms, kind, limit, user_id)
+
+
+# ORM 쓰기 경로(생성/수정/삭제)에서 같은 트랜잭션 안에서 색인을 증분 갱신
+@event.listens_for(Document, "after_insert")
+def _document_inserted(mapper, connection, target):
+    _backend(connection).index_documents(connection, [_document_row(target.id, target.title, target.content)])
+
+
+@event.listens_for(Document, "after_update")
+def _document_updated(mapper, connection, target):
+    state = inspect(target)
+    if state.attrs.title.history.has_changes() or state.attrs.content.history.has_changes():
+        _backend(connection).index_documents(connection, [_document_row(target.id, target.title, target.content)])
+
+
+@event.listens_for(Document, "after_delete")
+def _document_deleted(mapper, connection, target):
+    _backend(connection).remove_documents(connection, [target.id])
+
+
+@event.listens_for(AIMemo, "after_insert")
+def _memo_inserted(mapper, connection, target):
+    _backend(connection).index_memos(connection, [_memo_row(target.id, target.content)])
+
+
+@event.listens_for(AIMemo, "after_update")
+def _memo_updated(mapper, connection, target):
+    if inspect(target).attrs.content.history.has_changes():
+        _backend(connection).index_memos(connection, [_memo_row(target.id, target.content)])
+
+
+@event.listens_for(AIMemo, "after_delete")
+def _memo_deleted(mapper, connection, target):
+    _backend(connection).remove_memos(connection, [target.id])
@@ -0,0 +1,153 @@
+import asyncio
+import weakref
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional
+
+from app.core.config import settings
+
+
+class _Call:
+    """진행 중인 공유 호출 (기다리는 호출 수를 세어 모두 떠나면 취소)"""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class _Stream:
+    """진행 중인 공유 스트림 (늦게 합류한 호출도 처음부터 받을 수 있게 조각을 모두 보관)"""
+
+    __slots__ = ("task", "waiters", "items", "done", "error", "changed")
+
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.waiters = 0
+        self.items: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.changed = asyncio.Event()
+
+    def notify(self):
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+
+class SingleFlight:
+    """같은 키의 동시 호출을 업스트림 호출 하나로 합침
+
+    먼저 온 호출이 실제 작업을 별도 태스크로 시작하고, 그 작업이 끝나기 전에 같은 키로 들어온
+    호출은 같은 결과(또는 예외)를 함께 받는다. 끝난 작업은 바로 지우므로 결과를 보관하지는 않는다
+    (보관은 LLM 응답 캐시가 담당). 기다리던 호출이 모두 취소되면 공유 작업도 취소한다.
+    태스크는 이벤트 루프에 묶이므로 진행 중인 호출 목록은 루프마다 따로 둔다.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._calls: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, Any]]" = weakref.WeakKeyDictionary()
+
+        self.calls = 0
+        self.upstream_calls = 0
+        self.collapsed = 0
+
+    def _in_flight(self) -> Dict[Hashable, Any]:
+        loop = asyncio.get_running_loop()
+        in_flight = self._calls.get(loop)
+        if in_flight is None:
+            in_flight = self._calls[loop] = {}
+        return in_flight
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """key가 같은 호출이 진행 중이면 그 결과를 기다리고, 없으면 fn()을 실행"""
+        self.calls += 1
+        if not self.enabled:
+            self.upstream_calls += 1
+            return await fn()
+
+        in_flight = self._in_flight()
+        call = in_flight.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            in_flight[key] = call
+            call.task.add_done_callback(lambda task: self._finish(in_flight, key, call))
+            self.upstream_calls += 1
+        else:
+            self.collapsed += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+
+    async def stream(self, key: Hashable, fn: Callable[[], AsyncIterator[Any]]) -> AsyncIterator[Any]:
+        """스트리밍 버전: 진행 중인 스트림에 합류하면 지금까지의 조각부터 이어서 받음"""
+        self.calls += 1
+        if not self.enabled:
+            self.upstream_calls += 1
+            async for item in fn():
+                yield item
+            return
+
+        in_flight = self._in_flight()
+        flight = in_flight.get(key)
+        if flight is None:
+            flight = _Stream()
+            in_flight[key] = flight
+            flight.task = asyncio.ensure_future(self._pump(flight, fn()))
+            flight.task.add_done_callback(lambda task: self._finish(in_flight, key, flight))
+            self.upstream_calls += 1
+        else:
+            self.collapsed += 1
+
+        flight.waiters += 1
+        try:
+            sent = 0
+            while True:
+                while sent < len(flight.items):
+                    yield flight.items[sent]
+                    sent += 1
+                if flight.done:
+                    if flight.error is not None:
+                        raise flight.error
+                    return
+                await flight.changed.wait()
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+
+    @staticmethod
+    async def _pump(flight: _Stream, iterator: AsyncIterator[Any]):
+        try:
+            async for item in iterator:
+                flight.items.append(item)
+                flight.notify()
+        except Exception as e:
+            flight.error = e
+        finally:
+            flight.done = True
+            flight.notify()
+
+    @staticmethod
+    def _finish(in_flight: Dict[Hashable, Any], key: Hashable, call: Any):
+        if in_flight.get(key) is call:
+            del in_flight[key]
+        # 기다리는 호출이 모두 떠난 뒤 실패한 경우 "exception was never retrieved" 경고 방지
+        if not call.task.cancelled():
+            call.task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """합쳐진 호출 수 (collapsed = calls - upstream_calls)"""
+        return {
+            "calls": self.calls,
+            "upstream_calls": self.upstream_calls,
+            "collapsed": self.collapsed,
+            "collapse_ratio": self.collapsed / self.calls if self.calls else 0.0,
+            "in_flight": sum(len(in_flight) for in_flight in self._calls.values()),
+        }
+
+
+single_flight = SingleFlight(enabled=settings.llm_single_flight_enabled)
@@ -0,0 +1,75 @@
+"""압축 저장 컬럼의 기존 행을 현재 설정(CONTENT_COMPRESSION)으로 다시 저장
+
+압축 저장을 켜기 전에 쌓인 행은 평문 그대로도 읽히므로 옮기지 않아도 동작하지만, 디스크를 줄이려면
+한 번 실행한다. 압축을 끄고(none) 실행하면 반대로 모두 평문으로 되돌린다. 문서 수정 시각과 버전은 바꾸지 않는다.
+
+backend 디렉터리에서 실행:
+
+    python -m app.services.storage [--vacuum]
+"""
+import argparse
+from typing import Dict
+
+from sqlalchemy import LargeBinary, bindparam, text, update
+from sqlalchemy.engine import Engine
+
+from app.core.database import Base, COMPRESSED_COLUMNS, engine, init_db
+from app.models.types import compress_text, decompress_text
+
+_BATCH = 500
+
+
+def recompress_column(engine: Engine, table_name: str, column_name: str) -> Dict[str, int]:
+    """한 컬럼의 모든 행을 다시 저장 (배치마다 커밋), 바뀐 행 수와 전후 바이트 수 반환"""
+    table = Base.metadata.tables[table_name]
+    values = {column_name: bindparam("data", type_=LargeBinary)}
+    if "updated_at" in table.c:
+        # Core UPDATE도 onupdate를 적용하므로 수정 시각을 그대로 유지
+        values["updated_at"] = table.c.updated_at
+    statement = update(table).where(table.c.id == bindparam("row_id")).values(values)
+    stats = {"rows": 0, "rewritten": 0, "bytes_before": 0, "bytes_after": 0}
+    last_id = 0
+    while True:
+        with engine.begin() as conn:
+            # 타입 처리 없이 저장된 값 그대로 읽음 (SQLite 평문 행은 str)
+            rows = conn.execute(text(
+                f"SELECT id, {column_name} FROM {table_name} "
+                f"WHERE id > :last_id AND {column_name} IS NOT NULL ORDER BY id LIMIT :batch"
+            ), {"last_id": last_id, "batch": _BATCH}).all()
+            if not rows:
+                return stats
+            changed = []
+            for id, stored in rows:
+                before = stored.encode("utf-8") if isinstance(stored, str) else bytes(stored)
+                after = compress_text(decompress_text(stored))
+                stats["bytes_before"] += len(before)
+                stats["bytes_after"] += len(after)
+                if isinstance(stored, str) or after != before:
+                    changed.append({"row_id": id, "data": after})
+            if changed:
+                conn.execute(statement, changed)
+            stats["rows"] += len(rows)
+            stats["rewritten"] += len(changed)
+            last_id = rows[-1][0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vacuum", action="store_true", help="끝나고 SQLite VACUUM으로 파일 크기 줄이기")
+    args = parser.parse_args()
+
+    # PostgreSQL 컬럼 타입 변경 등 스키마 보정 먼저
+    init_db()
+    for table_name, column_name in COMPRESSED_COLUMNS:
+        stats = recompress_column(engine, table_name, column_name)
+        print(
+            f"{table_name}.{column_name}: {stats['rewritten']}/{stats['rows']} rows rewritten, "
+            f"{stats['bytes_before'] / 1024 / 1024:.1f}MB -> {stats['bytes_after'] / 1024 / 1024:.1f}MB"
+        )
+    if args.vacuum and engine.dialect.name == "sqlite":
+        with engine.connect() as conn:
+            conn.execute(text("VACUUM"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import html
+import re
+from typing import List
+
+_BLOCK_TAG_RE = re.compile(r"<\s*/?\s*(p|div|br|li|ul|ol|h[1-6]|blockquote|pre|tr|td|th|table|section|article)\b[^>]*>", re.I)
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACE_RE = re.compile(r"[ \t\r\f\v]+")
+_NEWLINES_RE = re.compile(r"\n\s*\n+")
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def html_to_text(value: str) -> str:
+    """HTML 본문을 색인/프롬프트용 평문으로 변환 (파서 트리 없이 정규식으로 처리)"""
+    if not value:
+        return ""
+    text = _BLOCK_TAG_RE.sub("\n", value)
+    text = _TAG_RE.sub("", text)
+    text = html.unescape(text)
+    text = _SPACE_RE.sub(" ", text)
+    text = _NEWLINES_RE.sub("\n\n", text)
+    return text.strip()
+
+
+def tokenize(value: str) -> List[str]:
+    """검색어를 단어 단위로 분리 (한글 포함 유니코드 단어 문자 기준)"""
+    return [token.lower() for token in _WORD_RE.findall(value or "")]
+
+
+def make_snippet(text: str, terms: List[str], width: int = 160, start_mark: str = "<mark>", end_mark: str = "</mark>") -> str:
+    """첫 번째 일치 위치 주변을 잘라 검색어를 강조한 스니펫 생성 (HTML 이스케이프 포함)"""
+    lowered = text.lower()
+    positions = [lowered.find(term) for term in terms if term]
+    positions = [pos for pos in positions if pos >= 0]
+    start = max(0, min(positions) - width // 3) if positions else 0
+    excerpt = text[start:start + width]
+
+    escaped = html.escape(excerpt)
+    for term in sorted(set(terms), key=len, reverse=True):
+        if not term:
+            continue
+        escaped = re.sub(
+            re.escape(html.escape(term)),
+            lambda m: f"\x02{m.group(0)}\x03",
+            escaped,
+            flags=re.I,
+        )
+    escaped = escaped.replace("\x02", start_mark).replace("\x03", end_mark)
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if start + width < len(text) else ""
+    return f"{prefix}{escaped}{suffix}"
@@ -0,0 +1,321 @@
+"""요약 프롬프트용 웹 검색 보강
+
+검색 제공자(Google Custom Search, 오프라인 테스트용 로컬 fixture)로 결과를 받고, 결과 페이지를 공유 커넥션 풀로
+동시에 받아(호스트별 동시 요청 수 제한, 요청별/전체 타임아웃) 본문 문단을 추출한다. 추출은 BeautifulSoup 트리를
+만들지 않고 정규식으로 불필요한 블록을 지운 뒤 평문으로 바꾼다. 추출 결과는 page_cache에 ETag/Last-Modified와 함께
+저장해서 다음에는 조건부 요청으로 재검증만 한다. 마지막으로 모든 문단을 검색어와 BM25로 비교해 상위 몇 개만 프롬프트에 넣는다.
+"""
+import asyncio
+import json
+import logging
+import math
+import re
+import weakref
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.core.config import settings
+from app.core.metrics import stage
+from app.services.page_cache import page_cache
+from app.services.text_utils import html_to_text, tokenize
+
+logger = logging.getLogger(__name__)
+
+_DROP_BLOCK_RE = re.compile(
+    r"<(script|style|noscript|svg|template|iframe|nav|header|footer|aside|form|button|select)\b[^>]*>.*?</\1\s*>",
+    re.I | re.S,
+)
+_COMMENT_RE = re.compile(r"<!--.*?-->", re.S)
+_TITLE_RE = re.compile(r"<title[^>]*>(.*?)</title\s*>", re.I | re.S)
+_MAIN_RE = re.compile(r"<(article|main)\b[^>]*>(.*?)</\1\s*>", re.I | re.S)
+_CHARSET_RE = re.compile(rb"""<meta[^>]+charset=["']?([\w-]+)""", re.I)
+_SENTENCE_RE = re.compile(r"(?<=[.!?。])\s+")
+# 메뉴/버튼 글자 같은 짧은 줄은 본문이 아닌 것으로 봄
+_MIN_PASSAGE_CHARS = 40
+_MAX_PASSAGE_CHARS = 600
+# 쿼리를 만들 때 빼는 흔한 영어 단어 (한국어는 조사가 붙어 단어 빈도가 흩어지므로 따로 두지 않음)
+_STOPWORDS = frozenset("the and for that this with from are was were have has not but you your our can will".split())
+
+
+def extract_passages(html: str) -> Tuple[str, List[str]]:
+    """HTML에서 (제목, 본문 문단 목록) 추출 (article/main이 있으면 그 안만 사용)"""
+    title_match = _TITLE_RE.search(html)
+    title = html_to_text(title_match.group(1)) if title_match else ""
+    body = _DROP_BLOCK_RE.sub(" ", _COMMENT_RE.sub("", html))
+    main = _MAIN_RE.search(body)
+    if main and len(main.group(2)) > len(body) // 10:
+        body = main.group(2)
+    passages: List[str] = []
+    for line in html_to_text(body).split("\n"):
+        line = line.strip()
+        if len(line) < _MIN_PASSAGE_CHARS:
+            continue
+        if len(line) <= _MAX_PASSAGE_CHARS:
+            passages.append(line)
+            continue
+        # 긴 문단은 문장 경계에서 나눔
+        current = ""
+        for sentence in _SENTENCE_RE.split(line):
+            if current and len(current) + len(sentence) > _MAX_PASSAGE_CHARS:
+                passages.append(current)
+                current = ""
+            current = f"{current} {sentence}".strip()
+        if len(current) >= _MIN_PASSAGE_CHARS:
+            passages.append(current[:_MAX_PASSAGE_CHARS])
+    return title, passages
+
+
+def build_query(content: str, max_terms: int = 6) -> str:
+    """문서 본문에서 자주 나오는 단어로 검색어 생성 (앞쪽에 나온 단어 우선)"""
+    terms = [term for term in tokenize(html_to_text(content)[:5000]) if len(term) >= 2 and term not in _STOPWORDS]
+    counts = Counter(terms)
+    first_seen = {}
+    for position, term in enumerate(terms):
+        first_seen.setdefault(term, position)
+    ranked = sorted(counts, key=lambda term: (-counts[term], first_seen[term]))
+    return " ".join(ranked[:max_terms])
+
+
+def rank_passages(query: str, passages: List[str], limit: int) -> List[Tuple[int, float]]:
+    """BM25로 검색어와 관련 높은 문단 (인덱스, 점수) 상위 limit개
+
+    한국어는 조사가 붙으므로 문단 단어가 검색어로 시작하면 일치로 본다 (전문 검색과 같은 접두 일치).
+    """
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not terms or not passages:
+        return []
+    documents = [tokenize(passage) for passage in passages]
+    average_length = sum(len(tokens) for tokens in documents) / len(documents) or 1.0
+    frequencies = []
+    document_frequency = Counter()
+    for tokens in documents:
+        counts = Counter()
+        for token in tokens:
+            for term in terms:
+                if token.startswith(term):
+                    counts[term] += 1
+        frequencies.append(counts)
+        document_frequency.update(counts.keys())
+
+    k1, b = 1.2, 0.75
+    scores = []
+    for index, (tokens, counts) in enumerate(zip(documents, frequencies)):
+        score = 0.0
+        for term, tf in counts.items():
+            df = document_frequency[term]
+            idf = math.log(1 + (len(documents) - df + 0.5) / (df + 0.5))
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(tokens) / average_length))
+        if score > 0:
+            scores.append((index, score))
+    scores.sort(key=lambda item: -item[1])
+    return scores[:limit]
+
+
+class SearchProvider:
+    """검색 제공자 공통 인터페이스
+
+    search는 {"title", "url", "snippet"} 목록을 반환한다. "html"이 들어 있는 결과는 페이지를 받지 않고 그 본문을 쓴다.
+    """
+
+    async def search(self, client: httpx.AsyncClient, query: str, limit: int) -> List[Dict[str, str]]:
+        raise NotImplementedError
+
+
+class GoogleSearchProvider(SearchProvider):
+    """Google Custom Search JSON API (SEARCH_API_KEY, SEARCH_ENGINE_ID)"""
+
+    url = "https://www.googleapis.com/customsearch/v1"
+
+    async def search(self, client: httpx.AsyncClient, query: str, limit: int) -> List[Dict[str, str]]:
+        if not (settings.search_api_key and settings.search_engine_id):
+            return []
+        response = await client.get(self.url, params={
+            "key": settings.search_api_key,
+            "cx": settings.search_engine_id,
+            "q": query,
+            "num": min(limit, 10),
+        })
+        response.raise_for_status()
+        return [
+            {"title": item.get("title", ""), "url": item["link"], "snippet": item.get("snippet", "")}
+            for item in response.json().get("items", [])
+            if item.get("link")
+        ]
+
+
+class FixtureSearchProvider(SearchProvider):
+    """로컬 JSON 파일의 결과 목록에서 검색어와 많이 겹치는 순으로 반환 (네트워크 없는 테스트/벤치마크용)
+
+    파일은 [{"title", "url", "snippet", "html"(선택)}] 형식이다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._results: Optional[List[Dict[str, str]]] = None
+
+    async def search(self, client: httpx.AsyncClient, query: str, limit: int) -> List[Dict[str, str]]:
+        if self._results is None:
+            with open(self.path, encoding="utf-8") as file:
+                self._results = json.load(file)
+        texts = [f"{result.get('title', '')} {result.get('snippet', '')} {result.get('html', '')}" for result in self._results]
+        ranked = rank_passages(query, texts, limit)
+        return [self._results[index] for index, _ in ranked]
+
+
+def _provider(name: str) -> Optional[SearchProvider]:
+    if name == "google":
+        return GoogleSearchProvider()
+    if name == "fixture":
+        return FixtureSearchProvider(settings.web_search_fixture_path)
+    return None
+
+
+class WebSearch:
+    """검색 → 페이지 동시 수집/추출 → 문단 순위 매기기
+
+    httpx 커넥션 풀과 호스트별 semaphore는 이벤트 루프에 묶이므로 llm_client처럼 루프마다 한 번만 만든다.
+    """
+
+    def __init__(self):
+        self.provider = _provider(settings.web_search_provider)
+        self.cache = page_cache
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+        self._host_limits: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+
+    async def enrich(self, content: str) -> Tuple[str, List[str]]:
+        """본문으로 검색해서 프롬프트용 참고 문단과 출처 목록 반환 (실패하거나 결과가 없으면 안내 문구와 빈 목록)"""
+        query = build_query(content)
+        if self.provider is None or not query:
+            return "웹 검색 결과 없음", []
+        try:
+            passages = await self._collect(query)
+        except Exception:
+            # 검색은 보강일 뿐이므로 실패해도 요약은 계속
+            logger.warning("Web search failed for %r", query, exc_info=True)
+            return "웹 검색 결과 없음", []
+
+        ranked = rank_passages(query, [text for _, text in passages], settings.web_search_max_passages)
+        if not ranked:
+            return "웹 검색 결과 없음", []
+        context, sources = [], []
+        for index, _ in ranked:
+            result, text = passages[index]
+            source = f"{result['title']} ({result['url']})" if result.get("title") else result["url"]
+            if source not in sources:
+                sources.append(source)
+            context.append(f"[{sources.index(source) + 1}] {text}")
+        listing = "\n".join(f"[{number}] {source}" for number, source in enumerate(sources, 1))
+        return "\n\n".join(context) + f"\n\n출처 목록:\n{listing}", sources
+
+    async def _collect(self, query: str) -> List[Tuple[Dict[str, str], str]]:
+        """검색 결과 페이지를 동시에 받아 (결과, 문단) 목록으로 (페이지를 못 받으면 검색 결과 스니펫 사용)"""
+        client = self._get_client()
+        with stage("web_search_api"):
+            results = await self.provider.search(client, query, settings.web_search_max_results)
+
+        async def page(result: Dict[str, str]) -> List[Tuple[Dict[str, str], str]]:
+            passages: List[str] = []
+            try:
+                if result.get("html"):
+                    title, passages = await asyncio.to_thread(extract_passages, result["html"])
+                else:
+                    title, passages = await self._fetch(client, result["url"])
+                result = {**result, "title": result.get("title") or title}
+            except Exception as e:
+                logger.info("Skipping %s: %s", result.get("url"), e)
+            if not passages and result.get("snippet"):
+                passages = [html_to_text(result["snippet"])]
+            return [(result, text) for text in passages]
+
+        if not results:
+            return []
+        with stage("web_fetch"):
+            # 전체 시간 안에 끝난 페이지만 사용 (느린 페이지 하나가 요약 전체를 붙잡지 않도록)
+            tasks = [asyncio.create_task(page(result)) for result in results]
+            done, pending = await asyncio.wait(tasks, timeout=settings.web_search_timeout)
+            for task in pending:
+                task.cancel()
+        return [item for task in tasks if task in done for item in task.result()]
+
+    async def _fetch(self, client: httpx.AsyncClient, url: str) -> Tuple[str, List[str]]:
+        """페이지 하나의 (제목, 문단) (캐시가 신선하면 그대로, 오래됐으면 조건부 요청으로 재검증)"""
+        cached = await asyncio.to_thread(self.cache.get, url)
+        if cached is not None and cached["fresh"]:
+            return cached["title"], cached["passages"]
+
+        headers = {}
+        if cached is not None:
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        async with self._host_limit(urlsplit(url).hostname or ""):
+            async with client.stream("GET", url, headers=headers, timeout=settings.web_fetch_timeout) as response:
+                if response.status_code == 304 and cached is not None:
+                    await asyncio.to_thread(self.cache.touch, url)
+                    return cached["title"], cached["passages"]
+                response.raise_for_status()
+                content_type = response.headers.get("content-type", "")
+                if "html" not in content_type and "text/plain" not in content_type:
+                    raise ValueError(f"unsupported content type {content_type!r}")
+                body = bytearray()
+                async for chunk in response.aiter_bytes():
+                    body.extend(chunk)
+                    if len(body) >= settings.web_fetch_max_bytes:
+                        break
+                etag, last_modified = response.headers.get("etag"), response.headers.get("last-modified")
+                encoding = response.charset_encoding
+
+        title, passages = await asyncio.to_thread(self._parse, bytes(body), encoding)
+        await asyncio.to_thread(self.cache.set, url, title, passages, etag, last_modified)
+        return title, passages
+
+    @staticmethod
+    def _parse(body: bytes, encoding: Optional[str]) -> Tuple[str, List[str]]:
+        if not encoding:
+            match = _CHARSET_RE.search(body[:4096])
+            encoding = match.group(1).decode("ascii") if match else "utf-8"
+        try:
+            html = body.decode(encoding, errors="replace")
+        except LookupError:
+            html = body.decode("utf-8", errors="replace")
+        return extract_passages(html)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.web_fetch_max_connections,
+                    max_keepalive_connections=settings.web_fetch_max_connections,
+                ),
+                timeout=settings.web_fetch_timeout,
+                follow_redirects=True,
+                headers={"User-Agent": "ai-note-app/1.0 (+web search enrichment)"},
+            )
+            self._clients[loop] = client
+        return client
+
+    def _host_limit(self, host: str) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        limits = self._host_limits.setdefault(loop, {})
+        semaphore = limits.get(host)
+        if semaphore is None:
+            semaphore = limits[host] = asyncio.Semaphore(settings.web_fetch_per_host)
+        return semaphore
+
+    async def aclose(self):
+        """현재 이벤트 루프에 묶인 클라이언트 정리"""
+        loop = asyncio.get_running_loop()
+        client = self._clients.pop(loop, None)
+        self._host_limits.pop(loop, None)
+        if client is not None:
+            await client.aclose()
+
+
+web_search = WebSearch()
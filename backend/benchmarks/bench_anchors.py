@@ -0,0 +1,169 @@
+"""메모 앵커 이동과 구간 조회 벤치마크
+
+긴 문서 하나에 앵커가 있는 메모를 단계별로 늘려 가며 잰다.
+
+- patch: 문서 앞부분에 글자를 넣는 PATCH (모든 앵커가 움직임) / 끝부분 PATCH (거의 안 움직임) 지연
+- map: 앵커 이동 계산만 (numpy 배열 연산 vs 메모마다 파이썬으로 옮기는 경우)
+- list: 메모 전체 목록(클라이언트가 직접 다시 맞추려면 필요) vs 화면 구간([start, end)) 메모만 받는 경우의 지연과 응답 크기
+- put: 앵커 하나의 바로 앞뒤 두 곳에 글을 넣은 본문 전체를 PUT (이전 본문과 비교한 편집 연산으로 앵커 이동)
+
+PATCH 뒤와 PUT 뒤에 앵커가 가리키던 글자가 그대로인지 확인하고, 다르면 종료 코드 1.
+
+backend 디렉터리에서 실행:
+
+    python -m benchmarks.bench_anchors --memos 1000 5000 20000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+
+def _python_map(anchors, ops):
+    """비교용: 메모마다 연산을 차례로 적용 (app.services.anchors와 같은 규칙)"""
+    result = []
+    for start, end in anchors:
+        for op in ops:
+            size, removed = len(op["text"]), op["end"] - op["start"]
+            if start > op["end"]:
+                start += size - removed
+            elif start >= op["start"]:
+                start = op["start"] if start == op["start"] and removed else op["start"] + size
+            if end > op["end"]:
+                end += size - removed
+            elif end >= op["start"]:
+                end = op["start"] + size if end == op["end"] and removed else op["start"]
+            end = max(start, end)
+        result.append((start, end))
+    return result
+
+
+def _timed(function, repeat: int):
+    elapsed = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        elapsed.append((time.perf_counter() - started) * 1000)
+    return statistics.median(elapsed), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--memos", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--document-chars", type=int, default=200000)
+    parser.add_argument("--viewport", type=int, default=4000, help="화면 구간 길이 (UTF-16 단위)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench_anchors.db')}"
+    os.environ["RELATED_INDEX_PATH"] = os.path.join(workdir, "related_index")
+    os.environ["AI_JOB_WORKERS"] = "0"
+
+    import numpy as np
+    from fastapi.testclient import TestClient
+    from sqlalchemy import text
+    from app.core.database import engine, init_db
+    from app.models.ai_memo import AIMemo
+    from app.services.anchors import map_anchors
+
+    init_db()
+    from app.main import app
+
+    rng = random.Random(args.seed)
+    words = ["alpha", "beta", "gamma", "delta", "epsilon", "zeta", "theta", "kappa"]
+    client = TestClient(app)
+    with engine.connect() as conn:
+        plan = conn.execute(text(
+            "EXPLAIN QUERY PLAN SELECT id FROM ai_memos WHERE document_id = 1 AND anchor_position IS NOT NULL "
+            "AND anchor_position < 100 AND (anchor_position >= 50 OR coalesce(anchor_end, anchor_position) > 50)"
+        )).all()
+    print("plan: " + " / ".join(row[-1] for row in plan))
+
+    failed = False
+    for memo_count in args.memos:
+        body = []
+        while sum(map(len, body)) < args.document_chars:
+            body.append(f"<p>{' '.join(rng.choices(words, k=12))}</p>")
+        content = "".join(body)
+        document = client.post("/api/v1/documents/", json={"title": f"anchors {memo_count}", "content": content}).json()
+        document_id, version = document["id"], document["version"]
+
+        rows = []
+        for i in range(memo_count):
+            start = rng.randrange(len(content) - 20)
+            rows.append({
+                "document_id": document_id,
+                "type": "summary",
+                "content": f"<p>memo {i} {' '.join(rng.choices(words, k=40))}</p>",
+                "anchor_position": start,
+                "anchor_end": start + rng.randint(1, 20),
+                "memo_metadata": {"confidence": 0.85},
+            })
+        with engine.begin() as conn:
+            conn.execute(AIMemo.__table__.insert(), rows)
+        anchored = {row["content"]: content[row["anchor_position"]:row["anchor_end"]] for row in rows}
+
+        def patch(position):
+            nonlocal version
+            response = client.patch(
+                f"/api/v1/documents/{document_id}",
+                json={"base_version": version, "ops": [{"start": position, "end": position, "text": "<b>x</b>"}]},
+            )
+            response.raise_for_status()
+            version = response.json()["version"]
+
+        # 본문 끝의 </p> 바로 앞에 넣으므로 HTML은 그대로 유효
+        head_ms, _ = _timed(lambda: patch(3), args.repeat)
+        tail_ms, _ = _timed(lambda: patch(len(content) + (version - 1) * 8 - 4), args.repeat)
+
+        ops = [{"start": 3, "end": 3, "text": "<b>x</b>"}]
+        starts = np.array([row["anchor_position"] for row in rows], dtype=np.int64)
+        ends = np.array([row["anchor_end"] for row in rows], dtype=np.int64)
+        numpy_ms, _ = _timed(lambda: map_anchors(starts, ends, ops), args.repeat)
+        pairs = list(zip(starts.tolist(), ends.tolist()))
+        python_ms, _ = _timed(lambda: _python_map(pairs, ops), args.repeat)
+
+        path = f"/api/v1/ai-memos/document/{document_id}"
+        full_ms, full = _timed(lambda: client.get(path), max(3, args.repeat // 4))
+        middle = len(content) // 2
+        view_ms, view = _timed(lambda: client.get(path, params={"start": middle, "end": middle + args.viewport}), args.repeat)
+
+        def drifted(current):
+            memos = client.get(path).json()
+            return sum(current[m["anchor_position"]:m["anchor_end"]] != anchored[m["content"]] for m in memos)
+
+        current = client.get(f"/api/v1/documents/{document_id}", params={"memo_limit": 1}).json()["content"]
+        moved = drifted(current)
+
+        # 어느 앵커 안쪽도 아닌 단어 사이 공백 위치에만 넣으므로 모든 앵커가 가리키던 글자가 그대로여야 함
+        memos = client.get(path).json()
+        inside = np.zeros(len(current) + 1, dtype=np.int64)
+        np.add.at(inside, [m["anchor_position"] + 1 for m in memos], 1)
+        np.add.at(inside, [m["anchor_end"] for m in memos], -1)
+        free = [i for i, count in enumerate(np.cumsum(inside)[:-1]) if not count and current[i] == " "]
+        target = memos[rng.randrange(len(memos))]
+        before = max((i for i in free if i <= target["anchor_position"]), default=free[0])
+        after = min((i for i in free if i >= target["anchor_end"]), default=free[-1])
+        edited = current[:before] + "수정" + current[before:after] + "수정" + current[after:]
+        put_ms, _ = _timed(lambda: client.put(f"/api/v1/documents/{document_id}", json={"content": edited}).raise_for_status(), 1)
+        put_moved = drifted(edited)
+        failed |= bool(moved or put_moved)
+        print(
+            f"{memo_count:>6} memos  patch head {head_ms:7.2f}ms tail {tail_ms:6.2f}ms  "
+            f"map numpy {numpy_ms:6.3f}ms python {python_ms:7.3f}ms  "
+            f"list all {full_ms:7.2f}ms {len(full.content) / 1024:7.1f}KB  "
+            f"viewport {view_ms:6.2f}ms {len(view.content) / 1024:5.1f}KB ({len(view.json())} memos)  "
+            f"put {put_ms:7.2f}ms  "
+            + ("ok" if not moved and not put_moved else f"{moved} anchors drifted after patch, {put_moved} after put")
+        )
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
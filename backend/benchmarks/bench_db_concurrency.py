@@ -0,0 +1,123 @@
+"""SQLite 동시 읽기/쓰기 부하 테스트
+
+자동 저장처럼 큰 문서를 계속 덮어쓰는 쓰기 스레드 하나와 문서를 읽는 스레드 여러 개를
+동시에 돌려서, 저널 모드별 읽기 지연과 처리량을 비교한다. rollback journal(DELETE)에서는
+커밋 중 읽기가 잠금을 기다리지만, WAL에서는 쓰기와 관계없이 읽기가 진행되어야 한다.
+
+backend 디렉터리에서 실행 (저널 모드별로 하위 프로세스를 띄워 비교):
+
+    python -m benchmarks.bench_db_concurrency --readers 4 --seconds 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+
+def _run(args):
+    workdir = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench_db.db')}"
+    os.environ["RELATED_INDEX_PATH"] = os.path.join(workdir, "related_index")
+    os.environ["SQLITE_JOURNAL_MODE"] = args.journal_mode
+    os.environ["SQLITE_SYNCHRONOUS"] = "FULL" if args.journal_mode != "WAL" else "NORMAL"
+
+    from sqlalchemy import text
+    from app.core.database import engine, init_db
+
+    init_db()
+    body = "<p>" + "가나다라마바사 " * (args.document_kb * 1024 // 22) + "</p>"
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO documents (title, content, version) VALUES (:title, :content, 1)"),
+            [{"title": f"문서 {i}", "content": body} for i in range(args.documents)],
+        )
+
+    stop = threading.Event()
+    read_latencies = []
+    errors = []
+    writes = [0]
+    lock = threading.Lock()
+
+    def writer():
+        n = 0
+        while not stop.is_set():
+            n += 1
+            try:
+                with engine.begin() as conn:
+                    conn.execute(
+                        text("UPDATE documents SET content = :content, version = version + 1 WHERE id = :id"),
+                        {"content": body + str(n), "id": n % args.documents + 1},
+                    )
+                writes[0] += 1
+            except Exception as e:
+                errors.append(f"write: {e.__class__.__name__}")
+
+    def reader(seed):
+        n = seed
+        local = []
+        while not stop.is_set():
+            n += 1
+            t0 = time.perf_counter()
+            try:
+                with engine.connect() as conn:
+                    conn.execute(
+                        text("SELECT id, title, content FROM documents WHERE id = :id"),
+                        {"id": n % args.documents + 1},
+                    ).first()
+                local.append((time.perf_counter() - t0) * 1000)
+            except Exception as e:
+                errors.append(f"read: {e.__class__.__name__}")
+        with lock:
+            read_latencies.extend(local)
+
+    threads = [threading.Thread(target=writer)]
+    threads += [threading.Thread(target=reader, args=(i * 7,)) for i in range(args.readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    read_latencies.sort()
+
+    def pct(p):
+        return read_latencies[min(len(read_latencies) - 1, int(len(read_latencies) * p))] if read_latencies else 0.0
+
+    print(
+        f"journal={args.journal_mode:<6} writes={writes[0]:<5} reads={len(read_latencies):<7} "
+        f"reads/s={len(read_latencies) / args.seconds:<9.0f} "
+        f"read p50={pct(0.50):.2f}ms p99={pct(0.99):.2f}ms max={read_latencies[-1] if read_latencies else 0:.1f}ms "
+        f"mean={statistics.mean(read_latencies) if read_latencies else 0:.2f}ms errors={len(errors)}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--journal-mode", choices=["DELETE", "WAL"], help="지정하면 해당 모드만 실행")
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--documents", type=int, default=50)
+    parser.add_argument("--document-kb", type=int, default=200)
+    args = parser.parse_args()
+
+    if args.journal_mode:
+        _run(args)
+        return
+
+    # 엔진 설정은 임포트 시점에 정해지므로 모드마다 새 프로세스에서 실행
+    for mode in ("DELETE", "WAL"):
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_db_concurrency", "--journal-mode", mode,
+             "--readers", str(args.readers), "--seconds", str(args.seconds),
+             "--documents", str(args.documents), "--document-kb", str(args.document_kb)],
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""문서 가져오기/내보내기 검사 (문서 하나씩 POST vs 일괄 생성 API)
+
+합성 문서(각각 AI 메모 포함)를 POST /documents/와 POST /ai-memos/bulk를 문서마다 부르는 방식과
+POST /documents/bulk로 나눠 보내는 방식으로 각각 빈 DB에 가져와 걸린 시간을 비교한다.
+일괄 생성은 연관 노트 색인을 응답 뒤에 채우므로 실제처럼 uvicorn으로 띄워서 재고, 색인이 따라잡는 데
+걸린 시간을 따로 출력한다. 이어서 GET /documents/export로 전체를 NDJSON으로 내보내고 문서/메모 수와
+최대 RSS를 확인한다.
+
+backend 디렉터리에서 실행:
+
+    python -m benchmarks.bench_import --documents 50000 --single 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import socket
+import tempfile
+import time
+
+
+def _documents(count: int, memos_per_document: int, seed: int):
+    from benchmarks.corpus import lognormal_length, paragraphs, vocabulary, zipf_weights
+
+    rng = random.Random(seed)
+    words = vocabulary(20000, rng)
+    weights = zipf_weights(len(words))
+    return [
+        {
+            "title": " ".join(rng.choices(words, weights=weights, k=4)),
+            "content": paragraphs(words, weights, rng, lognormal_length(rng, 300)),
+            "ai_memos": [
+                {"type": "summary", "content": paragraphs(words, weights, rng, 80)} for _ in range(memos_per_document)
+            ],
+        }
+        for _ in range(count)
+    ]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _run(args):
+    import httpx
+    import uvicorn
+    from app.core.config import settings
+    from app.core.database import init_db
+    from app.main import app
+    from app.services.related import related_notes
+
+    init_db()
+    documents = _documents(args.documents, args.memos_per_document, args.seed)
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=600) as client:
+        # 하나씩: 문서 POST 한 번 + 메모 저장 한 번 (문서마다 커밋 2회)
+        single = documents[:args.single]
+        started = time.perf_counter()
+        for document in single:
+            created = (await client.post("/api/v1/documents/", json=document)).json()
+            memos = [{**memo, "document_id": created["id"]} for memo in document["ai_memos"]]
+            if memos:
+                (await client.post("/api/v1/ai-memos/bulk", json={"memos": memos})).raise_for_status()
+        single_seconds = time.perf_counter() - started
+        print(f"one by one  {len(single):>6} documents  {single_seconds:7.2f}s  {len(single) / single_seconds:8.0f} docs/s")
+
+        ids = [document["id"] for document in (await client.get("/api/v1/documents/", params={"limit": 200})).json()["items"]]
+        while ids:
+            (await client.post("/api/v1/documents/bulk/delete", json={"ids": ids})).raise_for_status()
+            ids = [d["id"] for d in (await client.get("/api/v1/documents/", params={"limit": 200})).json()["items"]]
+
+        started = time.perf_counter()
+        for i in range(0, len(documents), settings.bulk_max_items):
+            response = await client.post("/api/v1/documents/bulk", json={"documents": documents[i:i + settings.bulk_max_items]})
+            response.raise_for_status()
+        bulk_seconds = time.perf_counter() - started
+        print(f"bulk        {len(documents):>6} documents  {bulk_seconds:7.2f}s  {len(documents) / bulk_seconds:8.0f} docs/s")
+        while len(related_notes._rows) < len(documents):
+            await asyncio.sleep(0.1)
+        print(f"related index caught up after {time.perf_counter() - started:.2f}s")
+
+        started = time.perf_counter()
+        exported_documents = exported_memos = exported_bytes = 0
+        async with client.stream("GET", "/api/v1/documents/export") as response:
+            async for line in response.aiter_lines():
+                if line:
+                    exported_documents += 1
+                    exported_memos += len(json.loads(line)["ai_memos"])
+                    exported_bytes += len(line.encode("utf-8")) + 1
+        export_seconds = time.perf_counter() - started
+        print(
+            f"export      {exported_documents:>6} documents  {export_seconds:7.2f}s  "
+            f"{exported_memos} memos  {exported_bytes / 1024 / 1024:.1f}MB"
+        )
+    server.should_exit = True
+    await serving
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"peak RSS {peak:.0f}MB")
+    expected_memos = len(documents) * args.memos_per_document
+    print("ok" if (exported_documents, exported_memos) == (len(documents), expected_memos) else "MISMATCH")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=50000)
+    parser.add_argument("--memos-per-document", type=int, default=1)
+    parser.add_argument("--single", type=int, default=2000, help="하나씩 가져올 문서 수 (앞에서부터)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench_import.db')}"
+    os.environ["RELATED_INDEX_PATH"] = os.path.join(workdir, "related_index")
+    os.environ["AI_JOB_WORKERS"] = "0"
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
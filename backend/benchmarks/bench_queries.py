@@ -0,0 +1,89 @@
+"""요청당 SQL 실행 횟수 검사
+
+메모 개수를 늘려 가며 같은 요청을 보내고, 요청마다 실행된 SQL 문 수가 메모 개수와
+관계없이 일정한지 확인한다 (N+1 회귀 방지). 일정하지 않으면 종료 코드 1.
+
+backend 디렉터리에서 실행:
+
+    python -m benchmarks.bench_queries
+"""
+import argparse
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+REQUESTS = [
+    "/api/v1/documents/{id}",
+    "/api/v1/documents/{id}?memo_limit=5",
+    "/api/v1/documents/{id}?memo_limit=5&memo_content_length=100",
+    "/api/v1/ai-memos/document/{id}",
+]
+
+
+@contextmanager
+def count_queries(engine):
+    """블록 안에서 실행된 SQL 문 수를 세는 컨텍스트 (리스트 하나에 누적)"""
+    from sqlalchemy import event
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--memo-counts", type=int, nargs="+", default=[0, 1, 10, 100])
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench_queries.db')}"
+    os.environ["RELATED_INDEX_PATH"] = os.path.join(workdir, "related_index")
+
+    from fastapi.testclient import TestClient
+    from app.core.database import SessionLocal, async_engine, init_db
+    from app.main import app
+    from app.models.ai_memo import AIMemo
+    from app.models.document import Document
+
+    init_db()
+    document_ids = {}
+    db = SessionLocal()
+    try:
+        for memo_count in args.memo_counts:
+            document = Document(title=f"메모 {memo_count}개", content="<p>본문</p>")
+            document.ai_memos = [
+                AIMemo(type="summary", content=f"<p>메모 {i}</p>" * 50, memo_metadata={"confidence": 0.9})
+                for i in range(memo_count)
+            ]
+            db.add(document)
+            db.commit()
+            document_ids[memo_count] = document.id
+    finally:
+        db.close()
+
+    client = TestClient(app)
+    failed = False
+    for path in REQUESTS:
+        counts = {}
+        for memo_count, document_id in document_ids.items():
+            with count_queries(async_engine.sync_engine) as statements:
+                response = client.get(path.format(id=document_id))
+            assert response.status_code == 200, response.text
+            counts[memo_count] = len(statements)
+        constant = len(set(counts.values())) == 1
+        failed |= not constant
+        print(f"{'ok  ' if constant else 'FAIL'} {path:<60} " + " ".join(f"{n}memos={c}" for n, c in counts.items()))
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""OpenAI 속도 제한 검사 (429를 돌려주는 로컬 스텁 서버 사용)
+
+초당 요청 수를 넘으면 429와 Retry-After를 돌려주는 OpenAI 호환 스텁 서버를 띄우고,
+대화형 요청과 백그라운드 요청을 동시에 보낸다. 클라이언트 속도 제한을 끈 경우와 켠 경우의
+스텁이 돌려준 429 수, 실패 수, 우선순위별 지연을 비교한다. 네트워크나 API 키 없이 실행된다.
+
+backend 디렉터리에서 실행:
+
+    python -m benchmarks.bench_rate_limit --server-rps 5 --interactive 20 --background 40
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import tempfile
+import time
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _stub_app(rps: float, latency: float, counters: dict):
+    """초당 rps개(버스트 1초)까지 받는 /v1/chat/completions 스텁"""
+    from fastapi import FastAPI, Request
+    from fastapi.responses import JSONResponse
+
+    app = FastAPI()
+    bucket = {"level": rps, "updated": time.monotonic()}
+
+    @app.post("/v1/chat/completions")
+    async def completions(request: Request):
+        now = time.monotonic()
+        bucket["level"] = min(rps, bucket["level"] + (now - bucket["updated"]) * rps)
+        bucket["updated"] = now
+        if bucket["level"] < 1:
+            counters["429"] += 1
+            retry_after = (1 - bucket["level"]) / rps
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+                status_code=429,
+                headers={"retry-after-ms": str(int(retry_after * 1000)), "retry-after": str(max(1, round(retry_after)))},
+            )
+        bucket["level"] -= 1
+        counters["ok"] += 1
+        body = await request.json()
+        await asyncio.sleep(latency)
+        return {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body["model"],
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "<p>stub</p>"}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 50, "completion_tokens": 10, "total_tokens": 60},
+        }
+
+    return app
+
+
+async def _scenario(label: str, args, limiter, base_url: str):
+    import uvicorn
+    from app.services.llm_client import llm_client
+
+    counters = {"ok": 0, "429": 0}
+    port = int(base_url.rsplit(":", 1)[1].split("/")[0])
+    server = uvicorn.Server(uvicorn.Config(_stub_app(args.server_rps, args.latency, counters), port=port, log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    llm_client.limiter = limiter
+    latencies = {"interactive": [], "background": []}
+    failures = {"interactive": 0, "background": 0}
+
+    async def call(priority: str, delay: float, n: int):
+        await asyncio.sleep(delay)
+        t0 = time.perf_counter()
+        try:
+            await llm_client.chat(messages=[{"role": "user", "content": f"요청 {n}"}], max_tokens=10, priority=priority)
+            latencies[priority].append(time.perf_counter() - t0)
+        except Exception:
+            failures[priority] += 1
+
+    # 백그라운드 작업이 먼저 몰려 있는 상태에서 대화형 요청이 뒤따라 들어오는 상황
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(call("background", 0, i) for i in range(args.background)),
+        *(call("interactive", 0.2 + i * 0.1, i) for i in range(args.interactive)),
+    )
+    elapsed = time.perf_counter() - started
+    await llm_client.aclose()
+
+    def p50(values):
+        return f"{statistics.median(values):.2f}s" if values else "-"
+
+    print(
+        f"{label:<14} stub_429={counters['429']:<4} failed(i/b)={failures['interactive']}/{failures['background']:<4} "
+        f"interactive p50={p50(latencies['interactive']):<7} background p50={p50(latencies['background']):<7} "
+        f"total={elapsed:.1f}s"
+    )
+    server.should_exit = True
+    await serving
+
+
+async def _run(args):
+    from app.services.rate_limiter import RateLimiter
+
+    base_url = os.environ["OPENAI_BASE_URL"]
+    await _scenario("no limiter", args, RateLimiter(max_wait=args.max_wait), base_url)
+    await _scenario(
+        "limiter",
+        args,
+        RateLimiter(
+            requests_per_minute=int(args.server_rps * 60),
+            burst_seconds=1.0,
+            interactive_reserve=0.2,
+            max_wait=args.max_wait,
+        ),
+        base_url,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server-rps", type=float, default=5.0)
+    parser.add_argument("--interactive", type=int, default=20)
+    parser.add_argument("--background", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.05, help="스텁 응답 지연 (초)")
+    parser.add_argument("--retries", type=int, default=2, help="OPENAI_MAX_RETRIES")
+    parser.add_argument("--max-wait", type=float, default=60.0)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench_rate_limit.db')}"
+    os.environ["RELATED_INDEX_PATH"] = os.path.join(workdir, "related_index")
+    os.environ["OPENAI_API_KEY"] = "stub"
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{_free_port()}/v1"
+    os.environ["OPENAI_MAX_RETRIES"] = str(args.retries)
+    os.environ["OPENAI_MAX_CONCURRENCY"] = str(args.interactive + args.background)
+    os.environ["LLM_CACHE_ENABLED"] = "False"
+
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""LLM 녹화/재생 백엔드 확인 (네트워크나 API 키 없이 실행)
+
+첫 토큰 지연과 초당 토큰 수가 요청마다 다른(로그정규 분포) OpenAI 호환 스트리밍 스텁 서버를 띄우고,
+LLM_RECORD=True로 POST /ai-memos/generate/stream을 동시에 보내 녹화한다. 그다음 스텁 서버를 끄고
+재생 백엔드로 단계별로 다시 보낸다.
+
+- record: 스텁 서버 호출 (녹화)
+- replay: 같은 요청 재생 (녹화된 시간 그대로), 클라이언트가 잰 첫 토큰/전체 지연 분포가 record와 비슷해야 함
+- replay_new: 녹화에 없는 요청 (LLM_REPLAY_ON_MISS=any, 같은 모델의 녹화 중 하나)
+- replay_fixed: 첫 토큰 지연과 초당 토큰 수 고정 (fixed 프로필)
+- replay_x0: 기다리지 않음 (LLM 대기를 뺀 생성 경로 자체의 처리량)
+
+replay의 첫 토큰/전체 지연 p50이 record와 --tolerance 비율 이상 다르거나 오류가 있으면 종료 코드 1.
+
+backend 디렉터리에서 실행:
+
+    python -m benchmarks.bench_replay --requests 200 --concurrency 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import sys
+import tempfile
+import time
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _stub_app(first_token: float, tokens_per_second: float, seed: int):
+    """요청마다 첫 토큰 지연과 출력 속도를 무작위로 정하는 /v1/chat/completions 스텁 (스트리밍만)"""
+    from fastapi import FastAPI, Request
+    from fastapi.responses import StreamingResponse
+
+    app = FastAPI()
+    rng = random.Random(seed)
+    words = ["alpha", "beta", "gamma", "delta", "epsilon", "zeta", "theta", "kappa"]
+
+    @app.post("/v1/chat/completions")
+    async def completions(request: Request):
+        body = await request.json()
+        delay = rng.lognormvariate(0, 0.5) * first_token
+        speed = rng.lognormvariate(0, 0.3) * tokens_per_second
+        tokens = rng.randint(20, 80)
+
+        def chunk(content: str) -> str:
+            return "data: " + json.dumps({
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body["model"],
+                "choices": [{"index": 0, "delta": {"content": content}, "finish_reason": None}],
+            }) + "\n\n"
+
+        async def events():
+            await asyncio.sleep(delay)
+            yield chunk("<p>")
+            for i in range(tokens):
+                await asyncio.sleep(1 / speed)
+                yield chunk(words[i % len(words)] + " ")
+            yield chunk("</p>")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+async def _generate(client, document_id: int, content: str):
+    """(첫 토큰까지 초, 전체 초, 성공 여부)"""
+    started = time.perf_counter()
+    first, event = None, None
+    async with client.stream(
+        "POST",
+        "/api/v1/ai-memos/generate/stream",
+        json={"type": "summary", "content": content, "use_cache": False, "document_id": document_id},
+    ) as response:
+        async for line in response.aiter_lines():
+            if line.startswith("event: "):
+                event = line[7:]
+                if event == "token" and first is None:
+                    first = time.perf_counter() - started
+                if event in ("done", "error"):
+                    break
+    total = time.perf_counter() - started
+    return (first if first is not None else total), total, event == "done"
+
+
+async def _phase(label: str, client, document_id: int, contents, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(content: str):
+        async with semaphore:
+            return await _generate(client, document_id, content)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(one(content) for content in contents))
+    elapsed = time.perf_counter() - started
+    firsts = sorted(first for first, _, ok in results if ok)
+    totals = sorted(total for _, total, ok in results if ok)
+
+    def p(values, q):
+        return values[min(len(values) - 1, int(len(values) * q))] * 1000 if values else 0.0
+
+    row = {
+        "label": label,
+        "errors": sum(not ok for _, _, ok in results),
+        "first_p50": p(firsts, 0.5),
+        "first_p95": p(firsts, 0.95),
+        "total_p50": p(totals, 0.5),
+        "total_p95": p(totals, 0.95),
+        "rps": len(contents) / elapsed,
+    }
+    print(
+        f"{label:<13} errors={row['errors']:<3} first token p50={row['first_p50']:7.1f}ms p95={row['first_p95']:7.1f}ms  "
+        f"total p50={row['total_p50']:7.1f}ms p95={row['total_p95']:7.1f}ms  req/s={row['rps']:7.1f}"
+    )
+    return row
+
+
+async def _serve(app, port: int):
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning"))
+    server.task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    return server
+
+
+async def _run(args, stub_port: int):
+    import httpx
+    from app.core.database import async_engine
+    from app.main import app
+    from app.services.llm_backends import RecordingBackend, ReplayBackend
+    from app.services.llm_client import llm_client
+    from app.services.llm_recordings import LLMRecordingStore
+
+    # 조각이 도착하는 시각을 재야 하므로 (ASGITransport는 응답을 다 모아서 돌려줌) 앱도 uvicorn으로 띄움
+    stub = await _serve(_stub_app(args.first_token, args.tokens_per_second, args.seed), stub_port)
+    server = await _serve(app, _free_port())
+
+    rng = random.Random(args.seed)
+    words = ["note", "memo", "idea", "plan", "draft", "review", "summary", "question"]
+    contents = [f"<p>{' '.join(rng.choices(words, k=20))} {i}</p>" for i in range(args.requests)]
+    fresh = [f"<p>{' '.join(rng.choices(words, k=20))} new {i}</p>" for i in range(args.requests)]
+
+    rows = {}
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{server.config.port}", timeout=120) as client:
+            document_id = (await client.post("/api/v1/documents/", json={"title": "replay", "content": "<p>x</p>"})).json()["id"]
+
+            assert isinstance(llm_client.backend, RecordingBackend)
+            store = llm_client.backend.store
+            # 연결과 openai SDK 임포트 비용이 record 분포에 섞이지 않도록 먼저 몇 개 보냄 (이것도 녹화됨)
+            await _phase("warmup", client, document_id, fresh[:args.concurrency], args.concurrency)
+            rows["record"] = await _phase("record", client, document_id, contents, args.concurrency)
+            stub.should_exit = True
+            await stub.task
+
+            llm_client.backend = ReplayBackend(store, on_miss="error")
+            rows["replay"] = await _phase("replay", client, document_id, contents, args.concurrency)
+            llm_client.backend = ReplayBackend(store, on_miss="any")
+            rows["replay_new"] = await _phase("replay_new", client, document_id, fresh, args.concurrency)
+            llm_client.backend = ReplayBackend(
+                store, profile="fixed", first_token_seconds=args.first_token, tokens_per_second=args.tokens_per_second
+            )
+            rows["replay_fixed"] = await _phase("replay_fixed", client, document_id, contents, args.concurrency)
+            llm_client.backend = ReplayBackend(store, latency_scale=0)
+            rows["replay_x0"] = await _phase("replay_x0", client, document_id, contents, args.concurrency)
+    finally:
+        server.should_exit = True
+        await server.task
+        await async_engine.dispose()
+
+    store.close()
+    size = os.path.getsize(store.path)
+    print(f"recordings: {len(contents) + args.concurrency} streams, {size / 1024:.1f}KB ({size / (len(contents) + args.concurrency):.0f} bytes/stream)")
+    for summary in LLMRecordingStore(store.path).latency_summary():
+        print(
+            f"  {summary['model']} {summary['mode']}: first token p50={summary['first_token_ms']['p50']}ms "
+            f"p95={summary['first_token_ms']['p95']}ms  tokens/s p50={summary['tokens_per_second']['p50']:.1f}"
+        )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--first-token", type=float, default=0.3, help="스텁 첫 토큰 지연 중앙값 (초)")
+    parser.add_argument("--tokens-per-second", type=float, default=80.0, help="스텁 출력 속도 중앙값")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    port = _free_port()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench_replay.db')}"
+    os.environ["RELATED_INDEX_PATH"] = os.path.join(workdir, "related_index")
+    os.environ["AI_JOB_WORKERS"] = "0"
+    os.environ["OPENAI_API_KEY"] = "stub"
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{port}/v1"
+    os.environ["OPENAI_MAX_CONCURRENCY"] = str(args.concurrency)
+    # 속도 제한 대기가 지연 분포에 섞이지 않도록 끔
+    os.environ["OPENAI_REQUESTS_PER_MINUTE"] = "0"
+    os.environ["OPENAI_TOKENS_PER_MINUTE"] = "0"
+    os.environ["LLM_RECORD"] = "True"
+    os.environ["LLM_RECORDINGS_PATH"] = os.path.join(workdir, "llm_recordings.sqlite3")
+    os.environ["LLM_CACHE_ENABLED"] = "False"
+    os.environ["WEB_SEARCH_PROVIDER"] = "none"
+
+    from app.core.database import init_db
+
+    init_db()
+    rows = asyncio.run(_run(args, port))
+
+    record, replay = rows["record"], rows["replay"]
+    drift = max(
+        abs(replay["first_p50"] / record["first_p50"] - 1) if record["first_p50"] else 0.0,
+        abs(replay["total_p50"] / record["total_p50"] - 1) if record["total_p50"] else 0.0,
+    )
+    errors = sum(row["errors"] for row in rows.values())
+    print(f"replay p50 drift vs record: {drift:.1%} (tolerance {args.tolerance:.0%}), errors: {errors}")
+    sys.exit(1 if drift > args.tolerance or errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""전문 검색 벤치마크
+
+backend 디렉터리에서 실행:
+
+    python -m benchmarks.bench_search --documents 100000 --queries 200
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from benchmarks.corpus import paragraphs, vocabulary, zipf_weights
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=100000)
+    parser.add_argument("--words-per-document", type=int, default=300)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(), "bench_search.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+
+    from sqlalchemy import text
+    from app.core.database import engine, init_db
+    from app.services import search
+
+    init_db()
+    rng = random.Random(args.seed)
+    words = vocabulary(20000, rng)
+    # 자연어처럼 일부 단어가 자주 등장하도록 Zipf 분포 가중치 사용
+    weights = zipf_weights(len(words))
+
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        batch = []
+        for i in range(args.documents):
+            batch.append({
+                "title": " ".join(rng.choices(words, weights=weights, k=4)),
+                "content": paragraphs(words, weights, rng, args.words_per_document),
+            })
+            if len(batch) == 5000:
+                conn.execute(text("INSERT INTO documents (title, content) VALUES (:title, :content)"), batch)
+                batch = []
+        if batch:
+            conn.execute(text("INSERT INTO documents (title, content) VALUES (:title, :content)"), batch)
+        search.rebuild_index(conn)
+    print(f"seeded {args.documents} documents + index in {time.perf_counter() - started:.1f}s ({db_path})")
+
+    latencies = []
+    hits = 0
+    with engine.connect() as conn:
+        for _ in range(args.queries):
+            terms = rng.choices(words[:5000], k=rng.randint(1, 2))
+            query = " ".join(term[:max(2, len(term) - 1)] for term in terms)
+            t0 = time.perf_counter()
+            results = search.search(conn, query, limit=20)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            hits += bool(results)
+
+    latencies.sort()
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+    print(
+        f"queries={len(latencies)} with_results={hits} "
+        f"p50={pct(0.50):.1f}ms p95={pct(0.95):.1f}ms p99={pct(0.99):.1f}ms "
+        f"mean={statistics.mean(latencies):.1f}ms max={latencies[-1]:.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
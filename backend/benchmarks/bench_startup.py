@@ -0,0 +1,139 @@
+"""워커 시작 시간 벤치마크
+
+새 인터프리터에서 측정한다 (이미 임포트된 모듈 캐시를 쓰지 않도록 매번 하위 프로세스).
+
+- import: `import app.main`에 걸린 시간과, 그 시점에 올라와 있는 무거운 모듈(openai, sklearn 등)
+- ready: uvicorn 프로세스를 띄운 뒤 /health가 200을 돌려줄 때까지 (인터프리터 시작과 lifespan 포함)
+- first use: 시작 후 처음 쓸 때로 미룬 비용 (연관 노트 벡터화, OpenAI 클라이언트 생성)
+- migrate: 배포 단계(init_db) 시간, 새 DB와 이미 최신인 DB
+
+backend 디렉터리에서 실행:
+
+    python -m benchmarks.bench_startup --repeat 5 --output startup.json
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+_HEAVY_MODULES = ("openai", "sklearn", "scipy", "bs4", "numpy")
+
+_IMPORT_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - started
+print(json.dumps({"seconds": elapsed, "loaded": [name for name in %r if name in sys.modules]}))
+""" % (_HEAVY_MODULES,)
+
+_FIRST_USE_SCRIPT = """
+import asyncio, json, time
+import app.main
+from app.services.llm_client import llm_client
+from app.services.related import related_notes
+result = {}
+started = time.perf_counter()
+related_notes.vectorize(["<p>첫 벡터화</p>"])
+result["vectorize"] = time.perf_counter() - started
+
+async def client():
+    started = time.perf_counter()
+    llm_client.backend._get_client()
+    result["llm_client"] = time.perf_counter() - started
+    await llm_client.aclose()
+
+asyncio.run(client())
+print(json.dumps(result))
+"""
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _python(script: str) -> dict:
+    output = subprocess.run([sys.executable, "-c", script], env=os.environ.copy(), check=True, capture_output=True, text=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def _ready_seconds() -> float:
+    import httpx
+
+    port = _free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=os.environ.copy(),
+    )
+    try:
+        while True:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                    return time.perf_counter() - started
+            except httpx.TransportError:
+                if server.poll() is not None:
+                    raise RuntimeError("uvicorn exited before becoming ready")
+                time.sleep(0.01)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def _summary(values) -> dict:
+    return {"median": round(statistics.median(values), 4), "min": round(min(values), 4), "max": round(max(values), 4)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="결과 JSON 파일 경로")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench_startup.db')}"
+    os.environ["RELATED_INDEX_PATH"] = os.path.join(workdir, "related_index")
+    os.environ["AI_JOB_WORKERS"] = "0"
+    os.environ["OPENAI_API_KEY"] = "sk-bench"
+
+    # 배포 단계 (각 측정 프로세스는 이미 마이그레이션된 DB로 시작)
+    migrate = {}
+    for name in ("fresh", "up_to_date"):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "app.core.migrate"], env=os.environ.copy(), check=True, capture_output=True)
+        migrate[name] = round(time.perf_counter() - started, 4)
+
+    # 첫 실행은 디스크의 .pyc/공유 라이브러리 캐시를 데우는 용도로 버림
+    _python(_IMPORT_SCRIPT)
+    imports = [_python(_IMPORT_SCRIPT) for _ in range(args.repeat)]
+    ready = [_ready_seconds() for _ in range(args.repeat)]
+    first_use = _python(_FIRST_USE_SCRIPT)
+
+    result = {
+        "python": sys.version.split()[0],
+        "repeat": args.repeat,
+        "import_seconds": _summary([row["seconds"] for row in imports]),
+        "loaded_heavy_modules": imports[-1]["loaded"],
+        "ready_seconds": _summary(ready),
+        "first_use_seconds": {name: round(value, 4) for name, value in first_use.items()},
+        "migrate_seconds": migrate,
+    }
+    print(f"import app.main   median {result['import_seconds']['median'] * 1000:7.1f}ms  (min {result['import_seconds']['min'] * 1000:.1f}ms)")
+    print(f"  heavy modules loaded: {', '.join(result['loaded_heavy_modules']) or '-'}")
+    print(f"ready (/health)   median {result['ready_seconds']['median'] * 1000:7.1f}ms  (min {result['ready_seconds']['min'] * 1000:.1f}ms)")
+    for name, value in result["first_use_seconds"].items():
+        print(f"first use {name:<8} {value * 1000:7.1f}ms")
+    print(f"migrate           fresh {migrate['fresh'] * 1000:.1f}ms, up to date {migrate['up_to_date'] * 1000:.1f}ms")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(result, file, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""본문 압축 저장 검사 (CONTENT_COMPRESSION별 DB 크기와 읽기/쓰기 시간)
+
+같은 합성 말뭉치를 코덱마다 새 SQLite 파일에 넣고, 파일 크기, 저장된 본문 바이트 수,
+전체 본문 읽기(압축 풀기 포함)와 본문을 읽지 않는 목록 조회, 메모 앞부분만 읽기 시간을 비교한다.
+이어서 압축 없이 만든 DB를 app.services.storage로 옮겼을 때 걸린 시간과 줄어든 크기를 확인한다.
+
+합성 말뭉치는 무작위 단어라 실제 HTML(반복되는 태그와 클래스)보다 덜 압축되므로 압축률은 하한으로 본다.
+
+backend 디렉터리에서 실행:
+
+    python -m benchmarks.bench_storage --documents 20000
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - started, result
+
+
+def _run(codec: str, path: str, args) -> dict:
+    from sqlalchemy import LargeBinary, create_engine, func, select, text, type_coerce
+    from app.core.config import settings
+    from app.core.database import Base
+    from app.models.ai_memo import AIMemo
+    from app.models.document import Document
+    from app.models.types import decompress_text
+    from benchmarks.corpus import seed_corpus
+
+    settings.content_compression = codec
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        seed_seconds, (_, stats) = _timed(lambda: seed_corpus(
+            conn, args.documents, args.memos_per_document, seed=args.seed
+        ))
+    with engine.connect() as conn:
+        stored = conn.execute(select(
+            func.sum(func.length(type_coerce(Document.content, LargeBinary)))
+        )).scalar() + conn.execute(select(
+            func.sum(func.length(type_coerce(AIMemo.content, LargeBinary)))
+        )).scalar()
+        scan_seconds, _ = _timed(lambda: sum(len(content) for content in conn.execute(select(Document.content)).scalars()))
+        list_seconds, _ = _timed(lambda: conn.execute(
+            select(Document.id, Document.title, Document.updated_at).order_by(Document.updated_at.desc()).limit(50)
+        ).all())
+        preview_seconds, _ = _timed(lambda: [
+            decompress_text(raw, 200)
+            for raw in conn.execute(select(type_coerce(AIMemo.content, LargeBinary)).limit(5000)).scalars()
+        ])
+        conn.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+    engine.dispose()
+    return {
+        "codec": codec,
+        "file_mb": os.path.getsize(path) / 1024 / 1024,
+        "raw_mb": (stats["document_bytes"] + stats["memo_bytes"]) / 1024 / 1024,
+        "stored_mb": stored / 1024 / 1024,
+        "seed_s": seed_seconds,
+        "scan_s": scan_seconds,
+        "list_ms": list_seconds * 1000,
+        "preview_ms": preview_seconds * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=20000)
+    parser.add_argument("--memos-per-document", type=float, default=2.0)
+    parser.add_argument("--codecs", default="none,zlib,zstd")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'migrate.db')}"
+    os.environ["RELATED_INDEX_PATH"] = os.path.join(workdir, "related_index")
+    from app.core.config import settings
+    from app.models.types import zstandard
+
+    try:
+        print(f"{'codec':<6} {'file MB':>8} {'raw MB':>8} {'stored MB':>10} {'seed s':>7} {'scan s':>7} {'list ms':>8} {'preview ms':>11}")
+        for codec in args.codecs.split(","):
+            if codec == "zstd" and zstandard is None:
+                print("zstd   (zstandard 패키지 없음, 건너뜀)")
+                continue
+            row = _run(codec, os.path.join(workdir, f"{codec}.db"), args)
+            print(
+                f"{row['codec']:<6} {row['file_mb']:8.1f} {row['raw_mb']:8.1f} {row['stored_mb']:10.1f} "
+                f"{row['seed_s']:7.2f} {row['scan_s']:7.2f} {row['list_ms']:8.2f} {row['preview_ms']:11.1f}"
+            )
+
+        # 압축 없이 만든 DB를 기본 설정으로 옮기기
+        shutil.copy(os.path.join(workdir, "none.db"), os.path.join(workdir, "migrate.db"))
+        settings.content_compression = "zlib"
+        from sqlalchemy import text
+        from app.core.database import COMPRESSED_COLUMNS, engine, init_db
+        from app.services.storage import recompress_column
+
+        # 시작 시 만들어지는 검색 색인까지 포함한 크기에서 비교
+        init_db()
+        with engine.connect() as conn:
+            conn.execute(text("VACUUM"))
+        before = os.path.getsize(os.path.join(workdir, "migrate.db"))
+        started = time.perf_counter()
+        for table_name, column_name in COMPRESSED_COLUMNS:
+            recompress_column(engine, table_name, column_name)
+        with engine.connect() as conn:
+            conn.execute(text("VACUUM"))
+        engine.dispose()
+        print(
+            f"migrate none -> zlib: {time.perf_counter() - started:.2f}s, "
+            f"{before / 1024 / 1024:.1f}MB -> {os.path.getsize(os.path.join(workdir, 'migrate.db')) / 1024 / 1024:.1f}MB"
+        )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
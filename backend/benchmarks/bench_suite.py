@@ -0,0 +1,333 @@
+"""백엔드 벤치마크 모음 (커밋 간 비교용 JSON 출력)
+
+합성 말뭉치를 만든 임시 DB에 documents/ai_memos/search 라우터를 프로세스 안에서(ASGI) 띄우고,
+시나리오별로 동시 요청을 보내 p50/p95/p99 지연, 처리량, 최대 RSS를 잰다. AI 생성은 가짜 LLM으로
+대체하므로 API 키나 네트워크 없이 실행되고, 같은 인자와 seed면 같은 말뭉치와 요청 순서가 만들어진다.
+
+backend 디렉터리에서 실행:
+
+    python -m benchmarks.bench_suite run --documents 5000 --output before.json
+    python -m benchmarks.bench_suite run --documents 5000 --output after.json
+    python -m benchmarks.bench_suite compare before.json after.json --threshold 0.15
+
+compare는 p95 지연이나 처리량이 threshold 비율 이상 나빠진 시나리오가 있으면 종료 코드 1.
+요청 수가 적으면 실행마다 편차가 크므로 (수백 건에서 ±30%) 비교할 때는 --requests를 충분히 늘린다.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+SCENARIOS: Dict[str, Callable[..., Awaitable[Any]]] = {}
+# 가짜 LLM을 기다리는 시나리오 (요청 수를 따로 지정)
+LLM_SCENARIOS = {"ai_memos.stream"}
+
+
+def scenario(name: str):
+    def register(fn):
+        SCENARIOS[name] = fn
+        return fn
+    return register
+
+
+class _Context:
+    def __init__(self, document_ids: List[int], queries: List[str], concurrency: int):
+        self.document_ids = document_ids
+        self.queries = queries
+        self.concurrency = concurrency
+        self.versions: Dict[int, int] = {}
+
+
+@scenario("documents.list")
+async def _list_documents(client, ctx, rng, worker):
+    return await client.get("/api/v1/documents/", params={"limit": 20})
+
+
+@scenario("documents.list_query")
+async def _list_documents_query(client, ctx, rng, worker):
+    return await client.get("/api/v1/documents/", params={"limit": 20, "q": rng.choice(ctx.queries).split()[0]})
+
+
+@scenario("documents.get")
+async def _get_document(client, ctx, rng, worker):
+    return await client.get(f"/api/v1/documents/{rng.choice(ctx.document_ids)}")
+
+
+@scenario("documents.get_limited")
+async def _get_document_limited(client, ctx, rng, worker):
+    return await client.get(
+        f"/api/v1/documents/{rng.choice(ctx.document_ids)}", params={"memo_limit": 5, "memo_content_length": 200}
+    )
+
+
+@scenario("documents.autosave")
+async def _autosave(client, ctx, rng, worker):
+    # 작업자마다 다른 문서를 편집하므로 버전 충돌 없이 자동 저장 경로만 잰다
+    owned = ctx.document_ids[worker::ctx.concurrency]
+    document_id = owned[rng.randrange(len(owned))]
+    version = ctx.versions.get(document_id)
+    if version is None:
+        version = (await client.get(f"/api/v1/documents/{document_id}", params={"memo_limit": 1})).json()["version"]
+    response = await client.patch(
+        f"/api/v1/documents/{document_id}",
+        json={"base_version": version, "ops": [{"start": 0, "end": 0, "text": "<p>자동 저장</p>"}]},
+    )
+    if response.status_code == 200:
+        ctx.versions[document_id] = response.json()["version"]
+    return response
+
+
+@scenario("documents.related")
+async def _related(client, ctx, rng, worker):
+    return await client.get(f"/api/v1/documents/{rng.choice(ctx.document_ids)}/related", params={"limit": 5})
+
+
+@scenario("ai_memos.list")
+async def _list_memos(client, ctx, rng, worker):
+    return await client.get(f"/api/v1/ai-memos/document/{rng.choice(ctx.document_ids)}")
+
+
+@scenario("ai_memos.generate")
+async def _generate_memo(client, ctx, rng, worker):
+    return await client.post(
+        "/api/v1/ai-memos/generate",
+        json={"type": "summary", "content": rng.choice(ctx.queries), "document_id": rng.choice(ctx.document_ids)},
+    )
+
+
+@scenario("ai_memos.stream")
+async def _stream_memo(client, ctx, rng, worker):
+    # 내용이 매번 달라서 응답 캐시/동시 요청 합치기 없이 생성 경로 전체를 지남
+    content = f"<p>{rng.choice(ctx.queries)} {rng.random()}</p>"
+    response = await client.post(
+        "/api/v1/ai-memos/generate/stream",
+        json={"type": "summary", "content": content, "use_cache": False, "document_id": rng.choice(ctx.document_ids)},
+    )
+    if "event: done" not in response.text:
+        response.status_code = 599
+    return response
+
+
+@scenario("ai_memos.job_enqueue")
+async def _enqueue_job(client, ctx, rng, worker):
+    return await client.post(
+        "/api/v1/ai-memos/jobs",
+        json={"type": "summary", "content": rng.choice(ctx.queries), "document_id": rng.choice(ctx.document_ids)},
+    )
+
+
+@scenario("search")
+async def _search(client, ctx, rng, worker):
+    return await client.get("/api/v1/search", params={"q": rng.choice(ctx.queries), "limit": 20})
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KiB, macOS는 바이트
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _percentile(sorted_values: List[float], p: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+
+async def _run_scenario(name: str, client, ctx: _Context, requests: int, warmup: int, seed: int) -> Dict[str, Any]:
+    fn = SCENARIOS[name]
+    rng = random.Random(f"{seed}:{name}:warmup")
+    for i in range(warmup):
+        await fn(client, ctx, rng, i % ctx.concurrency)
+
+    latencies: List[float] = []
+    errors = 0
+    remaining = [requests]
+
+    async def worker(index: int):
+        nonlocal errors
+        rng = random.Random(f"{seed}:{name}:{index}")
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            t0 = time.perf_counter()
+            response = await fn(client, ctx, rng, index)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(ctx.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "concurrency": ctx.concurrency,
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(_percentile(latencies, 0.50), 3),
+        "p95_ms": round(_percentile(latencies, 0.95), 3),
+        "p99_ms": round(_percentile(latencies, 0.99), 3),
+        "mean_ms": round(statistics.mean(latencies), 3),
+        "max_ms": round(latencies[-1], 3),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def run(args) -> Dict[str, Any]:
+    workdir = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench_suite.db')}"
+    os.environ["RELATED_INDEX_PATH"] = os.path.join(workdir, "related_index")
+    # 가짜 LLM이 받도록 목업 모드를 끄고, 작업 큐 작업자는 띄우지 않음 (등록 지연만 측정)
+    os.environ["OPENAI_API_KEY"] = "bench"
+    os.environ["AI_JOB_WORKERS"] = "0"
+
+    from benchmarks.corpus import query_terms, seed_corpus
+    from benchmarks.fake_llm import FakeLLM
+    from app.core.database import async_engine, engine, init_db
+    from app.services import search
+    from app.services.related import ensure_related_index
+
+    started = time.perf_counter()
+    init_db()
+    with engine.begin() as conn:
+        document_ids, corpus = seed_corpus(
+            conn, args.documents, args.memos_per_document, args.document_words, args.memo_words, seed=args.seed
+        )
+        search.rebuild_index(conn)
+    # 배포 단계처럼 연관 노트 색인을 채운 DB와 맞춤
+    ensure_related_index(engine)
+    seed_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    # 시작 시간은 워커가 앱을 임포트하는 시간 (스키마 작업 없음)
+    from app.main import app
+    from app.services.llm_client import llm_client
+    startup_seconds = time.perf_counter() - started
+
+    if args.llm_replay:
+        # 녹화한 실제 응답 시간으로 속도 제한/재시도/스트리밍을 포함한 호출 경로 전체를 지남
+        from app.services.llm_backends import ReplayBackend
+        from app.services.llm_recordings import LLMRecordingStore
+
+        llm_client.backend = ReplayBackend(LLMRecordingStore(args.llm_replay))
+    else:
+        FakeLLM(latency=args.llm_latency, tokens_per_second=args.llm_tokens_per_second).install(llm_client)
+    names = args.scenarios or list(SCENARIOS)
+    ctx = _Context(document_ids, query_terms(args.seed), args.concurrency)
+
+    async def run_all():
+        import httpx
+
+        results = {}
+        # 앱 예외는 500 응답으로 받아 오류 수에 포함
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+                for name in names:
+                    requests = args.llm_requests if name in LLM_SCENARIOS else args.requests
+                    results[name] = await _run_scenario(name, client, ctx, requests, args.warmup, args.seed)
+                    r = results[name]
+                    print(
+                        f"{name:<24} req/s={r['throughput_rps']:<9} p50={r['p50_ms']:<8.2f} p95={r['p95_ms']:<8.2f} "
+                        f"p99={r['p99_ms']:<8.2f} errors={r['errors']:<4} peak_rss={r['peak_rss_mb']}MB"
+                    )
+        finally:
+            # aiosqlite 연결 스레드가 남아 종료가 멈추지 않도록
+            await async_engine.dispose()
+        return results
+
+    scenarios = asyncio.run(run_all())
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": {key: value for key, value in vars(args).items() if key != "func"},
+        },
+        "corpus": {**corpus, "seed_seconds": round(seed_seconds, 2), "startup_seconds": round(startup_seconds, 2)},
+        "scenarios": scenarios,
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+def compare(base: Dict[str, Any], head: Dict[str, Any], threshold: float) -> bool:
+    """시나리오별 변화율 출력, 나빠진 시나리오가 없으면 True"""
+    ok = True
+    print(f"base={base['meta'].get('commit') or '?'} head={head['meta'].get('commit') or '?'} threshold={threshold:.0%}")
+    for name, new in head["scenarios"].items():
+        old = base["scenarios"].get(name)
+        if old is None:
+            print(f"{name:<24} (new)")
+            continue
+        p95 = new["p95_ms"] / old["p95_ms"] - 1 if old["p95_ms"] else 0.0
+        p50 = new["p50_ms"] / old["p50_ms"] - 1 if old["p50_ms"] else 0.0
+        rps = new["throughput_rps"] / old["throughput_rps"] - 1 if old["throughput_rps"] else 0.0
+        regressed = p95 > threshold or rps < -threshold or new["errors"] > old["errors"]
+        ok &= not regressed
+        print(
+            f"{'REGRESSED' if regressed else 'ok':<10}{name:<24} p50 {p50:+.1%}  p95 {p95:+.1%}  req/s {rps:+.1%}  "
+            f"errors {old['errors']}->{new['errors']}"
+        )
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="벤치마크 실행")
+    run_parser.add_argument("--documents", type=int, default=2000)
+    run_parser.add_argument("--memos-per-document", type=float, default=3.0)
+    run_parser.add_argument("--document-words", type=int, default=300, help="문서 길이 중앙값 (단어)")
+    run_parser.add_argument("--memo-words", type=int, default=120, help="메모 길이 중앙값 (단어)")
+    run_parser.add_argument("--requests", type=int, default=500, help="시나리오별 요청 수")
+    run_parser.add_argument("--llm-requests", type=int, default=50, help="AI 생성 시나리오 요청 수")
+    run_parser.add_argument("--concurrency", type=int, default=10)
+    run_parser.add_argument("--warmup", type=int, default=20)
+    run_parser.add_argument("--llm-latency", type=float, default=0.05, help="가짜 LLM 첫 토큰 지연 (초)")
+    run_parser.add_argument("--llm-tokens-per-second", type=float, default=400.0)
+    run_parser.add_argument("--llm-replay", help="가짜 LLM 대신 재생할 LLM 녹화 파일 (LLM_RECORD=True로 녹화)")
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), help="지정하면 해당 시나리오만 실행")
+    run_parser.add_argument("--output", help="결과 JSON 경로")
+
+    compare_parser = commands.add_parser("compare", help="두 결과 JSON 비교")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("head")
+    compare_parser.add_argument("--threshold", type=float, default=0.15)
+
+    args = parser.parse_args()
+    if args.command == "compare":
+        with open(args.base, encoding="utf-8") as f:
+            base = json.load(f)
+        with open(args.head, encoding="utf-8") as f:
+            head = json.load(f)
+        sys.exit(0 if compare(base, head, args.threshold) else 1)
+
+    result = run(args)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
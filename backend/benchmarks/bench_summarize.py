@@ -0,0 +1,82 @@
+"""긴 문서 요약(map-reduce) 검사
+
+가짜 LLM으로 긴 문서를 요약한 뒤 문단 하나만 고쳐 다시 요약하고, 각 단계의 LLM 호출 수와
+최대 동시 호출 수를 출력한다. 다시 요약할 때 바뀐 조각만 호출되지 않으면 종료 코드 1.
+OpenAI API 키나 네트워크 없이 실행된다.
+
+backend 디렉터리에서 실행:
+
+    python -m benchmarks.bench_summarize --paragraphs 200
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.fake_llm import FakeLLM
+
+
+async def _run(args) -> bool:
+    from app.core.config import settings
+    from app.services.ai_service import AIService
+    from app.services.chunking import count_tokens, split_chunks
+    from app.services.text_utils import html_to_text
+
+    paragraphs = [
+        f"<p>{i}번째 문단입니다. " + "메모 앱의 긴 문서 요약 파이프라인을 시험하기 위한 본문 문장입니다. " * 6 + "</p>"
+        for i in range(args.paragraphs)
+    ]
+    content = "".join(paragraphs)
+    chunks = split_chunks(html_to_text(content), settings.summary_chunk_tokens)
+    print(f"document tokens={count_tokens(html_to_text(content))} chunks={len(chunks)} "
+          f"threshold={settings.summary_long_threshold_tokens} chunk_tokens={settings.summary_chunk_tokens}")
+
+    service = AIService()
+    # 조각 요약이 짧게 나오도록 (실제 요약처럼 원문보다 훨씬 짧게)
+    fake = FakeLLM(latency=args.latency, completion_tokens=8)
+    service.llm = fake
+
+    async def summarize(label: str, body: str) -> int:
+        before = fake.calls
+        fake.max_in_flight = 0
+        t0 = time.perf_counter()
+        result = await service.generate("summary", body)
+        elapsed = (time.perf_counter() - t0) * 1000
+        calls = fake.calls - before
+        print(f"{label:<22} llm_calls={calls:<4} max_in_flight={fake.max_in_flight:<3} "
+              f"final_prompt_tokens={fake.prompt_tokens[-1]:<6} elapsed={elapsed:.0f}ms len={len(result['content'])}")
+        return calls
+
+    await summarize("first summary", content)
+    await summarize("unchanged", content)
+
+    edited = list(paragraphs)
+    edited[len(edited) // 2] = "<p>가운데 문단을 고쳤습니다. 새로운 내용이 추가되었습니다.</p>"
+    edited_calls = await summarize("one paragraph edited", "".join(edited))
+
+    # 바뀐 조각 1~2개 + 최종 요약(조각 요약을 한 번 더 줄이는 경우 그 호출 포함)만 다시 호출되어야 함
+    ok = edited_calls <= 4 and fake.max_in_flight <= settings.summary_map_concurrency
+    print("ok" if ok else "FAIL: too many chunks re-summarized after a small edit")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paragraphs", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05, help="가짜 LLM 호출 지연 (초)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench_summarize.db')}"
+    os.environ["RELATED_INDEX_PATH"] = os.path.join(workdir, "related_index")
+    os.environ["LLM_CACHE_ENABLED"] = "True"
+    # API 키가 없으면 목업 응답을 반환하므로 아무 값이나 지정 (실제 호출은 가짜 LLM이 받음)
+    os.environ["OPENAI_API_KEY"] = "offline"
+
+    sys.exit(0 if asyncio.run(_run(args)) else 1)
+
+
+if __name__ == "__main__":
+    main()
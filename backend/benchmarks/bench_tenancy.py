@@ -0,0 +1,164 @@
+"""사용자별 문서 목록 조회가 전체 사용자 수와 관계없는지 확인
+
+한 DB에 사용자를 단계별로 늘려 가며(사용자마다 같은 수의 문서) 임의의 사용자로 GET /documents/
+첫 페이지와 다음 페이지를 요청한 지연 시간과, 같은 목록 쿼리만 직접 실행한 시간을 잰다.
+(user_id, updated_at, id) 색인이 있으면 한 사용자의 문서 범위만 읽으므로 사용자 수가 늘어도 지연이
+거의 같아야 한다. 비교를 위해 같은 단계에서 색인을 잠시 지우고 다시 잰 값(전체 문서를 정렬)도 함께
+출력한다. 응답에 다른 사용자의 문서가 섞이면 종료 코드 1.
+
+backend 디렉터리에서 실행:
+
+    python -m benchmarks.bench_tenancy --tenants 10 100 1000 --documents-per-user 100
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+_INDEX = "ix_documents_user_id_updated_at_id"
+_LIST_SQL = (
+    "SELECT id FROM documents WHERE user_id = :user_id "
+    "ORDER BY updated_at DESC, id DESC LIMIT 51"
+)
+
+
+def _seed_users(conn, start: int, stop: int, documents_per_user: int, rng: random.Random):
+    """id가 start..stop-1인 사용자와 그 문서를 추가 (수정 시각은 사용자끼리 서로 섞이도록 무작위)"""
+    from app.models.document import Document, User
+
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    conn.execute(User.__table__.insert(), [
+        {"id": id, "name": f"user {id}", "email": f"user{id}@example.com"} for id in range(start, stop)
+    ])
+    rows = [
+        {
+            "title": f"user {user_id} note {n}",
+            "content": f"<p>note {n}</p>",
+            "user_id": user_id,
+            "updated_at": base + timedelta(seconds=rng.randrange(365 * 24 * 3600)),
+            "version": 1,
+        }
+        for user_id in range(start, stop)
+        for n in range(documents_per_user)
+    ]
+    for offset in range(0, len(rows), 5000):
+        conn.execute(Document.__table__.insert(), rows[offset:offset + 5000])
+
+
+def _measure(client, tenants: int, requests: int, rng: random.Random):
+    """임의 사용자의 첫 페이지와 다음 페이지 지연(ms) 목록과, 다른 사용자 문서가 섞인 응답 수"""
+    first, second, leaked = [], [], 0
+    for _ in range(requests):
+        user_id = rng.randrange(1, tenants + 1)
+        headers = {"X-User-Id": str(user_id)}
+        started = time.perf_counter()
+        response = client.get("/api/v1/documents/", params={"limit": 50}, headers=headers)
+        first.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+        page = response.json()
+        cursor = page["next_cursor"]
+        if cursor:
+            started = time.perf_counter()
+            response = client.get("/api/v1/documents/", params={"limit": 50, "cursor": cursor}, headers=headers)
+            second.append((time.perf_counter() - started) * 1000)
+            response.raise_for_status()
+            page["items"] += response.json()["items"]
+        leaked += any(item["user_id"] != user_id for item in page["items"])
+    return first, second, leaked
+
+
+def _measure_sql(engine, tenants: int, requests: int, rng: random.Random):
+    """같은 목록 쿼리만 직접 실행한 지연(ms) 목록 (HTTP/직렬화 비용 제외)"""
+    from sqlalchemy import text
+
+    elapsed = []
+    with engine.connect() as conn:
+        for _ in range(requests):
+            started = time.perf_counter()
+            conn.execute(text(_LIST_SQL), {"user_id": rng.randrange(1, tenants + 1)}).all()
+            elapsed.append((time.perf_counter() - started) * 1000)
+    return elapsed
+
+
+def _percentiles(values):
+    if not values:
+        return {"p50": 0.0, "p95": 0.0}
+    ordered = sorted(values)
+    return {"p50": statistics.median(ordered), "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenants", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--documents-per-user", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench_tenancy.db')}"
+    os.environ["RELATED_INDEX_PATH"] = os.path.join(workdir, "related_index")
+    os.environ["AI_JOB_WORKERS"] = "0"
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import text
+    from app.core.database import engine, init_db
+
+    init_db()
+    from app.main import app
+
+    rng = random.Random(args.seed)
+    client = TestClient(app)
+    with engine.connect() as conn:
+        plan = conn.execute(text(f"EXPLAIN QUERY PLAN {_LIST_SQL}"), {"user_id": 1}).all()
+    print("plan: " + " / ".join(row[-1] for row in plan))
+
+    seeded = 0
+    results = []
+    leaked = 0
+    for tenants in sorted(args.tenants):
+        with engine.begin() as conn:
+            _seed_users(conn, seeded + 1, tenants + 1, args.documents_per_user, rng)
+            conn.execute(text("ANALYZE"))
+        seeded = tenants
+        client.get("/api/v1/documents/", headers={"X-User-Id": "1"})  # 연결/캐시 준비
+
+        first, second, bad = _measure(client, tenants, args.requests, rng)
+        leaked += bad
+        sql = _measure_sql(engine, tenants, args.requests, rng)
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP INDEX {_INDEX}"))
+        unindexed, _, _ = _measure(client, tenants, max(20, args.requests // 10), rng)
+        unindexed_sql = _measure_sql(engine, tenants, max(20, args.requests // 10), rng)
+        with engine.begin() as conn:
+            conn.execute(text(f"CREATE INDEX {_INDEX} ON documents (user_id, updated_at, id)"))
+
+        row = {
+            "tenants": tenants,
+            "documents": tenants * args.documents_per_user,
+            "first_page": _percentiles(first),
+            "next_page": _percentiles(second),
+            "sql": _percentiles(sql),
+            "without_index": _percentiles(unindexed),
+            "without_index_sql": _percentiles(unindexed_sql),
+        }
+        results.append(row)
+        print(
+            f"{tenants:>6} users {row['documents']:>8} docs  "
+            f"first p50 {row['first_page']['p50']:6.2f}ms p95 {row['first_page']['p95']:6.2f}ms  "
+            f"next p50 {row['next_page']['p50']:6.2f}ms  sql p50 {row['sql']['p50']:6.3f}ms  |  "
+            f"without index p50 {row['without_index']['p50']:7.2f}ms sql {row['without_index_sql']['p50']:7.3f}ms"
+        )
+
+    ratio = results[-1]["first_page"]["p50"] / results[0]["first_page"]["p50"]
+    print(f"first page p50 {results[-1]['tenants']} users / {results[0]['tenants']} users: {ratio:.2f}x")
+    print("isolation ok" if not leaked else f"LEAKED other users' documents in {leaked} responses")
+    sys.exit(1 if leaked else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""API 처리량 벤치마크 (동시 요청 수별)
+
+임시 DB로 uvicorn 서버를 띄우고, 동시에 처리 중인 요청 수를 1, 10, 100으로 바꿔 가며
+문서 조회/목록/수정 요청을 섞어 보낸다. 요청/초와 지연 분포를 출력한다.
+
+backend 디렉터리에서 실행:
+
+    python -m benchmarks.bench_throughput --seconds 5 --concurrency 1 10 100
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _seed(documents: int, memos_per_document: int):
+    from app.core.database import SessionLocal, init_db
+    from app.models.ai_memo import AIMemo
+    from app.models.document import Document
+
+    init_db()
+    db = SessionLocal()
+    try:
+        for i in range(documents):
+            document = Document(title=f"문서 {i}", content="<p>" + "본문 내용 " * 400 + "</p>")
+            document.ai_memos = [
+                AIMemo(type="summary", content="<p>" + "메모 " * 100 + "</p>") for _ in range(memos_per_document)
+            ]
+            db.add(document)
+        db.commit()
+    finally:
+        db.close()
+
+
+async def _load(base_url: str, concurrency: int, seconds: float, documents: int):
+    import httpx
+
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + seconds
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def worker(seed: int):
+            nonlocal errors
+            rng = random.Random(seed)
+            while time.perf_counter() < deadline:
+                document_id = rng.randint(1, documents)
+                roll = rng.random()
+                t0 = time.perf_counter()
+                try:
+                    if roll < 0.7:
+                        response = await client.get(f"/api/v1/documents/{document_id}")
+                    elif roll < 0.9:
+                        response = await client.get("/api/v1/documents/", params={"limit": 20})
+                    else:
+                        response = await client.put(f"/api/v1/documents/{document_id}", json={"title": f"문서 {seed}"})
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append((time.perf_counter() - t0) * 1000)
+                if response.status_code >= 400:
+                    errors += 1
+
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+
+    latencies.sort()
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+    print(
+        f"in_flight={concurrency:<4} requests={len(latencies):<6} req/s={len(latencies) / seconds:<8.1f} "
+        f"p50={pct(0.50):.1f}ms p99={pct(0.99):.1f}ms mean={statistics.mean(latencies):.1f}ms errors={errors}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--memos-per-document", type=int, default=5)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench_throughput.db')}"
+    os.environ["RELATED_INDEX_PATH"] = os.path.join(workdir, "related_index")
+    _seed(args.documents, args.memos_per_document)
+
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=os.environ.copy(),
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        import httpx
+
+        for _ in range(100):
+            try:
+                if httpx.get(f"{base_url}/health").status_code == 200:
+                    break
+            except httpx.TransportError:
+                time.sleep(0.1)
+        for concurrency in args.concurrency:
+            asyncio.run(_load(base_url, concurrency, args.seconds, args.documents))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
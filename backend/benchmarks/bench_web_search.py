@@ -0,0 +1,152 @@
+"""웹 검색 보강 단계 검사 (페이지 동시 수집, 페이지 캐시, ETag 재검증, 본문 추출 속도)
+
+로컬에 지연을 넣은 HTML 서버를 띄우고 fixture 검색 제공자가 그 페이지들을 결과로 돌려주게 한 뒤
+web_search.enrich를 다음 상태에서 잰다.
+
+- 호스트별 동시 요청 1개 (순차 수집과 같음) / --per-host개, 캐시 없음
+- 캐시가 신선할 때 (서버 요청 없어야 함)
+- 캐시가 오래됐을 때 (조건부 요청으로 모두 304여야 함)
+
+마지막으로 정규식 추출(extract_passages)과 BeautifulSoup 파싱의 페이지당 시간을 비교한다.
+API 키나 외부 네트워크가 필요 없다.
+
+backend 디렉터리에서 실행:
+
+    python -m benchmarks.bench_web_search --pages 10 --latency 0.2
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import tempfile
+import threading
+import time
+
+_WORDS = (
+    "벡터 검색 색인 임베딩 유사도 문서 메모 요약 캐시 지연 처리량 병렬 요청 서버 응답 "
+    "index vector search latency cache throughput parser passage ranking query"
+).split()
+
+_QUERY_DOCUMENT = "<p>벡터 검색 색인과 임베딩 유사도로 문서를 찾는다. 벡터 검색 색인은 캐시와 함께 쓰면 지연이 줄어든다.</p>" * 5
+
+
+def _page(index: int, rng: random.Random) -> str:
+    paragraphs = "".join(
+        f"<p>{' '.join(rng.choice(_WORDS) for _ in range(rng.randint(20, 60)))}.</p>" for _ in range(30)
+    )
+    menu = "".join(f'<li><a href="/page/{i}">메뉴 {i}</a></li>' for i in range(40))
+    script = "var tracking = {" + ",".join(f'"k{i}": {i}' for i in range(200)) + "};"
+    return (
+        f"<html><head><title>페이지 {index}</title><script>{script}</script>"
+        f"<style>body {{ margin: 0 }}</style></head><body>"
+        f"<nav><ul>{menu}</ul></nav><article><h1>페이지 {index}</h1>{paragraphs}</article>"
+        f"<footer>저작권 표시</footer></body></html>"
+    )
+
+
+def _serve(pages: dict, latency: float, counts: dict) -> int:
+    """지연과 ETag를 흉내 내는 페이지 서버를 백그라운드 스레드에서 시작하고 포트 반환"""
+    import uvicorn
+    from starlette.applications import Starlette
+    from starlette.responses import HTMLResponse, Response
+    from starlette.routing import Route
+
+    async def page(request):
+        index = int(request.path_params["index"])
+        etag = f'"page-{index}"'
+        await asyncio.sleep(latency)
+        if request.headers.get("if-none-match") == etag:
+            counts["304"] += 1
+            return Response(status_code=304, headers={"ETag": etag})
+        counts["200"] += 1
+        return HTMLResponse(pages[index], headers={"ETag": etag})
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(
+        Starlette(routes=[Route("/page/{index}", page)]), host="127.0.0.1", port=port, log_level="warning"
+    ))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return port
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.2, help="페이지 응답 지연 (초)")
+    parser.add_argument("--per-host", type=int, default=10)
+    parser.add_argument("--parse-rounds", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    pages = {index: _page(index, rng) for index in range(args.pages)}
+    counts = {"200": 0, "304": 0}
+    port = _serve(pages, args.latency, counts)
+
+    workdir = tempfile.mkdtemp()
+    fixture_path = os.path.join(workdir, "fixture.json")
+    with open(fixture_path, "w", encoding="utf-8") as file:
+        json.dump([
+            {"title": f"페이지 {index}", "url": f"http://127.0.0.1:{port}/page/{index}", "snippet": "벡터 검색 색인 캐시"}
+            for index in range(args.pages)
+        ], file, ensure_ascii=False)
+    os.environ["WEB_SEARCH_PROVIDER"] = "fixture"
+    os.environ["WEB_SEARCH_FIXTURE_PATH"] = fixture_path
+    os.environ["WEB_SEARCH_MAX_RESULTS"] = str(args.pages)
+    os.environ["WEB_PAGE_CACHE_PATH"] = os.path.join(workdir, "pages.sqlite3")
+
+    from app.core.config import settings
+    from app.services.page_cache import page_cache
+    from app.services.web_search import WebSearch, extract_passages
+
+    async def run(search: WebSearch) -> tuple:
+        before = dict(counts)
+        started = time.perf_counter()
+        context, sources = await search.enrich(_QUERY_DOCUMENT)
+        elapsed = time.perf_counter() - started
+        await search.aclose()
+        return elapsed, counts["200"] - before["200"], counts["304"] - before["304"], len(sources)
+
+    def report(name: str, row: tuple):
+        elapsed, full, revalidated, sources = row
+        print(f"{name:<22} {elapsed * 1000:9.1f} {full:6d} {revalidated:6d} {sources:8d}")
+
+    try:
+        print(f"pages={args.pages} latency={args.latency}s")
+        print(f"{'':<22} {'ms':>9} {'200':>6} {'304':>6} {'sources':>8}")
+        settings.web_fetch_per_host = 1
+        report("cold, per-host 1", asyncio.run(run(WebSearch())))
+        page_cache.clear()
+        settings.web_fetch_per_host = args.per_host
+        search = WebSearch()
+        report(f"cold, per-host {args.per_host}", asyncio.run(run(search)))
+        report("warm cache", asyncio.run(run(search)))
+        page_cache.fresh_seconds = 0
+        report("stale cache (ETag)", asyncio.run(run(search)))
+        print(f"page cache: {page_cache.stats()}")
+
+        from bs4 import BeautifulSoup
+
+        html = pages[0]
+        started = time.perf_counter()
+        for _ in range(args.parse_rounds):
+            extract_passages(html)
+        regex_ms = (time.perf_counter() - started) / args.parse_rounds * 1000
+        started = time.perf_counter()
+        for _ in range(args.parse_rounds):
+            BeautifulSoup(html, "html.parser").get_text("\n")
+        soup_ms = (time.perf_counter() - started) / args.parse_rounds * 1000
+        print(f"extract ({len(html) // 1024}KB page): regex {regex_ms:.2f}ms, BeautifulSoup {soup_ms:.2f}ms")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""벤치마크용 합성 말뭉치
+
+자연어처럼 일부 단어가 자주 나오도록 Zipf 분포로 단어를 뽑고, 문서/메모 길이는 로그정규 분포로
+정한다 (대부분 짧고 가끔 아주 긴 노트). 같은 seed면 항상 같은 말뭉치가 만들어진다.
+"""
+import math
+import random
+from typing import Dict, List, Tuple
+
+_SYLLABLES = "가나다라마바사아자차카타파하거너더러머버서어저처커터퍼허고노도로모보소오조초코토포호"
+_MEMO_TYPES = ("summary", "brainstorm", "publish")
+
+
+def vocabulary(size: int, rng: random.Random) -> List[str]:
+    """한글 2~4음절 단어와 영문 4~9글자 단어를 반씩 섞은 단어 목록"""
+    words = set()
+    while len(words) < size:
+        if rng.random() < 0.5:
+            words.add("".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4))))
+        else:
+            words.add("".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(4, 9))))
+    return sorted(words)
+
+
+def zipf_weights(size: int) -> List[float]:
+    return [1.0 / (rank + 1) for rank in range(size)]
+
+
+def paragraphs(words: List[str], weights: List[float], rng: random.Random, length: int) -> str:
+    """단어 length개를 40단어씩 <p> 문단으로 묶은 HTML"""
+    tokens = rng.choices(words, weights=weights, k=length)
+    chunks = [" ".join(tokens[i:i + 40]) for i in range(0, len(tokens), 40)]
+    return "".join(f"<p>{chunk}</p>" for chunk in chunks)
+
+
+def lognormal_length(rng: random.Random, median: int, sigma: float = 0.8, maximum: int = 50000) -> int:
+    return max(1, min(maximum, int(rng.lognormvariate(math.log(median), sigma))))
+
+
+def seed_corpus(
+    conn,
+    documents: int,
+    memos_per_document: float,
+    document_words: int = 300,
+    memo_words: int = 120,
+    seed: int = 42,
+    batch_size: int = 2000,
+) -> Tuple[List[int], Dict[str, int]]:
+    """documents/ai_memos 테이블에 합성 데이터를 넣고 (문서 id 목록, 통계)를 반환
+
+    ORM 이벤트를 거치지 않는 Core INSERT이므로, 전문 검색/연관 노트 색인은 호출 측에서 다시 만든다.
+    """
+    from app.models.ai_memo import AIMemo
+    from app.models.document import Document
+
+    rng = random.Random(seed)
+    words = vocabulary(20000, rng)
+    weights = zipf_weights(len(words))
+
+    document_ids: List[int] = []
+    stats = {"documents": 0, "memos": 0, "document_bytes": 0, "memo_bytes": 0}
+    for start in range(0, documents, batch_size):
+        rows = []
+        for _ in range(min(batch_size, documents - start)):
+            content = paragraphs(words, weights, rng, lognormal_length(rng, document_words))
+            rows.append({"title": " ".join(rng.choices(words, weights=weights, k=4)), "content": content, "version": 1})
+            stats["document_bytes"] += len(content.encode("utf-8"))
+        result = conn.execute(Document.__table__.insert().returning(Document.__table__.c.id), rows)
+        batch_ids = [row[0] for row in result]
+        document_ids.extend(batch_ids)
+
+        memos = []
+        for document_id in batch_ids:
+            # 평균 memos_per_document개 (지수 분포라 메모가 많은 문서도 섞임)
+            for _ in range(int(rng.expovariate(1 / memos_per_document)) if memos_per_document else 0):
+                content = paragraphs(words, weights, rng, lognormal_length(rng, memo_words, sigma=0.5))
+                memos.append({
+                    "document_id": document_id,
+                    "type": rng.choice(_MEMO_TYPES),
+                    "content": content,
+                    "memo_metadata": {"confidence": 0.85, "prompt": ""},
+                })
+                stats["memo_bytes"] += len(content.encode("utf-8"))
+        if memos:
+            conn.execute(AIMemo.__table__.insert(), memos)
+        stats["documents"] += len(batch_ids)
+        stats["memos"] += len(memos)
+    return document_ids, stats
+
+
+def query_terms(seed: int = 42, count: int = 200) -> List[str]:
+    """seed_corpus와 같은 어휘에서 자주 나오는 단어로 만든 검색어"""
+    rng = random.Random(seed)
+    words = vocabulary(20000, rng)
+    weights = zipf_weights(len(words))
+    return [" ".join(rng.choices(words[:5000], weights=weights[:5000], k=rng.randint(1, 2))) for _ in range(count)]
@@ -0,0 +1,53 @@
+"""벤치마크용 가짜 LLM
+
+llm_client의 chat/stream_chat과 같은 인자를 받고, 첫 토큰까지의 지연과 초당 토큰 수를 흉내 낸다.
+호출 수, 최대 동시 호출 수, 프롬프트 토큰 수를 기록한다.
+"""
+import asyncio
+from typing import AsyncIterator, Dict, List
+
+
+class FakeLLM:
+    # AIService.llm을 직접 바꿔 끼울 때도 목업 응답 대신 이 객체를 호출하도록
+    configured = True
+
+    def __init__(self, latency: float = 0.05, tokens_per_second: float = 0.0, completion_tokens: int = 40):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.completion_tokens = completion_tokens
+
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.prompt_tokens: List[int] = []
+
+    def install(self, client):
+        """LLMClient 인스턴스의 호출을 이 객체로 대체"""
+        client.chat = self.chat
+        client.stream_chat = self.stream_chat
+
+    async def chat(self, messages: List[Dict[str, str]], model: str = "gpt-3.5-turbo", max_tokens: int = 1000, **options) -> str:
+        parts = [delta async for delta in self.stream_chat(messages, model, max_tokens, **options)]
+        return "".join(parts)
+
+    async def stream_chat(
+        self, messages: List[Dict[str, str]], model: str = "gpt-3.5-turbo", max_tokens: int = 1000, **options
+    ) -> AsyncIterator[str]:
+        from app.services.chunking import count_tokens
+
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        self.prompt_tokens.append(sum(count_tokens(message["content"]) for message in messages))
+        try:
+            await asyncio.sleep(self.latency)
+            # 요약처럼 보이도록 프롬프트 마지막 줄의 앞부분을 돌려줌
+            lines = messages[-1]["content"].strip().splitlines() or [""]
+            words = (" ".join(lines[-1].split()[:8]) or "응답").split()
+            yield "- "
+            for i in range(min(self.completion_tokens, max_tokens)):
+                if self.tokens_per_second:
+                    await asyncio.sleep(1 / self.tokens_per_second)
+                yield words[i % len(words)] + " "
+        finally:
+            self.in_flight -= 1
@@ -0,0 +1,59 @@
+"""Alembic 실행 환경 (DB 주소는 DATABASE_URL 설정 사용)
+
+init_db처럼 코드에서 실행할 때는 config.attributes["connection"]으로 받은 연결을 그대로 쓴다.
+"""
+from logging.config import fileConfig
+
+from alembic import context
+
+from app.core.database import Base, engine
+from app.models import ai_job, ai_memo, document  # noqa: F401 (모델 등록)
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get("connection") is None:
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    # 전문 검색 색인(FTS5 가상 테이블과 그 내부 테이블, tsvector 컬럼)은 모델에 없으므로 autogenerate 비교에서 제외
+    if type_ == "table" and name.startswith(("documents_fts", "ai_memos_fts")):
+        return False
+    if type_ == "column" and name == "search_vector":
+        return False
+    if type_ == "index" and name.endswith("_search_vector"):
+        return False
+    return True
+
+
+def _configure(**options):
+    context.configure(
+        target_metadata=Base.metadata,
+        include_object=include_object,
+        # SQLite는 ALTER가 제한적이라 컬럼 변경을 테이블 재작성(batch)으로 처리
+        render_as_batch=engine.dialect.name == "sqlite",
+        **options,
+    )
+
+
+def run_migrations_offline():
+    # 0001은 기존 테이블을 확인해서 적용하고 0002는 기존 행으로 색인을 채우므로 SQL 파일만으로는 실행할 수 없음
+    raise RuntimeError("오프라인(--sql) 마이그레이션은 지원하지 않음, DATABASE_URL의 DB에 직접 적용")
+
+
+def run_migrations_online():
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _configure(connection=connection)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+    with engine.connect() as connection:
+        _configure(connection=connection)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
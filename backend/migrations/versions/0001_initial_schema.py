@@ -0,0 +1,143 @@
+"""초기 스키마 (사용자, 문서, 변경 기록, AI 메모, AI 작업)
+
+마이그레이션 도입 전 시작 시 create_all로 만들어진 DB에도 그대로 실행할 수 있도록, 이미 있는 테이블은
+만들지 않고 그때 시작 시마다 하던 보정(새 컬럼, 새 인덱스, 압축 컬럼 타입, updated_at 형식)만 적용한다.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# 압축 본문(CompressedText)을 저장하는 (테이블, 컬럼)
+_COMPRESSED_COLUMNS = (("documents", "content"), ("ai_memos", "content"), ("document_revisions", "snapshot"))
+
+
+def _create_tables(existing):
+    if "users" not in existing:
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("email", sa.String(), nullable=False, unique=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+    if "documents" not in existing:
+        op.create_table(
+            "documents",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("title", sa.String(), nullable=False),
+            sa.Column("content", sa.LargeBinary()),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("updated_at", sa.DateTime(timezone=True)),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+            sa.Column("version", sa.Integer(), nullable=False, server_default="1"),
+            sa.Column("memo_version", sa.Integer(), nullable=False, server_default="0"),
+        )
+    if "document_revisions" not in existing:
+        op.create_table(
+            "document_revisions",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("document_id", sa.Integer(), sa.ForeignKey("documents.id"), nullable=False),
+            sa.Column("version", sa.Integer(), nullable=False),
+            sa.Column("ops", sa.JSON(), nullable=True),
+            sa.Column("snapshot", sa.LargeBinary(), nullable=True),
+            sa.Column("title", sa.String(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True)),
+            sa.UniqueConstraint("document_id", "version", name="uq_document_revisions_document_id_version"),
+        )
+    if "ai_memos" not in existing:
+        op.create_table(
+            "ai_memos",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("document_id", sa.Integer(), sa.ForeignKey("documents.id"), nullable=False),
+            sa.Column("type", sa.String(), nullable=False),
+            sa.Column("content", sa.LargeBinary(), nullable=False),
+            sa.Column("anchor_position", sa.Integer(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("memo_metadata", sa.JSON(), nullable=True),
+        )
+    if "ai_jobs" not in existing:
+        op.create_table(
+            "ai_jobs",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("status", sa.String(), nullable=False),
+            sa.Column("type", sa.String(), nullable=False),
+            sa.Column("content", sa.Text(), nullable=False),
+            sa.Column("prompt", sa.Text(), nullable=True),
+            sa.Column("use_cache", sa.Boolean(), nullable=True),
+            sa.Column("document_id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=True),
+            sa.Column("attempts", sa.Integer(), nullable=False),
+            sa.Column("next_run_at", sa.DateTime(timezone=True)),
+            sa.Column("locked_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("error", sa.Text(), nullable=True),
+            sa.Column("memo_id", sa.Integer(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True)),
+            sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        )
+
+
+_INDEXES = (
+    ("ix_users_id", "users", ["id"]),
+    ("ix_documents_id", "documents", ["id"]),
+    # 목록 조회 keyset 페이지네이션 (updated_at DESC, id DESC)
+    ("ix_documents_updated_at_id", "documents", ["updated_at", "id"]),
+    ("ix_ai_memos_id", "ai_memos", ["id"]),
+    ("ix_ai_memos_document_id_id", "ai_memos", ["document_id", "id"]),
+    ("ix_ai_jobs_id", "ai_jobs", ["id"]),
+    ("ix_ai_jobs_status_next_run_at", "ai_jobs", ["status", "next_run_at"]),
+)
+
+
+def _adopt_legacy(bind):
+    """create_all로 만들어진 기존 DB를 이 리비전의 스키마에 맞춤"""
+    inspector = sa.inspect(bind)
+    document_columns = {column["name"] for column in inspector.get_columns("documents")}
+    if "version" not in document_columns:
+        op.add_column("documents", sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+    if "memo_version" not in document_columns:
+        op.add_column("documents", sa.Column("memo_version", sa.Integer(), nullable=False, server_default="0"))
+
+    # 본문 컬럼은 압축 값을 담을 수 있도록 bytea로 변경 (기존 값은 UTF-8 평문으로 그대로 읽힘)
+    # SQLite는 TEXT 컬럼에도 BLOB 값을 저장할 수 있어서 바꿀 필요 없음
+    if bind.dialect.name == "postgresql":
+        for table, column in _COMPRESSED_COLUMNS:
+            columns = {c["name"]: c["type"] for c in inspector.get_columns(table)}
+            if column in columns and columns[column].python_type is str:
+                op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE bytea USING convert_to({column}, 'UTF8')")
+
+    if bind.dialect.name == "sqlite":
+        # CURRENT_TIMESTAMP 형식(초 단위) 값을 SQLAlchemy DateTime 형식으로 맞춤
+        op.execute(
+            "UPDATE documents SET updated_at = substr(COALESCE(updated_at, created_at), 1, 19) || '.000000' "
+            "WHERE updated_at IS NULL OR length(updated_at) = 19"
+        )
+    else:
+        op.execute("UPDATE documents SET updated_at = created_at WHERE updated_at IS NULL")
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    existing = set(inspector.get_table_names())
+    _create_tables(existing)
+    if "documents" in existing:
+        _adopt_legacy(bind)
+
+    for name, table, columns in _INDEXES:
+        if name not in {index["name"] for index in sa.inspect(bind).get_indexes(table)}:
+            op.create_index(name, table, columns)
+
+
+def downgrade():
+    for name, table, _ in reversed(_INDEXES):
+        op.drop_index(name, table_name=table)
+    for table in ("ai_jobs", "ai_memos", "document_revisions", "documents", "users"):
+        op.drop_table(table)
@@ -0,0 +1,24 @@
+"""전문 검색 색인 (SQLite FTS5 / PostgreSQL tsvector)
+
+DB 종류별 DDL은 app.services.search가 가지고 있으므로 그대로 호출한다. 처음 만들 때는 기존 행으로 채운다.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+from app.services.search import drop_search_schema, ensure_search_schema
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    ensure_search_schema(op.get_bind())
+
+
+def downgrade():
+    drop_search_schema(op.get_bind())
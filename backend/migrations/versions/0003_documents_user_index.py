@@ -0,0 +1,24 @@
+"""사용자별 문서 목록 색인
+
+모든 문서 조회가 user_id로 걸러지므로 목록 keyset 색인 (updated_at, id)을 (user_id, updated_at, id)로 바꾼다.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_documents_user_id_updated_at_id", "documents", ["user_id", "updated_at", "id"])
+    op.drop_index("ix_documents_updated_at_id", table_name="documents")
+
+
+def downgrade():
+    op.create_index("ix_documents_updated_at_id", "documents", ["updated_at", "id"])
+    op.drop_index("ix_documents_user_id_updated_at_id", table_name="documents")
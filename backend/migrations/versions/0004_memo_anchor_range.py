@@ -0,0 +1,28 @@
+"""AI 메모 앵커 구간
+
+앵커를 시작 위치 하나에서 [anchor_position, anchor_end) 구간으로 넓히고, 구간 조회와 앵커 이동에 쓰는
+색인을 추가한다. 기존 메모는 anchor_end가 비어 있어 한 점 앵커로 취급된다.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("ai_memos", sa.Column("anchor_end", sa.Integer(), nullable=True))
+    op.create_index("ix_ai_memos_document_id_anchor", "ai_memos", ["document_id", "anchor_position", "anchor_end"])
+
+
+def downgrade():
+    op.drop_index("ix_ai_memos_document_id_anchor", table_name="ai_memos")
+    # SQLite는 컬럼 삭제 시 테이블을 다시 만듦 (env.py의 render_as_batch와 같은 방식)
+    with op.batch_alter_table("ai_memos") as batch:
+        batch.drop_column("anchor_end")
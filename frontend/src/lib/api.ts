@@ -7,6 +7,49 @@ export interface Document {
   created_at: string;
   updated_at?: string;
   user_id?: number;
+  version: number;
+}
+
+export type DocumentListItem = Omit<Document, 'content' | 'version'>;
+
+// [start, end) 구간을 text로 교체 (위치는 JS 문자열 인덱스)
+export interface PatchOp {
+  start: number;
+  end: number;
+  text: string;
+}
+
+export interface DocumentPatchResult {
+  id: number;
+  version: number;
+  updated_at?: string;
+}
+
+// 이전 저장 본문과 현재 본문의 공통 앞/뒷부분을 제외한 변경 구간 하나로 연산 생성
+export function diffToPatchOps(previous: string, next: string): PatchOp[] {
+  if (previous === next) return [];
+  let start = 0;
+  const maxStart = Math.min(previous.length, next.length);
+  while (start < maxStart && previous[start] === next[start]) start++;
+  let suffix = 0;
+  const maxSuffix = Math.min(previous.length, next.length) - start;
+  while (
+    suffix < maxSuffix &&
+    previous[previous.length - 1 - suffix] === next[next.length - 1 - suffix]
+  ) suffix++;
+  return [{ start, end: previous.length - suffix, text: next.slice(start, next.length - suffix) }];
+}
+
+export interface DocumentPage {
+  items: DocumentListItem[];
+  next_cursor?: string | null;
+}
+
+export interface RelatedDocument {
+  id: number;
+  title: string;
+  updated_at?: string;
+  score: number;
 }
 
 export interface AIMemo {
@@ -14,16 +57,31 @@ export interface AIMemo {
   document_id: number;
   type: 'qa' | 'critical-thinking' | 'summary';
   content: string;
+  // 본문의 [anchor_position, anchor_end) 구간 (편집 연산과 같은 UTF-16 위치, 서버가 문서 수정 시 함께 옮김)
   anchor_position?: number;
+  anchor_end?: number;
   created_at: string;
   memo_metadata?: {
     sources?: string[];
     confidence?: number;
     prompt?: string;
+    mock?: boolean;
   };
 }
 
+// 일괄 생성용 문서 (내보내기 NDJSON의 한 줄을 그대로 넣을 수 있음)
+export interface DocumentImport {
+  title: string;
+  content: string;
+  ai_memos?: Pick<AIMemo, 'type' | 'content' | 'anchor_position' | 'anchor_end' | 'memo_metadata'>[];
+}
+
+export interface BulkResult {
+  ids: number[];
+}
+
 export interface AIRequest {
+  document_id: number; // 생성한 메모를 붙일 문서
   type: 'qa' | 'critical-thinking' | 'summary';
   content: string;
   context?: string;
@@ -39,6 +97,18 @@ export interface AIResponse {
   error?: string;
 }
 
+export interface AIJob {
+  id: number;
+  status: 'queued' | 'running' | 'succeeded' | 'failed';
+  type: AIRequest['type'];
+  document_id: number;
+  attempts: number;
+  error?: string;
+  created_at: string;
+  finished_at?: string;
+  memo?: AIMemo;
+}
+
 class ApiClient {
   private baseURL: string;
 
@@ -72,14 +142,23 @@ class ApiClient {
   }
 
   // Documents API
-  async getDocuments(): Promise<Document[]> {
-    return this.request<Document[]>('/documents/');
+  async getDocuments(params: { limit?: number; cursor?: string; q?: string } = {}): Promise<DocumentPage> {
+    const query = new URLSearchParams();
+    if (params.limit) query.set('limit', String(params.limit));
+    if (params.cursor) query.set('cursor', params.cursor);
+    if (params.q) query.set('q', params.q);
+    const qs = query.toString();
+    return this.request<DocumentPage>(`/documents/${qs ? `?${qs}` : ''}`);
   }
 
   async getDocument(id: number): Promise<Document & { ai_memos: AIMemo[] }> {
     return this.request<Document & { ai_memos: AIMemo[] }>(`/documents/${id}`);
   }
 
+  async getRelatedDocuments(id: number, limit?: number): Promise<RelatedDocument[]> {
+    return this.request<RelatedDocument[]>(`/documents/${id}/related${limit ? `?limit=${limit}` : ''}`);
+  }
+
   async createDocument(document: { title: string; content: string }): Promise<Document> {
     return this.request<Document>('/documents/', {
       method: 'POST',
@@ -94,15 +173,60 @@ class ApiClient {
     });
   }
 
+  // 자동 저장: 변경 구간만 전송, 버전이 어긋나면 409 (최신 문서를 다시 받아야 함)
+  async patchDocument(
+    id: number,
+    patch: { base_version: number; ops: PatchOp[]; title?: string }
+  ): Promise<DocumentPatchResult> {
+    return this.request<DocumentPatchResult>(`/documents/${id}`, {
+      method: 'PATCH',
+      body: JSON.stringify(patch),
+    });
+  }
+
   async deleteDocument(id: number): Promise<{ message: string }> {
     return this.request<{ message: string }>(`/documents/${id}`, {
       method: 'DELETE',
     });
   }
 
+  // 일괄 API: 요청 하나를 트랜잭션 하나로 처리 (항목 수 제한은 서버 BULK_MAX_ITEMS)
+  async bulkCreateDocuments(documents: DocumentImport[]): Promise<BulkResult> {
+    return this.request<BulkResult>('/documents/bulk', {
+      method: 'POST',
+      body: JSON.stringify({ documents }),
+    });
+  }
+
+  async bulkUpdateDocuments(
+    documents: { id: number; title?: string; content?: string }[]
+  ): Promise<DocumentPatchResult[]> {
+    return this.request<DocumentPatchResult[]>('/documents/bulk', {
+      method: 'PATCH',
+      body: JSON.stringify({ documents }),
+    });
+  }
+
+  async bulkDeleteDocuments(ids: number[]): Promise<BulkResult> {
+    return this.request<BulkResult>('/documents/bulk/delete', {
+      method: 'POST',
+      body: JSON.stringify({ ids }),
+    });
+  }
+
+  // 현재 사용자의 전체 문서 NDJSON 내보내기 주소 (브라우저가 바로 내려받도록 링크로 사용)
+  exportDocumentsUrl(): string {
+    return `${this.baseURL}/documents/export`;
+  }
+
   // AI Memos API
-  async getAIMemos(documentId: number): Promise<AIMemo[]> {
-    return this.request<AIMemo[]>(`/ai-memos/document/${documentId}`);
+  // range를 주면 앵커가 본문 [start, end) 구간(화면에 보이는 부분)에 걸친 메모만 앵커 위치 순으로 반환
+  async getAIMemos(documentId: number, range?: { start?: number; end?: number }): Promise<AIMemo[]> {
+    const query = new URLSearchParams();
+    if (range?.start !== undefined) query.set('start', String(range.start));
+    if (range?.end !== undefined) query.set('end', String(range.end));
+    const qs = query.toString();
+    return this.request<AIMemo[]>(`/ai-memos/document/${documentId}${qs ? `?${qs}` : ''}`);
   }
 
   async generateAIMemo(request: AIRequest): Promise<AIResponse> {
@@ -112,7 +236,73 @@ class ApiClient {
     });
   }
 
-  async updateAIMemo(id: number, memo: { content?: string; memo_metadata?: any }): Promise<AIMemo> {
+  // 백그라운드 생성: 작업을 등록하고 getAIJob으로 상태를 조회
+  async createAIJob(request: AIRequest): Promise<AIJob> {
+    return this.request<AIJob>('/ai-memos/jobs', {
+      method: 'POST',
+      body: JSON.stringify(request),
+    });
+  }
+
+  async getAIJob(id: number): Promise<AIJob> {
+    return this.request<AIJob>(`/ai-memos/jobs/${id}`);
+  }
+
+  // SSE 스트리밍 생성: 토큰이 도착할 때마다 onToken 호출, 저장된 메모 반환
+  async generateAIMemoStream(request: AIRequest, onToken: (delta: string) => void): Promise<AIMemo> {
+    const response = await fetch(`${this.baseURL}/ai-memos/generate/stream`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(request),
+    });
+    if (!response.ok || !response.body) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      let boundary;
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        const message = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+
+        const event = message.match(/^event: (.*)$/m)?.[1];
+        const data = JSON.parse(message.match(/^data: (.*)$/m)?.[1] ?? '{}');
+        if (event === 'token') onToken(data.delta);
+        if (event === 'done') return data.memo;
+        if (event === 'error') throw new Error(data.error);
+      }
+    }
+    throw new Error('Stream ended before memo was saved');
+  }
+
+  async bulkCreateAIMemos(
+    memos: (Pick<AIMemo, 'document_id' | 'type' | 'content' | 'anchor_position' | 'anchor_end' | 'memo_metadata'>)[]
+  ): Promise<BulkResult> {
+    return this.request<BulkResult>('/ai-memos/bulk', {
+      method: 'POST',
+      body: JSON.stringify({ memos }),
+    });
+  }
+
+  async bulkDeleteAIMemos(ids: number[]): Promise<BulkResult> {
+    return this.request<BulkResult>('/ai-memos/bulk/delete', {
+      method: 'POST',
+      body: JSON.stringify({ ids }),
+    });
+  }
+
+  async updateAIMemo(
+    id: number,
+    memo: { content?: string; memo_metadata?: any; anchor_position?: number | null; anchor_end?: number | null }
+  ): Promise<AIMemo> {
     return this.request<AIMemo>(`/ai-memos/${id}`, {
       method: 'PUT',
       body: JSON.stringify(memo),